@@ -604,6 +604,7 @@ follow the instructions at
         wards = {}
         shared_wards = {}
 
+        from .utils._wards_columns import WardsColumns, is_wards_binary
         from ._wards import Wards
         from copy import deepcopy
 
@@ -615,8 +616,13 @@ follow the instructions at
 
             if input_files not in shared_wards:
                 if input_files.is_wards_data:
-                    wards[input_files] = Wards.from_json(
-                        input_files.wards_data)
+                    filename = input_files.wards_data
+
+                    if is_wards_binary(filename):
+                        wards[input_files] = WardsColumns.load(filename)
+                    else:
+                        wards[input_files] = WardsColumns.from_wards(
+                            Wards.load(filename))
                 else:
                     network_params = deepcopy(params)
                     network_params.input_files = input_files
@@ -626,7 +632,8 @@ follow the instructions at
                                             max_links=max_links,
                                             nthreads=nthreads,
                                             profiler=profiler)
-                    wards[input_files] = network.to_wards()
+                    wards[input_files] = network.to_wards_columns(
+                        nthreads=nthreads)
 
                 shared_wards[input_files] = [i]
             else:
@@ -655,7 +662,7 @@ follow the instructions at
                 network = ds.specialise(network=network, nthreads=nthreads)
 
                 for i, idx in enumerate(value):
-                    wardss[idx] = network.subnets[i].to_wards(
+                    wardss[idx] = network.subnets[i].to_wards_columns(
                         nthreads=nthreads)
                     input_files[idx] = key
             else:
@@ -666,7 +673,8 @@ follow the instructions at
                 if demographic.work_ratio != 1.0 or \
                         demographic.play_ratio != 1.0:
                     w = w.scale(work_ratio=demographic.work_ratio,
-                                play_ratio=demographic.play_ratio)
+                                play_ratio=demographic.play_ratio,
+                                nthreads=nthreads)
 
                 wardss[i] = w
                 input_files[i] = key
@@ -678,7 +686,9 @@ follow the instructions at
             worker_pop += wards.num_workers()
             player_pop += wards.num_players()
 
-        overall, wardss = Wards.harmonise(wardss)
+        # harmonise the columns directly, as this is linear in the
+        # number of links and doesn't create any Ward objects
+        overall, wardss = WardsColumns.harmonise(wardss, nthreads=nthreads)
 
         assert overall.population() == total_pop
         assert overall.num_workers() == worker_pop
@@ -717,6 +727,10 @@ follow the instructions at
         networks.subnets = subnets
         networks.demographics = deepcopy(self)
 
+        # the subnets were built separately, so hold only one copy
+        # of any topology that is the same as the overall network
+        networks.share_topology()
+
         return networks
 
     def specialise(self, network: Network, profiler: Profiler = None,
@@ -38,6 +38,21 @@ class Infections:
     #: overall network
     _stage_mapping = None
 
+    #: The sorted indexes of the work links that may have infections
+    #: in each disease stage (a superset of the non-zero entries of
+    #: work[i]). An entry of None means that this must be rebuilt
+    _active_work = None
+
+    #: The sorted indexes of the wards that may have play infections
+    #: in each disease stage (a superset of the non-zero entries of
+    #: play[i]). An entry of None means that this must be rebuilt
+    _active_play = None
+
+    #: The cost (number of random draws) of each link or ward recorded
+    #: by each iterator, used to balance the work between threads on
+    #: the next day (see utils.set_thread_schedule)
+    _thread_costs = None
+
     @property
     def N_INF_CLASSES(self) -> int:
         """The total number of stages in the disease"""
@@ -99,6 +114,9 @@ class Infections:
             inf._ifrom = network.links.ifrom
             inf._ito = network.links.ito
 
+            # no infections yet, so nothing is active
+            inf._clear_active()
+
             if overall is not None:
                 inf._set_stage_mapping(network.params.disease_params,
                                        overall.params.disease_params)
@@ -196,6 +214,133 @@ class Infections:
                              play_infections=self.play,
                              nthreads=nthreads)
 
+        self._clear_active()
+
         if self.subinfs is not None:
             for subinf in self.subinfs:
                 subinf.clear(nthreads=nthreads)
+
+    def _clear_active(self):
+        """Set the active sets to empty, as there are no infections,
+           and forget the recorded thread costs
+        """
+        from array import array
+
+        self._thread_costs = None
+
+        self._active_work = [array("i") for _ in range(self.N_INF_CLASSES)]
+        self._active_play = [array("i") for _ in range(self.N_INF_CLASSES)]
+
+    def get_active_work(self, stage: int, nthreads: int = 1):
+        """Return the sorted array of the indexes of work links that may
+           have infections in disease stage 'stage'. All links with
+           non-zero infections are included. This lets kernels visit
+           only the infected links rather than the whole network
+
+           Parameters
+           ----------
+           stage: int
+             The disease stage
+           nthreads: int
+             The number of threads to use if this has to be rebuilt
+
+           Returns
+           -------
+           active: array
+             The sorted indexes (1-indexed) of the active links
+        """
+        if self._active_work is None:
+            self._active_work = [None] * self.N_INF_CLASSES
+
+        active = self._active_work[stage]
+
+        if active is None:
+            from .utils._active_infections import find_active_infections
+            active = find_active_infections(self.work[stage],
+                                            nthreads=nthreads)
+            self._active_work[stage] = active
+
+        return active
+
+    def get_active_play(self, stage: int, nthreads: int = 1):
+        """Return the sorted array of the indexes of wards that may
+           have play infections in disease stage 'stage'. All wards with
+           non-zero infections are included.
+
+           Parameters
+           ----------
+           stage: int
+             The disease stage
+           nthreads: int
+             The number of threads to use if this has to be rebuilt
+
+           Returns
+           -------
+           active: array
+             The sorted indexes (1-indexed) of the active wards
+        """
+        if self._active_play is None:
+            self._active_play = [None] * self.N_INF_CLASSES
+
+        active = self._active_play[stage]
+
+        if active is None:
+            from .utils._active_infections import find_active_infections
+            active = find_active_infections(self.play[stage],
+                                            nthreads=nthreads)
+            self._active_play[stage] = active
+
+        return active
+
+    def set_active(self, stage: int, work=None, play=None):
+        """Set the active work links and/or play wards for disease
+           stage 'stage'. These must be sorted, and must include
+           all links (or wards) with non-zero infections
+        """
+        if work is not None:
+            if self._active_work is None:
+                self._active_work = [None] * self.N_INF_CLASSES
+
+            self._active_work[stage] = work
+
+        if play is not None:
+            if self._active_play is None:
+                self._active_play = [None] * self.N_INF_CLASSES
+
+            self._active_play[stage] = play
+
+    def invalidate_active(self, stage: int = None, work: bool = True,
+                          play: bool = True, subinfs: bool = True):
+        """Say that the infections have been changed outside of the
+           kernels that keep the active sets up to date, so that
+           the active sets will be rebuilt when they are next needed.
+           You must call this if you change 'work' or 'play' directly
+
+           Parameters
+           ----------
+           stage: int
+             The disease stage that has changed, or None if all stages
+             may have changed
+           work: bool
+             Whether the work infections have changed
+           play: bool
+             Whether the play infections have changed
+           subinfs: bool
+             Whether to also invalidate the demographic sub-infections
+        """
+        if stage is None:
+            if work:
+                self._active_work = None
+
+            if play:
+                self._active_play = None
+        else:
+            if work and self._active_work is not None:
+                self._active_work[stage] = None
+
+            if play and self._active_play is not None:
+                self._active_play[stage] = None
+
+        if subinfs and self.subinfs is not None:
+            for subinf in self.subinfs:
+                subinf.invalidate_active(stage=stage, work=work, play=play)
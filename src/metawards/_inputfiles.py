@@ -21,6 +21,11 @@ def _is_description_json(json_file):
     if not (os.path.exists(json_file) and os.path.isfile(json_file)):
         return False
 
+    from .utils._wards_columns import is_wards_binary
+
+    if is_wards_binary(json_file):
+        return False
+
     try:
         import bz2
         with bz2.open(json_file, "rt") as FILE:
@@ -90,6 +90,22 @@ class Network:
     #: network
     _work_index = None
 
+    #: The cached masks of the links that are within the distance
+    #: cutoff (see utils.get_cutoff_masks)
+    _cutoff_masks = None
+
+    #: The cached spatial index of the ward positions
+    #: (see Network.get_spatial_index)
+    _spatial_index = None
+
+    #: The cached index used to reduce the force of infection in
+    #: parallel over wards (see utils.get_ward_reduction)
+    _ward_reduction = None
+
+    #: The cached per-ward alias tables used to sample the play
+    #: movements (see utils.get_play_alias_tables)
+    _play_alias_tables = None
+
     @property
     def population(self) -> int:
         """Return the total population in the network"""
@@ -149,13 +165,20 @@ class Network:
               max_nodes: int = 16384,
               max_links: int = 4194304,
               nthreads: int = 1,
-              profiler=None):
+              profiler=None,
+              cache_dir: str = None):
         """Builds and returns a new Network that is described by the
            passed parameters.
 
            The network is built in allocated memory, so you need to specify
            the maximum possible number of nodes and links. The memory buffers
            will be shrunk back after building.
+
+           If 'cache_dir' is set (or the environment variable
+           METAWARDS_NETWORK_CACHE is set) then the compiled network
+           is saved to, and loaded from, a binary cache in that directory.
+           This is keyed by the contents of the input files, so
+           subsequent builds skip parsing the input files entirely.
         """
         if profiler is None:
             from .utils import NullProfiler
@@ -171,8 +194,15 @@ class Network:
                           "MetaWardsData")
             raise AssertionError("You must specify the model to run")
         elif params.input_files.is_wards_data:
-            from ._wards import Wards
-            wards = Wards.from_json(params.input_files.wards_data)
+            from .utils._wards_columns import is_wards_binary
+
+            if is_wards_binary(params.input_files.wards_data):
+                # build directly from the binary columns
+                wards = params.input_files.wards_data
+            else:
+                from ._wards import Wards
+                wards = Wards.from_json(params.input_files.wards_data)
+
             network = Network.from_wards(wards, params=params,
                                          profiler=p, nthreads=nthreads)
             network.params.input_files = params.input_files
@@ -190,31 +220,44 @@ class Network:
             p.stop()
             return network
 
-        p = p.start("build_function")
-        from .utils import build_wards_network
-        network = build_wards_network(params=params,
-                                      profiler=p,
-                                      max_nodes=max_nodes,
-                                      max_links=max_links,
-                                      nthreads=nthreads)
-        p = p.stop()
+        from .utils._network_cache import load_network_cache, \
+            save_network_cache
+        network = load_network_cache(params.input_files,
+                                     cache_dir=cache_dir, profiler=p)
 
-        # sanity-check that the network makes sense - there are specific
-        # requirements for the data layout
-        network.assert_sane(profiler=p)
+        from .utils._console import Console
 
-        p = p.start("add_distances")
-        from .utils._add_wards_network_distance \
-            import add_wards_network_distance
-        add_wards_network_distance(network, nthreads=nthreads)
+        if network is None:
+            p = p.start("build_function")
+            from .utils import build_wards_network
+            network = build_wards_network(params=params,
+                                          profiler=p,
+                                          max_nodes=max_nodes,
+                                          max_links=max_links,
+                                          nthreads=nthreads)
+            p = p.stop()
 
-        from .utils._console import Console
-        p = p.stop()
+            # sanity-check that the network makes sense - there are specific
+            # requirements for the data layout
+            network.assert_sane(profiler=p)
 
-        # add metadata about the wards
-        p = p.start("add_lookup")
-        network._add_lookup(nthreads=nthreads)
-        p = p.stop()
+            p = p.start("add_distances")
+            from .utils._add_wards_network_distance \
+                import add_wards_network_distance
+            add_wards_network_distance(network, nthreads=nthreads)
+            p = p.stop()
+
+            # add metadata about the wards
+            p = p.start("add_lookup")
+            network._add_lookup(nthreads=nthreads)
+            p = p.stop()
+
+            p = p.start("save_network_cache")
+            save_network_cache(network, input_files=params.input_files,
+                               cache_dir=cache_dir)
+            p = p.stop()
+        else:
+            network.params = params
 
         if params.input_files.seed:
             from .utils import read_done_file
@@ -268,6 +311,47 @@ class Network:
 
         return network
 
+    def get_spatial_index(self):
+        """Return the spatial index (a kd-tree) over the positions
+           of the wards in this network. This is built on first use
+           and then cached, so can be used to quickly find e.g. all
+           wards within a radius of a point, or the k wards nearest
+           to a point (see utils.SpatialIndex)
+        """
+        index = self._spatial_index
+
+        if index is None or not index.is_valid_for(self):
+            from .utils._spatial_index import SpatialIndex
+            index = SpatialIndex(self)
+            self._spatial_index = index
+
+        return index
+
+    def snapshot(self):
+        """Return a snapshot of the mutable state of this Network
+           (a NetworkSnapshot). This can be passed to
+           Network.restore to reset the network back to this
+           state between runs, without the allocation and copying
+           of Network.copy()
+        """
+        from .utils._network_snapshot import NetworkSnapshot
+        return NetworkSnapshot(self)
+
+    def restore(self, snapshot, check_dirty: bool = False):
+        """Restore this Network to the state held in the passed
+           snapshot (from Network.snapshot). This copies the
+           snapshot back into the existing arrays of this network.
+           If 'check_dirty' is True then only the parts of the arrays
+           that have changed since the snapshot are written.
+
+           Returns
+           -------
+           network: Network
+             This network, restored to the state of the snapshot
+        """
+        snapshot.restore(self, check_dirty=check_dirty)
+        return self
+
     def assert_sane(self, profiler: None):
         """Assert that this network is sane. This checks that the network
            is laid out correctly in memory and that it doesn't have
@@ -593,13 +677,25 @@ class Network:
         from .utils._network_wards import save_to_wards
         return save_to_wards(self, profiler=profiler, nthreads=nthreads)
 
+    def to_wards_columns(self, profiler=None, nthreads: int = 1):
+        """Return the ward-level data in this network converted to
+           a WardsColumns object. This is much quicker than to_wards
+           as no intermediate Ward objects are created
+        """
+        from .utils._network_wards import save_to_wards_columns
+        return save_to_wards_columns(self, profiler=profiler,
+                                     nthreads=nthreads)
+
     @staticmethod
     def from_wards(wards, params: Parameters = None,
                    disease: Disease = None,
                    profiler=None,
                    nthreads: int = 1):
         """Construct a Network from the passed Wards object(e.g. after
-           editing, or restoring from JSON
+           editing, or restoring from JSON. This can also be a
+           WardsColumns, or the name of a binary wards file (from
+           Wards.to_binary), which are converted directly without
+           creating the intermediate Ward objects
         """
         from .utils._network_wards import load_from_wards
         return load_from_wards(wards, params=params, disease=disease,
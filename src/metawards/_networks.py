@@ -189,6 +189,11 @@ class Networks:
         result.subnets = subnets
         result.demographics = demographics
 
+        # the subnets are specialised copies of the overall network,
+        # so must all share its topology
+        result.share_topology()
+        assert result.has_shared_topology()
+
         p = p.stop()
 
         return result
@@ -212,6 +217,106 @@ class Networks:
 
         return networks
 
+    def snapshot(self):
+        """Return a snapshot of the mutable state of these Networks,
+           which can be passed to Networks.restore to reset them
+           between runs (see Network.snapshot)
+        """
+        return {"overall": self.overall.snapshot(),
+                "subnets": [subnet.snapshot() for subnet in self.subnets],
+                "demographics": self.demographics.copy()}
+
+    def restore(self, snapshot, check_dirty: bool = False):
+        """Restore these Networks to the state held in the passed
+           snapshot (from Networks.snapshot)
+
+           Returns
+           -------
+           networks: Networks
+             These networks, restored to the state of the snapshot
+        """
+        self.overall.restore(snapshot["overall"], check_dirty=check_dirty)
+
+        for subnet, subsnap in zip(self.subnets, snapshot["subnets"]):
+            subnet.restore(subsnap, check_dirty=check_dirty)
+
+        self.demographics = snapshot["demographics"].copy()
+
+        return self
+
+    def share_topology(self) -> int:
+        """Make the demographic sub-networks share the topology
+           (ward labels, positions, link indexes and distances) of the
+           overall network, so that this is held only once in memory.
+           Sub-networks made by specialising the overall network
+           already share it, while those built from (harmonised)
+           separate networks share every topology array that has the
+           same contents as that of the overall network. Each
+           sub-network keeps its own populations, weights, FOIs etc.
+
+           Returns
+           -------
+           nbytes: int
+             The number of bytes that are no longer duplicated
+        """
+        if self.overall is None:
+            return 0
+
+        from .utils._shared_network import _shared_node_arrays, \
+            _shared_link_arrays
+
+        overall = self.overall
+        nbytes = 0
+
+        groups = [("nodes", _shared_node_arrays),
+                  ("links", _shared_link_arrays),
+                  ("play", _shared_link_arrays)]
+
+        for subnet in self.subnets:
+            for group, names in groups:
+                shared = getattr(overall, group)
+                target = getattr(subnet, group)
+
+                for name in names:
+                    a = getattr(shared, name)
+                    b = getattr(target, name)
+
+                    if a is b or a is None or b is None:
+                        continue
+
+                    if len(a) == len(b) and a.itemsize == b.itemsize and \
+                            a == b:
+                        setattr(target, name, a)
+                        nbytes += len(b) * b.itemsize
+
+            if subnet.info == overall.info:
+                subnet.info = overall.info
+
+        return nbytes
+
+    def has_shared_topology(self) -> bool:
+        """Return whether all of the demographic sub-networks share
+           the same topology arrays as the overall network
+           (see Networks.share_topology)
+        """
+        from .utils._shared_network import _shared_node_arrays, \
+            _shared_link_arrays
+
+        for subnet in self.subnets:
+            for name in _shared_node_arrays:
+                if getattr(subnet.nodes, name) is not \
+                        getattr(self.overall.nodes, name):
+                    return False
+
+            for name in _shared_link_arrays:
+                if getattr(subnet.links, name) is not \
+                        getattr(self.overall.links, name) or \
+                        getattr(subnet.play, name) is not \
+                        getattr(self.overall.play, name):
+                    return False
+
+        return True
+
     def aggregate(self, profiler=None, nthreads: int = 1):
         """Aggregate all of the sub-network population infection data
            so that this is available in the overall network
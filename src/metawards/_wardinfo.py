@@ -121,6 +121,162 @@ class WardInfo:
 
         return info
 
+#: Characters that have a special meaning in a regular expression.
+#: Search strings without any of these are literal, so can be
+#: looked up using the WardInfos indexes
+_regex_special = set(".^$*+?{}[]\\|()")
+
+
+def _is_literal(name) -> bool:
+    """Return whether or not 'name' is a plain string that can be
+       searched for using the indexes rather than as a regular
+       expression
+    """
+    return isinstance(name, str) and \
+        not any(c in _regex_special for c in name)
+
+
+class _WardInfoIndex:
+    """Lookup index over one group of strings (e.g. the names and
+       codes of wards) of a list of WardInfo objects. This holds
+       an inverted list of the wards that use each string, and
+       sorts the casefolded strings so that prefix matches are
+       a binary search, and substring searches a single scan
+       of a joined string
+    """
+
+    def __init__(self):
+        #: The ward indexes that use each (original) string
+        self.wards = {}
+
+    def add(self, key: str, i: int) -> None:
+        """Record that ward 'i' uses the string 'key'"""
+        wards = self.wards.get(key, None)
+
+        if wards is None:
+            self.wards[key] = [i]
+        elif wards[-1] != i:
+            wards.append(i)
+
+    def finalise(self) -> None:
+        """Build the sorted and joined casefolded strings"""
+        folded = {}
+
+        for key in self.wards.keys():
+            folded.setdefault(key.casefold(), []).append(key)
+
+        #: The sorted casefolded strings, and the original strings
+        #: that casefold to each
+        self.keys = sorted(folded.keys())
+        self.originals = [folded[key] for key in self.keys]
+
+        #: All casefolded strings joined together, with the offset
+        #: of the start of each in 'starts'
+        self.joined = "\0".join(self.keys)
+        self.starts = []
+
+        start = 0
+
+        for key in self.keys:
+            self.starts.append(start)
+            start += len(key) + 1
+
+    def find(self, name: str, match: bool, search) -> _List[int]:
+        """Return the (unsorted) list of the indexes of wards with a
+           string that matches literal 'name'. Candidates are checked
+           against the regular expression 'search' so that the result
+           is exactly the same as a scan using that expression
+        """
+        import bisect
+
+        name = name.casefold()
+
+        if match:
+            # all keys that start with 'name' are contiguous
+            begin = bisect.bisect_left(self.keys, name)
+            candidates = []
+
+            for j in range(begin, len(self.keys)):
+                if not self.keys[j].startswith(name):
+                    break
+
+                candidates.append(j)
+
+        elif len(name) == 0:
+            candidates = range(0, len(self.keys))
+
+        else:
+            candidates = []
+            pos = self.joined.find(name)
+
+            while pos != -1:
+                j = bisect.bisect_right(self.starts, pos) - 1
+
+                if pos + len(name) <= self.starts[j] + len(self.keys[j]):
+                    candidates.append(j)
+                    # move to the start of the next key
+                    if j + 1 >= len(self.starts):
+                        break
+
+                    pos = self.joined.find(name, self.starts[j+1])
+                else:
+                    pos = self.joined.find(name, pos + 1)
+
+        matches = []
+
+        for j in candidates:
+            for key in self.originals[j]:
+                if search(key):
+                    matches += self.wards[key]
+
+        return matches
+
+
+class _WardInfoLookup:
+    """The lookup indexes over all of the WardInfo objects in a
+       WardInfos, which is built on first use
+    """
+
+    def __init__(self, wards: _List[WardInfo]):
+        #: The list (and its size) these were built from, used to
+        #: detect if the list has been replaced or resized
+        self.source = wards
+        self.size = len(wards)
+
+        #: Names and codes of the wards
+        self.ward = _WardInfoIndex()
+        #: Alternate names and codes of the wards
+        self.alternate = _WardInfoIndex()
+        #: Names and codes of the authorities
+        self.authority = _WardInfoIndex()
+        #: Names and codes of the regions
+        self.region = _WardInfoIndex()
+
+        for i, ward in enumerate(wards):
+            if ward is None:
+                continue
+
+            self.ward.add(ward.name, i)
+            self.ward.add(ward.code, i)
+
+            for alternate in ward.alternate_names:
+                self.alternate.add(alternate, i)
+
+            for alternate in ward.alternate_codes:
+                self.alternate.add(alternate, i)
+
+            self.authority.add(ward.authority, i)
+            self.authority.add(ward.authority_code, i)
+            self.region.add(ward.region, i)
+            self.region.add(ward.region_code, i)
+
+        for index in [self.ward, self.alternate, self.authority, self.region]:
+            index.finalise()
+
+    def is_current(self, wards: _List[WardInfo]) -> bool:
+        """Return whether this lookup is still valid for 'wards'"""
+        return self.source is wards and self.size == len(wards)
+
 
 @_dataclass
 class WardInfos:
@@ -134,6 +290,10 @@ class WardInfos:
     #: The index used to speed up lookup of wards
     _index: _Dict[WardInfo, int] = None
 
+    #: The indexes used to speed up find by name, authority or region
+    _lookup: _WardInfoLookup = _field(default=None, compare=False,
+                                      repr=False)
+
     def __len__(self):
         return len(self.wards)
 
@@ -148,6 +308,9 @@ class WardInfos:
                     f"Setting item at index {i} to not a WardInfo {info} "
                     f"is not allowed")
 
+        # the lookup indexes will be rebuilt when next needed
+        self._lookup = None
+
         if i >= len(self.wards):
             self.wards += [None] * (i - len(self.wards) + 1)
             self.wards[i] = info
@@ -190,6 +353,7 @@ class WardInfos:
            called the first time you use the "contains" or "index" functions
         """
         self._index = {}
+        self._lookup = None
 
         for i, ward in enumerate(self.wards):
             if ward is not None:
@@ -226,6 +390,13 @@ class WardInfos:
         else:
             return i
 
+    def _get_lookup(self) -> _WardInfoLookup:
+        """Return the lookup indexes, building them if needed"""
+        if self._lookup is None or not self._lookup.is_current(self.wards):
+            self._lookup = _WardInfoLookup(self.wards)
+
+        return self._lookup
+
     def _find_ward(self, name: str, match: bool, include_alternates: bool):
         """Internal function that flexibly finds a ward by name"""
         import re
@@ -240,6 +411,15 @@ class WardInfos:
         else:
             search = search.search
 
+        if _is_literal(name):
+            lookup = self._get_lookup()
+            matches = lookup.ward.find(name, match, search)
+
+            if include_alternates:
+                matches += lookup.alternate.find(name, match, search)
+
+            return sorted(set(matches))
+
         matches = []
 
         for i, ward in enumerate(self.wards):
@@ -283,6 +463,10 @@ class WardInfos:
         else:
             search = search.search
 
+        if _is_literal(name):
+            lookup = self._get_lookup()
+            return sorted(set(lookup.authority.find(name, match, search)))
+
         matches = []
 
         for i, ward in enumerate(self.wards):
@@ -315,6 +499,10 @@ class WardInfos:
         else:
             search = search.search
 
+        if _is_literal(name):
+            lookup = self._get_lookup()
+            return sorted(set(lookup.region.find(name, match, search)))
+
         matches = []
 
         for i, ward in enumerate(self.wards):
@@ -335,7 +523,8 @@ class WardInfos:
 
     def _intersect(self, list1, list2):
         """Return the intersection of two lists"""
-        return [value for value in list1 if value in list2]
+        values = set(list2)
+        return [value for value in list1 if value in values]
 
     def find(self, name: str = None,
              authority: str = None, region: str = None,
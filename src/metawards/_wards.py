@@ -445,12 +445,32 @@ class Wards:
            where all Wards use IDs that are correct and valid
            across the entire group
         """
-        harmonised = []
-
         for wards in wardss:
             if wards is not None and not isinstance(wards, Wards):
                 raise TypeError(f"Cannot harmonise non-Wards objects")
 
+        if all(wards is None or wards.is_resolved() for wards in wardss):
+            # much quicker to harmonise via the columnar representation,
+            # which gives identical results
+            from .utils._wards_columns import WardsColumns
+
+            overall, harmonised = WardsColumns.harmonise(
+                [WardsColumns.from_wards(wards) for wards in wardss
+                 if wards is not None])
+
+            return (overall.to_wards(), [h.to_wards() for h in harmonised])
+        else:
+            return Wards._harmonise_objects(wardss)
+
+    @staticmethod
+    def _harmonise_objects(wardss: _List['Wards']
+                           ) -> _Tuple['Wards', _List['Wards']]:
+        """Harmonise the passed list of wards ward-by-ward, as
+           Ward objects. This is slow, but supports Wards with
+           unresolved links
+        """
+        harmonised = []
+
         # create the overall Wards that will provide the IDs for all
         overall = Wards()
 
@@ -691,3 +711,43 @@ class Wards:
             raise IOError(f"Cannot load Wards from '{s}'")
 
         return Wards.from_data(data)
+
+    def to_binary(self, filename: str) -> str:
+        """Serialise the wards to a compact, columnar binary file.
+           This is much faster to write and read than JSON, and can
+           be loaded directly into a Network via Network.from_wards
+           (passing the filename) without creating Ward objects.
+
+           Parameters
+           ----------
+           filename: str
+             The name of the file to write
+
+           Returns
+           -------
+           str
+             The absolute path to the written file
+        """
+        from .utils._wards_columns import WardsColumns
+        return WardsColumns.from_wards(self).save(filename)
+
+    @staticmethod
+    def from_binary(filename: str):
+        """Return the Wards loaded from the passed binary file
+           (as written by Wards.to_binary)
+        """
+        from .utils._wards_columns import WardsColumns
+        return WardsColumns.load(filename).to_wards()
+
+    @staticmethod
+    def load(filename: str):
+        """Return the Wards loaded from the passed file, which can
+           either be a binary wards file (from Wards.to_binary) or
+           JSON (from Wards.to_json)
+        """
+        from .utils._wards_columns import is_wards_binary
+
+        if is_wards_binary(filename):
+            return Wards.from_binary(filename)
+        else:
+            return Wards.from_json(filename)
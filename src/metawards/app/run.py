@@ -303,6 +303,16 @@ def parse_args():
     parser.add_argument('--max-links', type=int, default=None,
                         help="Maximum number of links that can be read")
 
+    parser.add_argument('--network-cache', type=str, default=None,
+                        help="Directory in which to cache compiled "
+                             "networks. The first build of a network "
+                             "saves it in a binary format to this "
+                             "directory, so that subsequent builds "
+                             "(including in every worker process) "
+                             "load in milliseconds rather than "
+                             "re-parsing the input files.",
+                        env_var="METAWARDS_NETWORK_CACHE")
+
     parser.add_argument('--profile', action="store_true",
                         default=None, help="Enable profiling of the code")
 
@@ -1130,6 +1140,12 @@ def cli():
     else:
         max_links = int(args.max_links)
 
+    if args.network_cache:
+        # set via the environment so that this is inherited by
+        # all of the worker processes
+        import os
+        os.environ["METAWARDS_NETWORK_CACHE"] = args.network_cache
+
     if args.demographics:
         from metawards import Demographics
         Console.rule("Building the demographic networks")
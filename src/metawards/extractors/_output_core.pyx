@@ -226,6 +226,7 @@ def output_core_omp(network: Network, population: Population,
     disease = network.params.disease_params
 
     # set up main variables
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
     ward_inf_tot = workspace.ward_inf_tot
@@ -276,6 +277,12 @@ def output_core_omp(network: Network, population: Population,
     cdef int ifrom = 0
     cdef int I_start = 0
 
+    # the links with infections in the current stage. All links must
+    # be visited for stage 0 to count the susceptibles
+    cdef int * active_work
+    cdef int nvisit = 0
+    cdef int a = 0
+
     cdef int num_threads = nthreads
     cdef int thread_id = 0
 
@@ -347,6 +354,15 @@ def output_core_omp(network: Network, population: Population,
         # stage
         infections_i = get_int_array_ptr(infections[i])
         play_infections_i = get_int_array_ptr(play_infections[i])
+
+        if i == 0:
+            nvisit = nlinks_plus_one - 1
+            active_work = <int*>0
+        else:
+            work_i = all_infections.get_active_work(i, nthreads=nthreads)
+            nvisit = len(work_i)
+            active_work = get_int_array_ptr(work_i) if nvisit > 0 \
+                                                    else <int*>0
         ward_inf_tot_i = get_int_array_ptr(ward_inf_tot[i])
 
         # now get the "summary" stage into which this stage is mapped
@@ -388,7 +404,12 @@ def output_core_omp(network: Network, population: Population,
 
             # loop over all links and accumulate infections associated
             # with this link
-            for j in prange(1, nlinks_plus_one, schedule="static"):
+            for a in prange(0, nvisit, schedule="static"):
+                if i == 0:
+                    j = a + 1
+                else:
+                    j = active_work[a]
+
                 ifrom = links_ifrom[j]
 
                 if i == 0:
@@ -623,6 +644,7 @@ def output_core_serial(network: Network, population: Population,
     disease = network.params.disease_params
 
     # set up main variables
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
     ward_inf_tot = workspace.ward_inf_tot
@@ -667,6 +689,12 @@ def output_core_serial(network: Network, population: Population,
     cdef int ifrom = 0
     cdef int I_start = 0
 
+    # the links with infections in the current stage. All links must
+    # be visited for stage 0 to count the susceptibles
+    cdef int * active_work
+    cdef int nvisit = 0
+    cdef int a = 0
+
     cdef int n_inf_wards_i = 0
     cdef int total_new_i = 0
     cdef int inf_tot_i = 0
@@ -718,6 +746,15 @@ def output_core_serial(network: Network, population: Population,
         # stage
         infections_i = get_int_array_ptr(infections[i])
         play_infections_i = get_int_array_ptr(play_infections[i])
+
+        if i == 0:
+            nvisit = nlinks_plus_one - 1
+            active_work = <int*>0
+        else:
+            work_i = all_infections.get_active_work(i)
+            nvisit = len(work_i)
+            active_work = get_int_array_ptr(work_i) if nvisit > 0 \
+                                                    else <int*>0
         ward_inf_tot_i = get_int_array_ptr(ward_inf_tot[i])
 
         # now get the "summary" stage into which this stage is mapped
@@ -748,7 +785,12 @@ def output_core_serial(network: Network, population: Population,
         with nogil:
             # loop over all links and accumulate infections associated
             # with this link
-            for j in range(1, nlinks_plus_one):
+            for a in range(0, nvisit):
+                if i == 0:
+                    j = a + 1
+                else:
+                    j = active_work[a]
+
                 ifrom = links_ifrom[j]
 
                 if i == 0:
@@ -13,6 +13,8 @@ Functions
     advance_fixed_omp
     advance_foi
     advance_foi_omp
+    advance_foi_fused
+    advance_foi_fused_omp
     advance_imports
     advance_imports_omp
     advance_infprob
@@ -36,6 +38,7 @@ Functions
 from ._advance_additional import *
 from ._advance_fixed import *
 from ._advance_foi import *
+from ._advance_foi_fused import *
 from ._advance_imports import *
 from ._advance_infprob import *
 from ._advance_play import *
@@ -322,12 +322,12 @@ def advance_additional(network: _Union[Network, Networks],
 
                 seed_network = network.subnets[demographic]
                 seed_wards = seed_network.nodes
-                seed_infections = infections.subinfs[demographic].play
+                seed_infs = infections.subinfs[demographic]
             else:
                 demographic = None
                 seed_network = network
                 seed_wards = seed_network.nodes
-                seed_infections = infections.play
+                seed_infs = infections
 
             try:
                 ward = seed_network.get_node_index(ward)
@@ -352,7 +352,8 @@ def advance_additional(network: _Union[Network, Networks],
                     Console.print(
                         f"seeding play_infections[0][{ward}] += {num}")
 
-                seed_infections[0][ward] += num
+                seed_infs.play[0][ward] += num
+                seed_infs.invalidate_active(0, work=False, subinfs=False)
 
             except Exception as e:
                 Console.error(
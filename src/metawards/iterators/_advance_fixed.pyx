@@ -14,8 +14,13 @@ from ..utils._get_functions import call_function_on_network
 from ..utils._ran_binomial cimport _ran_binomial, \
                                    _get_binomial_ptr, binomial_rng
 
+from ..utils._cutoff_masks import get_cutoff_masks
+
 from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
 
+from ..utils._thread_schedule cimport _thread_begin, _thread_end
+from ..utils._thread_schedule import get_thread_bounds, get_thread_costs
+
 __all__ = ["advance_fixed", "advance_fixed_omp",
            "advance_fixed_serial"]
 
@@ -46,13 +51,13 @@ def advance_fixed_omp(network: Network, infections, rngs,
     wards = network.nodes
     params = network.params
 
+    all_infections = infections
     infections = infections.work
 
     # Copy arguments from Python into C cdef variables
     cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
     cdef int * links_ito = get_int_array_ptr(links.ito)
 
-    cdef double * links_distance = get_double_array_ptr(links.distance)
     cdef double * links_suscept = get_double_array_ptr(links.suscept)
 
     cdef double * wards_day_foi = get_double_array_ptr(wards.day_foi)
@@ -60,10 +65,11 @@ def advance_fixed_omp(network: Network, infections, rngs,
     cdef double * wards_night_inf_prob = get_double_array_ptr(
                                                         wards.night_inf_prob)
 
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
-
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=nthreads)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
 
     # Pointer to the infections array - only need [0] as this loop
     # is creating new infections
@@ -83,7 +89,19 @@ def advance_fixed_omp(network: Network, infections, rngs,
     cdef int nlinks_plus_one = network.nlinks + 1
 
     cdef double inf_prob = 0.0
-    cdef double distance = 0.0
+
+    # the cost of each link is the number of random draws it needed
+    # on the previous day - this is used to balance the work between
+    # threads (see set_thread_schedule)
+    thread_costs = get_thread_costs(all_infections, "fixed", nlinks_plus_one)
+    thread_bounds = get_thread_bounds(nthreads, 1, nlinks_plus_one,
+                                      costs=thread_costs)
+
+    cdef bint record_costs = thread_costs is not None
+    cdef int * costs = get_int_array_ptr(thread_costs) if record_costs \
+                                                       else <int*>0
+    cdef int * bounds = get_int_array_ptr(thread_bounds)
+    cdef int ndraws = 0
 
     ## Finally(!) we can now declare the actual loop.
     ## This loops in parallel over all links between
@@ -95,18 +113,16 @@ def advance_fixed_omp(network: Network, infections, rngs,
         thread_id = cython.parallel.threadid()
         rng = _get_binomial_ptr(rngs_view[thread_id])
 
-        for j in prange(1, nlinks_plus_one, schedule="static"):
+        for j in range(_thread_begin(bounds, num_threads),
+                       _thread_end(bounds, num_threads)):
             # actual new infections for fixed movements
             inf_prob = 0
+            ndraws = 0
 
             ifrom = links_ifrom[j]
             ito = links_ito[j]
-            distance = links_distance[j]
-
-            local_cutoff = min(cutoff, wards_cutoff[ifrom])
-            local_cutoff = min(local_cutoff, wards_cutoff[ito])
 
-            if distance < local_cutoff:
+            if links_all_in_cutoff or links_in_cutoff[j]:
                 # distance is below cutoff (reasonable distance)
                 # infect in work ward
                 if wards_day_foi[ito] > 0:
@@ -122,6 +138,7 @@ def advance_fixed_omp(network: Network, infections, rngs,
             if inf_prob > 0.0:
                 # daytime infection of workers
                 l = _ran_binomial(rng, inf_prob, <int>(links_suscept[j]))
+                ndraws = ndraws + 1
 
                 if l > 0:
                     # actual infection
@@ -134,6 +151,7 @@ def advance_fixed_omp(network: Network, infections, rngs,
 
             if inf_prob > 0.0:
                 l = _ran_binomial(rng, inf_prob, <int>(links_suscept[j]))
+                ndraws = ndraws + 1
 
                 #if l > links_suscept[j]:
                 #    print(f"l > links[{j}].suscept {links_suscept[j]} nighttime")
@@ -144,10 +162,16 @@ def advance_fixed_omp(network: Network, infections, rngs,
                     infections_i[j] += l
                     links_suscept[j] -= l
             # end of wards.night_foi[ifrom] > 0  (nighttime infections)
+
+            if record_costs:
+                costs[j] = ndraws
         # end of loop over all network links
     # end of parallel section
     p = p.stop()
 
+    # new infections may have been added anywhere in stage 0
+    all_infections.invalidate_active(0, play=False, subinfs=False)
+
 
 def advance_fixed_serial(network: Network, infections, rngs,
                          profiler: Profiler, **kwargs):
@@ -173,13 +197,13 @@ def advance_fixed_serial(network: Network, infections, rngs,
     wards = network.nodes
     params = network.params
 
+    all_infections = infections
     infections = infections.work
 
     # Copy arguments from Python into C cdef variables
     cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
     cdef int * links_ito = get_int_array_ptr(links.ito)
 
-    cdef double * links_distance = get_double_array_ptr(links.distance)
     cdef double * links_suscept = get_double_array_ptr(links.suscept)
 
     cdef double * wards_day_foi = get_double_array_ptr(wards.day_foi)
@@ -187,10 +211,11 @@ def advance_fixed_serial(network: Network, infections, rngs,
     cdef double * wards_night_inf_prob = get_double_array_ptr(
                                                         wards.night_inf_prob)
 
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
-
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=1)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
 
     # Pointer to the infections array - only need [0] as this loop
     # is creating new infections
@@ -207,7 +232,6 @@ def advance_fixed_serial(network: Network, infections, rngs,
     cdef int nlinks_plus_one = network.nlinks + 1
 
     cdef double inf_prob = 0.0
-    cdef double distance = 0.0
 
     ## Finally(!) we can now declare the actual loop.
     ## This loops in parallel over all links between
@@ -222,12 +246,8 @@ def advance_fixed_serial(network: Network, infections, rngs,
 
             ifrom = links_ifrom[j]
             ito = links_ito[j]
-            distance = links_distance[j]
 
-            local_cutoff = min(cutoff, wards_cutoff[ifrom])
-            local_cutoff = min(local_cutoff, wards_cutoff[ito])
-
-            if distance < local_cutoff:
+            if links_all_in_cutoff or links_in_cutoff[j]:
                 # distance is below cutoff (reasonable distance)
                 # infect in work ward
                 if wards_day_foi[ito] > 0:
@@ -269,6 +289,9 @@ def advance_fixed_serial(network: Network, infections, rngs,
     # end of parallel section
     p = p.stop()
 
+    # new infections may have been added anywhere in stage 0
+    all_infections.invalidate_active(0, play=False, subinfs=False)
+
 
 def advance_fixed(nthreads: int, **kwargs):
     """Advance the model by triggering infections related to fixed
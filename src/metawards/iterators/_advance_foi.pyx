@@ -6,8 +6,8 @@ cimport cython
 from cython.parallel import parallel, prange
 cimport openmp
 
-from libc.stdlib cimport calloc, free
 from libc.stdint cimport uintptr_t
+from libc.stdlib cimport malloc, free
 from libc.math cimport cos, pi
 
 
@@ -21,100 +21,26 @@ from ..utils._get_functions import call_function_on_network
 from ..utils._ran_binomial cimport _ran_binomial, \
                                    _get_binomial_ptr, binomial_rng
 
-from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
-
-__all__ = ["advance_foi", "advance_foi_omp", "advance_foi_serial"]
-
-
-cdef struct foi_buffer:
-    int count
-    int *index
-    double *foi
-    foi_buffer *next_buffer
-
-
-cdef foi_buffer* allocate_foi_buffer(int buffer_size=4096) nogil:
-
-    cdef int size = buffer_size
-    cdef foi_buffer *buffer = <foi_buffer *> calloc(1, sizeof(foi_buffer))
-
-    buffer[0].count = 0
-    buffer[0].index = <int *> calloc(size, sizeof(int))
-    buffer[0].foi = <double *> calloc(size, sizeof(double))
-    buffer[0].next_buffer = <foi_buffer*>0
-
-    return buffer
-
-
-cdef foi_buffer* allocate_foi_buffers(int nthreads,
-                                      int buffer_size=4096) nogil:
-    cdef int size = buffer_size
-    cdef int n = nthreads
-
-    cdef foi_buffer *buffers = <foi_buffer *> calloc(n, sizeof(foi_buffer))
-
-    for i in range(0, nthreads):
-        buffers[i].count = 0
-        buffers[i].index = <int *> calloc(size, sizeof(int))
-        buffers[i].foi = <double *> calloc(size, sizeof(double))
-        buffers[i].next_buffer = <foi_buffer*>0
-
-    return buffers
-
+from ..utils._cutoff_masks import get_cutoff_masks
 
-cdef void free_foi_buffer(foi_buffer *buffer) nogil:
-    if buffer:
-        free(buffer[0].index)
-        buffer[0].index = <int *>0
-        free(buffer[0].foi)
-        buffer[0].foi = <double *>0
+from ..utils._foi_reduction import use_ward_reduction, get_ward_reduction, \
+                                   reduce_work_foi, reduce_play_foi
 
-        if buffer[0].next_buffer:
-            free_foi_buffer(buffer[0].next_buffer)
-            free(buffer[0].next_buffer)
-            buffer[0].next_buffer = <foi_buffer *>0
+from ..utils._play_sampler cimport _use_play_alias, _sample_play_alias, \
+                                   PLAY_ALIAS_MAX_N
+from ..utils._play_sampler import get_play_sampler_id, \
+                                  get_play_alias_tables
 
+from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
 
-cdef void free_foi_buffers(foi_buffer *buffers, int nthreads) nogil:
-    cdef int n = nthreads
-
-    for i in range(0, nthreads):
-        free_foi_buffer(&(buffers[i]))
-
-    free(buffers)
-
-
-cdef void add_from_buffer(foi_buffer *buffer, double *wards_foi) nogil:
-    cdef int i = 0
-    cdef int count = buffer[0].count
-
-    for i in range(0, count):
-        wards_foi[buffer[0].index[i]] += buffer[0].foi[i]
-
-    if buffer[0].next_buffer:
-        add_from_buffer(buffer[0].next_buffer, wards_foi)
-
-    # added all of buffer, so set count to 0 to empty
-    buffer[0].count = 0
-
-
-cdef inline void add_to_buffer(foi_buffer *buffer, int index, double value,
-                               double *wards_foi,
-                               int buffer_size=4096) nogil:
-
-    cdef int count = buffer[0].count
+from ..utils._thread_schedule cimport _thread_begin, _thread_end
+from ..utils._thread_schedule import get_thread_bounds, get_thread_costs
 
-    if buffer[0].count >= buffer_size:
-        # we need to allocate another buffer and set to use that
-        if not buffer[0].next_buffer:
-            buffer[0].next_buffer = allocate_foi_buffer(buffer_size)
+from ._foi_buffer cimport foi_buffer, allocate_foi_buffers, \
+                          free_foi_buffers, add_to_buffer, \
+                          add_from_buffer
 
-        add_to_buffer(buffer[0].next_buffer, index, value,
-                      wards_foi, buffer_size)
-    else:
-        buffer[0].index[count] = index
-        buffer[0].foi[count] = value
-        buffer[0].count = count + 1
+__all__ = ["advance_foi", "advance_foi_omp", "advance_foi_serial"]
 
 
 def advance_foi_omp(network: Network, population: Population,
@@ -166,6 +92,7 @@ def advance_foi_omp(network: Network, population: Population,
     except Exception:
         pass
 
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
 
@@ -176,7 +103,6 @@ def advance_foi_omp(network: Network, population: Population,
     cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
 
     cdef double * wards_scale_uv = get_double_array_ptr(wards.scale_uv)
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
     cdef double * wards_bg_foi = get_double_array_ptr(wards.bg_foi)
 
     cdef double * links_weight = get_double_array_ptr(links.weight)
@@ -191,11 +117,13 @@ def advance_foi_omp(network: Network, population: Population,
     cdef int * wards_begin_p = get_int_array_ptr(wards.begin_p)
     cdef int * wards_end_p = get_int_array_ptr(wards.end_p)
 
-    cdef double * links_distance = get_double_array_ptr(links.distance)
-    cdef double * play_distance = get_double_array_ptr(play.distance)
-
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=nthreads)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
 
     # get the random number generator
     cdef uintptr_t [::1] rngs_view = rngs
@@ -221,6 +149,21 @@ def advance_foi_omp(network: Network, population: Population,
 
     cdef int N_INF_CLASSES = len(infections)
 
+    # only the links and wards with infections in each stage are visited
+    cdef int * active_work
+    cdef int * active_play
+    cdef int nactive_work = 0
+    cdef int nactive_play = 0
+    cdef int a = 0
+
+    # the items visited by each thread, and the recorded cost of
+    # each ward, used to balance the work (see set_thread_schedule)
+    cdef int * work_bounds
+    cdef int * play_bounds
+    cdef int * play_costs = <int*>0
+    cdef bint record_costs = False
+    cdef int ndraws = 0
+
     cdef double weight = 0.0
     cdef double cumulative_prob = 0.0
     cdef double prob_scaled = 0.0
@@ -233,6 +176,39 @@ def advance_foi_omp(network: Network, population: Population,
     cdef foi_buffer * night_buffers = allocate_foi_buffers(num_threads)
     cdef foi_buffer * night_buffer
 
+    # alternatively, each link can store its contribution, which are
+    # then reduced in parallel over the wards (see set_foi_reduction)
+    cdef bint ward_reduce = False
+    cdef double * link_day_from = <double*>0
+    cdef double * link_day_to = <double*>0
+    cdef double * link_night_from = <double*>0
+    cdef double * play_link_day = <double*>0
+
+    reduction = None
+
+    # per-ward alias tables used to sample the play movements of
+    # small numbers of individuals (see set_play_sampler)
+    alias_tables = get_play_alias_tables(network)
+    cdef int sampler = get_play_sampler_id()
+    cdef int * alias_begin = <int*>0
+    cdef double * alias_prob = <double*>0
+    cdef int * alias_index = <int*>0
+    cdef int * slots
+    cdef int * counts
+    cdef int nslots = 0
+    cdef int islot = 0
+    cdef int itable = 0
+
+    if alias_tables is not None:
+        alias_begin = get_int_array_ptr(alias_tables["begin"])
+        alias_prob = get_double_array_ptr(alias_tables["prob"])
+        alias_index = get_int_array_ptr(alias_tables["alias"])
+    else:
+        sampler = 0
+
+    cdef int * play_scratch = <int *> malloc(2 * PLAY_ALIAS_MAX_N *
+                                             num_threads * sizeof(int))
+
     ## Finally(!) we can now declare the actual loop.
     ## This loops over all disease stages, and then in
     ## parallel over all wards and all links to then
@@ -262,7 +238,35 @@ def advance_foi_omp(network: Network, population: Population,
         play_infections_i = get_int_array_ptr(play_infections[i])
 
         if scl_foi_uv > 0:
+            work_i = all_infections.get_active_work(i, nthreads=nthreads)
+            play_i = all_infections.get_active_play(i, nthreads=nthreads)
+            nactive_work = len(work_i)
+            nactive_play = len(play_i)
+            active_work = get_int_array_ptr(work_i) if nactive_work > 0 \
+                                                    else <int*>0
+            active_play = get_int_array_ptr(play_i) if nactive_play > 0 \
+                                                    else <int*>0
+
             p = p.start(f"work_{i}")
+            # each infected link needs one random draw
+            work_thread_bounds = get_thread_bounds(nthreads, 1,
+                                                   nlinks_plus_one,
+                                                   active=work_i)
+            work_bounds = get_int_array_ptr(work_thread_bounds)
+
+            # each infected link contributes up to three fois
+            ward_reduce = use_ward_reduction(ncontribs=3 * nactive_work,
+                                             nlinks=network.nlinks,
+                                             nnodes=network.nnodes,
+                                             nthreads=nthreads)
+
+            if ward_reduce:
+                reduction = get_ward_reduction(network)
+                link_day_from = get_double_array_ptr(reduction["day_from"])
+                link_day_to = get_double_array_ptr(reduction["day_to"])
+                link_night_from = get_double_array_ptr(
+                                                reduction["night_from"])
+
             with nogil, parallel(num_threads=num_threads):
                 thread_id = cython.parallel.threadid()
                 rng = _get_binomial_ptr(rngs_view[thread_id])
@@ -271,7 +275,10 @@ def advance_foi_omp(network: Network, population: Population,
                 day_buffer[0].count = 0
                 night_buffer[0].count = 0
 
-                for j in prange(1, nlinks_plus_one, schedule="static"):
+                # visit this thread's share of the active links
+                for a in range(_thread_begin(work_bounds, num_threads),
+                               _thread_end(work_bounds, num_threads)):
+                    j = active_work[a]
                     # deterministic movements (e.g. to work)
                     inf_ij = infections_i[j]
                     if inf_ij > 0:
@@ -279,12 +286,7 @@ def advance_foi_omp(network: Network, population: Population,
                         ifrom = links_ifrom[j]
                         ito = links_ito[j]
 
-                        local_cutoff = min(wards_cutoff[ifrom],
-                                           wards_cutoff[ito])
-
-                        local_cutoff = min(cutoff, local_cutoff)
-
-                        if links_distance[j] < local_cutoff:
+                        if links_all_in_cutoff or links_in_cutoff[j]:
                             # number staying - this is G_ij
                             staying = _ran_binomial(rng,
                                                     too_ill_to_move,
@@ -294,10 +296,15 @@ def advance_foi_omp(network: Network, population: Population,
                             moving = inf_ij - staying
 
                             if staying > 0:
-                                add_to_buffer(day_buffer, ifrom,
-                                              staying * scl_foi_uv *
-                                              wards_scale_uv[ifrom],
-                                              &(wards_day_foi[0]))
+                                if ward_reduce:
+                                    link_day_from[j] = \
+                                            staying * scl_foi_uv * \
+                                            wards_scale_uv[ifrom]
+                                else:
+                                    add_to_buffer(day_buffer, ifrom,
+                                                  staying * scl_foi_uv *
+                                                  wards_scale_uv[ifrom],
+                                                  &(wards_day_foi[0]))
 
                             # Daytime Force of
                             # Infection is proportional to
@@ -305,26 +312,41 @@ def advance_foi_omp(network: Network, population: Population,
                             # in the ward (too ill to work)
                             # this is the sum for all G_ij (including g_ii
                             if moving > 0:
-                                add_to_buffer(day_buffer, ito,
-                                              moving * scl_foi_uv *
-                                              wards_scale_uv[ito],
-                                              &(wards_day_foi[0]))
+                                if ward_reduce:
+                                    link_day_to[j] = \
+                                            moving * scl_foi_uv * \
+                                            wards_scale_uv[ito]
+                                else:
+                                    add_to_buffer(day_buffer, ito,
+                                                  moving * scl_foi_uv *
+                                                  wards_scale_uv[ito],
+                                                  &(wards_day_foi[0]))
 
                             # Daytime FOI for destination is incremented
                             # (including self links, I_ii)
                         else:
                             # outside cutoff
                             if inf_ij > 0:
-                                add_to_buffer(day_buffer, ifrom,
-                                              inf_ij * scl_foi_uv *
-                                              wards_scale_uv[ifrom],
-                                              &(wards_day_foi[0]))
+                                if ward_reduce:
+                                    link_day_from[j] = \
+                                            inf_ij * scl_foi_uv * \
+                                            wards_scale_uv[ifrom]
+                                else:
+                                    add_to_buffer(day_buffer, ifrom,
+                                                  inf_ij * scl_foi_uv *
+                                                  wards_scale_uv[ifrom],
+                                                  &(wards_day_foi[0]))
 
                         if inf_ij > 0:
-                            add_to_buffer(night_buffer, ifrom,
-                                          inf_ij * scl_foi_uv *
-                                          wards_scale_uv[ifrom],
-                                          &(wards_night_foi[0]))
+                            if ward_reduce:
+                                link_night_from[j] = \
+                                            inf_ij * scl_foi_uv * \
+                                            wards_scale_uv[ifrom]
+                            else:
+                                add_to_buffer(night_buffer, ifrom,
+                                              inf_ij * scl_foi_uv *
+                                              wards_scale_uv[ifrom],
+                                              &(wards_night_foi[0]))
                         #wards_night_foi[ifrom] += inf_ij * scl_foi_uv
 
                         # Nighttime Force of Infection is
@@ -336,43 +358,113 @@ def advance_foi_omp(network: Network, population: Population,
                 # end of infectious class loop
             # end of parallel section
 
-            # do the reduction in serial in a deterministic order
-            for j in range(0, num_threads):
-                add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
-                add_from_buffer(&(night_buffers[j]), &(wards_night_foi[0]))
+            if ward_reduce:
+                # reduce in parallel over wards in a deterministic order
+                reduce_work_foi(reduction, wards.day_foi, wards.night_foi,
+                                nthreads=nthreads)
+            else:
+                # do the reduction in serial in a deterministic order
+                for j in range(0, num_threads):
+                    add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
+                    add_from_buffer(&(night_buffers[j]),
+                                    &(wards_night_foi[0]))
 
             p = p.stop()
 
             p = p.start(f"play_{i}")
+            # the cost of each ward is the number of random draws
+            # needed to distribute its players on the previous day
+            play_thread_costs = get_thread_costs(all_infections,
+                                                 f"foi_play_{i}",
+                                                 nnodes_plus_one)
+            record_costs = play_thread_costs is not None
+
+            if record_costs:
+                play_costs = get_int_array_ptr(play_thread_costs)
+
+            play_thread_bounds = get_thread_bounds(nthreads, 1,
+                                                   nnodes_plus_one,
+                                                   active=play_i,
+                                                   costs=play_thread_costs)
+            play_bounds = get_int_array_ptr(play_thread_bounds)
+
+            # each infected ward contributes to each of its play links
+            ward_reduce = use_ward_reduction(
+                            ncontribs=(nactive_play * network.nplay) //
+                                      max(1, network.nnodes),
+                            nlinks=network.nplay, nnodes=network.nnodes,
+                            nthreads=nthreads)
+
+            if ward_reduce:
+                reduction = get_ward_reduction(network)
+                play_link_day = get_double_array_ptr(reduction["play_day"])
+
             with nogil, parallel(num_threads=num_threads):
                 thread_id = cython.parallel.threadid()
                 rng = _get_binomial_ptr(rngs_view[thread_id])
                 day_buffer = &(day_buffers[thread_id])
                 day_buffer[0].count = 0
+                slots = &(play_scratch[2 * PLAY_ALIAS_MAX_N * thread_id])
+                counts = &(slots[PLAY_ALIAS_MAX_N])
 
-                for j in prange(1, nnodes_plus_one, schedule="static"):
+                for a in range(_thread_begin(play_bounds, num_threads),
+                               _thread_end(play_bounds, num_threads)):
+                    j = active_play[a]
                     # playmatrix loop FOI loop (random/unpredictable movements)
                     inf_ij = play_infections_i[j]
+                    ndraws = 0
+
                     if inf_ij > 0:
                         wards_night_foi[j] += inf_ij * scl_foi_uv * \
                                               wards_scale_uv[j]
 
                         staying = _ran_binomial(rng, play_at_home_scl, inf_ij)
                         moving = inf_ij - staying
+                        ndraws = 1
 
                         cumulative_prob = 0.0
                         k = wards_begin_p[j]
 
                         end_p = wards_end_p[j]
 
+                        if _use_play_alias(sampler, moving, end_p - k):
+                            # sample each individual from the alias table
+                            itable = alias_begin[j]
+                            nslots = _sample_play_alias(rng, moving, end_p - k,
+                                                        &(alias_prob[itable]),
+                                                        &(alias_index[itable]),
+                                                        slots, counts)
+                            ndraws = ndraws + moving
+
+                            for islot in range(0, nslots):
+                                k = wards_begin_p[j] + slots[islot]
+
+                                # the last slot is 'not moving to any link'
+                                if k < end_p and (play_all_in_cutoff or
+                                                  play_in_cutoff[k]):
+                                    ito = play_ito[k]
+                                    play_move = counts[islot]
+
+                                    if ward_reduce:
+                                        play_link_day[k] = \
+                                                play_move * scl_foi_uv * \
+                                                wards_scale_uv[ito]
+                                    else:
+                                        add_to_buffer(day_buffer, ito,
+                                                      play_move * scl_foi_uv *
+                                                      wards_scale_uv[ito],
+                                                      &(wards_day_foi[0]))
+
+                                    moving = moving - play_move
+
+                            k = end_p
+
                         while (moving > 0) and (k < end_p):
                             # distributing people across play wards
                             ifrom = play_ifrom[k]
                             ito = play_ito[k]
-                            local_cutoff = min(cutoff, wards_cutoff[ifrom])
-                            local_cutoff = min(local_cutoff, wards_cutoff[ito])
 
-                            if play_distance[k] < local_cutoff:
+                            if play_all_in_cutoff or play_in_cutoff[k]:
                                 weight = play_weight[k]
 
                                 prob_scaled = weight / (1.0 - cumulative_prob)
@@ -380,11 +472,17 @@ def advance_foi_omp(network: Network, population: Population,
 
                                 play_move = _ran_binomial(rng, prob_scaled,
                                                           moving)
-
-                                add_to_buffer(day_buffer, ito,
-                                              play_move * scl_foi_uv *
-                                              wards_scale_uv[ito],
-                                              &(wards_day_foi[0]))
+                                ndraws = ndraws + 1
+
+                                if ward_reduce:
+                                    play_link_day[k] = \
+                                            play_move * scl_foi_uv * \
+                                            wards_scale_uv[ito]
+                                else:
+                                    add_to_buffer(day_buffer, ito,
+                                                  play_move * scl_foi_uv *
+                                                  wards_scale_uv[ito],
+                                                  &(wards_day_foi[0]))
 
                                 moving = moving - play_move
                             # end of if within cutoff
@@ -396,12 +494,19 @@ def advance_foi_omp(network: Network, population: Population,
                                             wards_scale_uv[j]
                     # end of if inf_ij (there are new infections)
 
+                    if record_costs:
+                        play_costs[j] = ndraws
+
                 # end of loop over all nodes
             # end of parallel
 
-            # perform the reduction in series in a predictable order
-            for j in range(0, num_threads):
-                add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
+            if ward_reduce:
+                # reduce in parallel over wards in a predictable order
+                reduce_play_foi(reduction, wards.day_foi, nthreads=nthreads)
+            else:
+                # perform the reduction in series in a predictable order
+                for j in range(0, num_threads):
+                    add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
 
             p = p.stop()
         # end of params.disease_params.contrib_foi[i] > 0:
@@ -424,6 +529,7 @@ def advance_foi_omp(network: Network, population: Population,
 
     free_foi_buffers(&(day_buffers[0]), num_threads)
     free_foi_buffers(&(night_buffers[0]), num_threads)
+    free(play_scratch)
 
 
 def advance_foi_serial(network: Network, population: Population,
@@ -468,6 +574,7 @@ def advance_foi_serial(network: Network, population: Population,
     cdef double bg_foi = params.bg_foi
     cdef int ts = population.day
 
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
 
@@ -478,7 +585,6 @@ def advance_foi_serial(network: Network, population: Population,
     cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
 
     cdef double * wards_scale_uv = get_double_array_ptr(wards.scale_uv)
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
     cdef double * wards_bg_foi = get_double_array_ptr(wards.bg_foi)
 
     cdef double * links_weight = get_double_array_ptr(links.weight)
@@ -493,11 +599,13 @@ def advance_foi_serial(network: Network, population: Population,
     cdef int * wards_begin_p = get_int_array_ptr(wards.begin_p)
     cdef int * wards_end_p = get_int_array_ptr(wards.end_p)
 
-    cdef double * links_distance = get_double_array_ptr(links.distance)
-    cdef double * play_distance = get_double_array_ptr(play.distance)
-
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=1)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
 
     # get the random number generator
     cdef binomial_rng* rng = _get_binomial_ptr(rngs[0])
@@ -518,12 +626,43 @@ def advance_foi_serial(network: Network, population: Population,
 
     cdef int N_INF_CLASSES = len(infections)
 
+    # only the links and wards with infections in each stage are visited
+    cdef int * active_work
+    cdef int * active_play
+    cdef int nactive_work = 0
+    cdef int nactive_play = 0
+    cdef int a = 0
+
     cdef double weight = 0.0
     cdef double cumulative_prob = 0.0
     cdef double prob_scaled = 0.0
     cdef double too_ill_to_move = 0.0
     cdef double scl_foi_uv = 0.0
 
+    # per-ward alias tables used to sample the play movements of
+    # small numbers of individuals (see set_play_sampler)
+    alias_tables = get_play_alias_tables(network)
+    cdef int sampler = get_play_sampler_id()
+    cdef int * alias_begin = <int*>0
+    cdef double * alias_prob = <double*>0
+    cdef int * alias_index = <int*>0
+    cdef int * slots
+    cdef int * counts
+    cdef int nslots = 0
+    cdef int islot = 0
+    cdef int itable = 0
+
+    if alias_tables is not None:
+        alias_begin = get_int_array_ptr(alias_tables["begin"])
+        alias_prob = get_double_array_ptr(alias_tables["prob"])
+        alias_index = get_int_array_ptr(alias_tables["alias"])
+    else:
+        sampler = 0
+
+    cdef int play_scratch[2 * PLAY_ALIAS_MAX_N]
+    slots = &(play_scratch[0])
+    counts = &(play_scratch[PLAY_ALIAS_MAX_N])
+
     ## Finally(!) we can now declare the actual loop.
     ## This loops over all disease stages, and then in
     ## parallel over all wards and all links to then
@@ -553,9 +692,19 @@ def advance_foi_serial(network: Network, population: Population,
         play_infections_i = get_int_array_ptr(play_infections[i])
 
         if scl_foi_uv > 0:
+            work_i = all_infections.get_active_work(i)
+            play_i = all_infections.get_active_play(i)
+            nactive_work = len(work_i)
+            nactive_play = len(play_i)
+            active_work = get_int_array_ptr(work_i) if nactive_work > 0 \
+                                                    else <int*>0
+            active_play = get_int_array_ptr(play_i) if nactive_play > 0 \
+                                                    else <int*>0
+
             p = p.start(f"work_{i}")
             with nogil:
-                for j in range(1, nlinks_plus_one):
+                for a in range(0, nactive_work):
+                    j = active_work[a]
                     # deterministic movements (e.g. to work)
                     inf_ij = infections_i[j]
                     if inf_ij > 0:
@@ -563,12 +712,7 @@ def advance_foi_serial(network: Network, population: Population,
                         ifrom = links_ifrom[j]
                         ito = links_ito[j]
 
-                        local_cutoff = min(wards_cutoff[ifrom],
-                                           wards_cutoff[ito])
-
-                        local_cutoff = min(local_cutoff, cutoff)
-
-                        if links_distance[j] < local_cutoff:
+                        if links_all_in_cutoff or links_in_cutoff[j]:
                             # number staying - this is G_ij
                             staying = _ran_binomial(rng,
                                                     too_ill_to_move,
@@ -615,7 +759,8 @@ def advance_foi_serial(network: Network, population: Population,
 
             p = p.start(f"play_{i}")
             with nogil:
-                for j in range(1, nnodes_plus_one):
+                for a in range(0, nactive_play):
+                    j = active_play[a]
                     # playmatrix loop FOI loop (random/unpredictable movements)
                     inf_ij = play_infections_i[j]
                     if inf_ij > 0:
@@ -630,14 +775,37 @@ def advance_foi_serial(network: Network, population: Population,
 
                         end_p = wards_end_p[j]
 
+                        if _use_play_alias(sampler, moving, end_p - k):
+                            # sample each individual from the alias table
+                            itable = alias_begin[j]
+                            nslots = _sample_play_alias(rng, moving, end_p - k,
+                                                        &(alias_prob[itable]),
+                                                        &(alias_index[itable]),
+                                                        slots, counts)
+
+                            for islot in range(0, nslots):
+                                k = wards_begin_p[j] + slots[islot]
+
+                                # the last slot is 'not moving to any link'
+                                if k < end_p and (play_all_in_cutoff or
+                                                  play_in_cutoff[k]):
+                                    ito = play_ito[k]
+                                    play_move = counts[islot]
+
+                                    wards_day_foi[ito] += \
+                                        play_move * scl_foi_uv * \
+                                        wards_scale_uv[ito]
+
+                                    moving = moving - play_move
+
+                            k = end_p
+
                         while (moving > 0) and (k < end_p):
                             ifrom = play_ifrom[k]
                             ito = play_ito[k]
-                            local_cutoff = min(cutoff, wards_cutoff[ifrom])
-                            local_cutoff = min(local_cutoff, wards_cutoff[ito])
 
                             # distributing people across play wards
-                            if play_distance[k] < local_cutoff:
+                            if play_all_in_cutoff or play_in_cutoff[k]:
                                 weight = play_weight[k]
 
                                 prob_scaled = weight / (1.0 - cumulative_prob)
@@ -0,0 +1,772 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+cimport openmp
+
+from libc.stdlib cimport calloc, free
+from libc.stdint cimport uintptr_t
+from libc.math cimport cos, pi
+
+from .._network import Network
+from .._population import Population
+from .._infections import Infections
+
+from ..utils._profiler import Profiler
+from ..utils._get_functions import call_function_on_network
+
+from ..utils._ran_binomial cimport _ran_binomial, \
+                                   _get_binomial_ptr, binomial_rng
+
+from ..utils._cutoff_masks import get_cutoff_masks
+
+from ..utils._foi_reduction import use_ward_reduction, get_ward_reduction, \
+                                   reduce_work_foi, reduce_play_foi
+
+from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+from ..utils._thread_schedule cimport _thread_begin, _thread_end
+from ..utils._thread_schedule import get_thread_bounds, get_thread_costs
+
+from ._foi_buffer cimport foi_buffer, allocate_foi_buffers, \
+                          free_foi_buffers, add_to_buffer, \
+                          add_from_buffer
+
+__all__ = ["advance_foi_fused", "advance_foi_fused_omp",
+           "advance_foi_fused_serial"]
+
+
+def _get_infectious_classes(network: Network, population: Population,
+                            infections: Infections, nthreads: int = 1):
+    """Return the indexes of the disease stages that contribute to the
+       force of infection, together with their scaled foi contributions,
+       the probability that an infected individual is too ill to move
+       and the probability that they will play at home. This also
+       returns the union of the active work links and play wards
+       for these stages
+    """
+    from array import array
+    from ..utils._active_infections import union_active_infections
+
+    params = network.params
+
+    uv = params.UV
+    uvscale = population.scale_uv * params.scale_uv
+
+    ts = population.day
+
+    try:
+        ts = int((population.date - params.UV_max).days)
+    except Exception:
+        pass
+
+    if uv > 0:
+        uvscale *= (1.0 - uv/2.0 + uv*cos(2.0*pi*ts/365.0)/2.0)
+
+    stages = array("i")
+    scl_foi_uv = array("d")
+    too_ill_to_move = array("d")
+    play_at_home = array("d")
+
+    active_work = array("i")
+    active_play = array("i")
+
+    for i in range(0, len(infections.work)):
+        contrib_foi = params.disease_params.contrib_foi[i]
+        beta = params.disease_params.beta[i]
+        scl = contrib_foi * beta * uvscale
+
+        if scl > 0:
+            too_ill = params.disease_params.too_ill_to_move[i]
+
+            stages.append(i)
+            scl_foi_uv.append(scl)
+            too_ill_to_move.append(too_ill)
+
+            # number of people staying gets bigger as
+            # PlayAtHome increases
+            play_at_home.append(params.dyn_play_at_home * too_ill)
+
+            active_work.extend(infections.get_active_work(i,
+                                                          nthreads=nthreads))
+            active_play.extend(infections.get_active_play(i,
+                                                          nthreads=nthreads))
+
+    return (stages, scl_foi_uv, too_ill_to_move, play_at_home,
+            union_active_infections(active_work),
+            union_active_infections(active_play))
+
+
+def advance_foi_fused_omp(network: Network, population: Population,
+                          infections: Infections, rngs,
+                          nthreads: int, profiler: Profiler, **kwargs):
+    """Advance the model calculating the new force of infection (foi)
+       for all of the wards and links between wards, based on the
+       current number of infections. This uses the same model as
+       advance_foi, but visits each link and ward only once per day,
+       accumulating the foi from all of the infectious disease
+       stages together. This is the parallel version of this function
+
+       Parameters
+       ----------
+       network: Network
+         The network being modelled
+       population: Population
+         The population experiencing the outbreak - contains the
+         day number of the outbreak
+       infections: Infections
+         The space that holds all of the infections
+       rngs:
+         The list of thread-safe random number generators, one per thread
+       nthreads: int
+         The number of threads over which to parallelise the calculation
+       profiler: Profiler
+         The profiler used to profile this calculation
+       kwargs:
+         Extra arguments that may be used by other advancers, but which
+         are not used by advance_foi_fused
+    """
+
+    links = network.links
+    wards = network.nodes
+    play = network.play
+    params = network.params
+
+    cdef double bg_foi = params.bg_foi
+
+    p = profiler.start("setup")
+    (stages, scl_foi_uv, too_ill_to_move, play_at_home,
+     work_active, play_active) = _get_infectious_classes(
+                                    network=network, population=population,
+                                    infections=infections, nthreads=nthreads)
+
+    cdef double * wards_day_foi = get_double_array_ptr(wards.day_foi)
+    cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
+
+    cdef double * wards_scale_uv = get_double_array_ptr(wards.scale_uv)
+    cdef double * wards_bg_foi = get_double_array_ptr(wards.bg_foi)
+
+    cdef double * play_weight = get_double_array_ptr(play.weight)
+
+    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
+    cdef int * links_ito = get_int_array_ptr(links.ito)
+
+    cdef int * play_ito = get_int_array_ptr(play.ito)
+
+    cdef int * wards_begin_p = get_int_array_ptr(wards.begin_p)
+    cdef int * wards_end_p = get_int_array_ptr(wards.end_p)
+
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=nthreads)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
+
+    # get the random number generator
+    cdef uintptr_t [::1] rngs_view = rngs
+    cdef binomial_rng* rng   # pointer to parallel rng
+
+    # create and initialise variables used in the loop
+    cdef int num_threads = nthreads
+    cdef int thread_id = 0
+
+    cdef int nnodes_plus_one = network.nnodes + 1
+    cdef int nlinks_plus_one = network.nlinks + 1
+
+    # the per-stage data of the infectious stages
+    cdef int nstages = len(stages)
+    cdef double * stage_scl_foi_uv
+    cdef double * stage_too_ill_to_move
+    cdef double * stage_play_at_home
+    cdef int ** stage_work = <int**>calloc(max(1, nstages), sizeof(int*))
+    cdef int ** stage_play = <int**>calloc(max(1, nstages), sizeof(int*))
+
+    # the number of players of each stage still to move, per thread
+    cdef int * thread_moving = <int*>calloc(max(1, nstages * num_threads),
+                                            sizeof(int))
+    cdef int * moving
+
+    # only the links and wards with infections in any of the
+    # infectious stages are visited
+    cdef int nactive_work = len(work_active)
+    cdef int nactive_play = len(play_active)
+    cdef int * active_work = get_int_array_ptr(work_active) \
+                                if nactive_work > 0 else <int*>0
+    cdef int * active_play = get_int_array_ptr(play_active) \
+                                if nactive_play > 0 else <int*>0
+
+    # the items visited by each thread, and the recorded cost of
+    # each ward, used to balance the work (see set_thread_schedule)
+    cdef int * work_bounds
+    cdef int * play_bounds
+    cdef int * play_costs = <int*>0
+    cdef bint record_costs = False
+    cdef int ndraws = 0
+
+    cdef int i = 0
+    cdef int j = 0
+    cdef int k = 0
+    cdef int a = 0
+    cdef int s = 0
+    cdef int end_p = 0
+    cdef int inf_ij = 0
+    cdef int ifrom = 0
+    cdef int ito = 0
+    cdef int staying = 0
+    cdef int nmoving = 0
+    cdef int play_move = 0
+
+    cdef double cumulative_prob = 0.0
+    cdef double prob_scaled = 0.0
+    cdef double day_from = 0.0
+    cdef double day_to = 0.0
+    cdef double night_from = 0.0
+    cdef double day_home = 0.0
+    cdef double day_play = 0.0
+
+    if nstages > 0:
+        stage_scl_foi_uv = get_double_array_ptr(scl_foi_uv)
+        stage_too_ill_to_move = get_double_array_ptr(too_ill_to_move)
+        stage_play_at_home = get_double_array_ptr(play_at_home)
+
+        for s in range(0, nstages):
+            stage_work[s] = get_int_array_ptr(infections.work[stages[s]])
+            stage_play[s] = get_int_array_ptr(infections.play[stages[s]])
+
+    # allocate buffers that will be used to manage the reductions
+    cdef foi_buffer * day_buffers = allocate_foi_buffers(num_threads)
+    cdef foi_buffer * day_buffer
+    cdef foi_buffer * night_buffers = allocate_foi_buffers(num_threads)
+    cdef foi_buffer * night_buffer
+
+    # alternatively, each link can store its contribution, which are
+    # then reduced in parallel over the wards (see set_foi_reduction)
+    cdef bint ward_reduce = False
+    cdef double * link_day_from = <double*>0
+    cdef double * link_day_to = <double*>0
+    cdef double * link_night_from = <double*>0
+    cdef double * play_link_day = <double*>0
+
+    ## we begin by initialising the day and night fois to bg_foi
+    for i in range(1, nnodes_plus_one):
+        wards_day_foi[i] = bg_foi
+        wards_night_foi[i] = bg_foi
+    p = p.stop()
+
+    p = p.start("work")
+    if nactive_work > 0:
+        # each infected link needs about the same number of random draws
+        work_thread_bounds = get_thread_bounds(nthreads, 1, nlinks_plus_one,
+                                               active=work_active)
+        work_bounds = get_int_array_ptr(work_thread_bounds)
+
+        # each infected link contributes up to three fois
+        ward_reduce = use_ward_reduction(ncontribs=3 * nactive_work,
+                                         nlinks=network.nlinks,
+                                         nnodes=network.nnodes,
+                                         nthreads=nthreads)
+
+        if ward_reduce:
+            reduction = get_ward_reduction(network)
+            link_day_from = get_double_array_ptr(reduction["day_from"])
+            link_day_to = get_double_array_ptr(reduction["day_to"])
+            link_night_from = get_double_array_ptr(reduction["night_from"])
+
+        with nogil, parallel(num_threads=num_threads):
+            thread_id = cython.parallel.threadid()
+            rng = _get_binomial_ptr(rngs_view[thread_id])
+            day_buffer = &(day_buffers[thread_id])
+            night_buffer = &(night_buffers[thread_id])
+            day_buffer[0].count = 0
+            night_buffer[0].count = 0
+
+            # visit this thread's share of the active links
+            for a in range(_thread_begin(work_bounds, num_threads),
+                           _thread_end(work_bounds, num_threads)):
+                j = active_work[a]
+                ifrom = links_ifrom[j]
+                ito = links_ito[j]
+
+                day_from = 0.0
+                day_to = 0.0
+                night_from = 0.0
+
+                # accumulate the foi from all stages for this link
+                for s in range(0, nstages):
+                    inf_ij = stage_work[s][j]
+
+                    if inf_ij > 0:
+                        if links_all_in_cutoff or links_in_cutoff[j]:
+                            # number staying - this is G_ij
+                            staying = _ran_binomial(rng,
+                                                    stage_too_ill_to_move[s],
+                                                    inf_ij)
+
+                            # the rest (I_ij - G_ij) move to the destination
+                            day_from = day_from + \
+                                staying * stage_scl_foi_uv[s]
+                            day_to = day_to + \
+                                (inf_ij - staying) * stage_scl_foi_uv[s]
+                        else:
+                            # outside cutoff
+                            day_from = day_from + \
+                                inf_ij * stage_scl_foi_uv[s]
+
+                        # Nighttime Force of Infection is
+                        # prop. to the number of Infected individuals
+                        # in the ward
+                        night_from = night_from + \
+                            inf_ij * stage_scl_foi_uv[s]
+
+                if ward_reduce:
+                    link_day_from[j] = day_from * wards_scale_uv[ifrom]
+                    link_day_to[j] = day_to * wards_scale_uv[ito]
+                    link_night_from[j] = night_from * wards_scale_uv[ifrom]
+                else:
+                    if day_from > 0:
+                        add_to_buffer(day_buffer, ifrom,
+                                      day_from * wards_scale_uv[ifrom],
+                                      &(wards_day_foi[0]))
+
+                    if day_to > 0:
+                        add_to_buffer(day_buffer, ito,
+                                      day_to * wards_scale_uv[ito],
+                                      &(wards_day_foi[0]))
+
+                    if night_from > 0:
+                        add_to_buffer(night_buffer, ifrom,
+                                      night_from * wards_scale_uv[ifrom],
+                                      &(wards_night_foi[0]))
+            # end of loop over links
+        # end of parallel section
+
+        if ward_reduce:
+            # reduce in parallel over wards in a deterministic order
+            reduce_work_foi(reduction, wards.day_foi, wards.night_foi,
+                            nthreads=nthreads)
+        else:
+            # do the reduction in serial in a deterministic order
+            for j in range(0, num_threads):
+                add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
+                add_from_buffer(&(night_buffers[j]), &(wards_night_foi[0]))
+    p = p.stop()
+
+    p = p.start("play")
+    if nactive_play > 0:
+        # the cost of each ward is the number of random draws
+        # needed to distribute its players on the previous day
+        play_thread_costs = get_thread_costs(infections, "foi_fused_play",
+                                             nnodes_plus_one)
+        record_costs = play_thread_costs is not None
+
+        if record_costs:
+            play_costs = get_int_array_ptr(play_thread_costs)
+
+        play_thread_bounds = get_thread_bounds(nthreads, 1, nnodes_plus_one,
+                                               active=play_active,
+                                               costs=play_thread_costs)
+        play_bounds = get_int_array_ptr(play_thread_bounds)
+
+        # each infected ward contributes to each of its play links
+        ward_reduce = use_ward_reduction(
+                        ncontribs=(nactive_play * network.nplay) //
+                                  max(1, network.nnodes),
+                        nlinks=network.nplay, nnodes=network.nnodes,
+                        nthreads=nthreads)
+
+        if ward_reduce:
+            reduction = get_ward_reduction(network)
+            play_link_day = get_double_array_ptr(reduction["play_day"])
+
+        with nogil, parallel(num_threads=num_threads):
+            thread_id = cython.parallel.threadid()
+            rng = _get_binomial_ptr(rngs_view[thread_id])
+            day_buffer = &(day_buffers[thread_id])
+            day_buffer[0].count = 0
+            moving = &(thread_moving[thread_id * nstages])
+
+            for a in range(_thread_begin(play_bounds, num_threads),
+                           _thread_end(play_bounds, num_threads)):
+                j = active_play[a]
+
+                night_from = 0.0
+                day_home = 0.0
+                nmoving = 0
+                ndraws = 0
+
+                for s in range(0, nstages):
+                    inf_ij = stage_play[s][j]
+                    moving[s] = 0
+
+                    if inf_ij > 0:
+                        night_from = night_from + \
+                            inf_ij * stage_scl_foi_uv[s]
+
+                        staying = _ran_binomial(rng, stage_play_at_home[s],
+                                                inf_ij)
+                        moving[s] = inf_ij - staying
+                        nmoving = nmoving + moving[s]
+                        ndraws = ndraws + 1
+
+                        day_home = day_home + staying * stage_scl_foi_uv[s]
+
+                cumulative_prob = 0.0
+                k = wards_begin_p[j]
+                end_p = wards_end_p[j]
+
+                # distribute the players of all stages across the
+                # play wards in a single pass over the play links
+                while (nmoving > 0) and (k < end_p):
+                    if play_all_in_cutoff or play_in_cutoff[k]:
+                        prob_scaled = play_weight[k] / (1.0 - cumulative_prob)
+                        cumulative_prob = cumulative_prob + play_weight[k]
+
+                        day_play = 0.0
+
+                        for s in range(0, nstages):
+                            if moving[s] > 0:
+                                play_move = _ran_binomial(rng, prob_scaled,
+                                                          moving[s])
+                                ndraws = ndraws + 1
+                                day_play = day_play + \
+                                    play_move * stage_scl_foi_uv[s]
+                                moving[s] = moving[s] - play_move
+                                nmoving = nmoving - play_move
+
+                        ito = play_ito[k]
+
+                        if ward_reduce:
+                            play_link_day[k] = day_play * wards_scale_uv[ito]
+                        elif day_play > 0:
+                            add_to_buffer(day_buffer, ito,
+                                          day_play * wards_scale_uv[ito],
+                                          &(wards_day_foi[0]))
+                    # end of if within cutoff
+
+                    k = k + 1
+                # end of while loop
+
+                for s in range(0, nstages):
+                    day_home = day_home + moving[s] * stage_scl_foi_uv[s]
+
+                wards_day_foi[j] += day_home * wards_scale_uv[j]
+                wards_night_foi[j] += night_from * wards_scale_uv[j]
+
+                if record_costs:
+                    play_costs[j] = ndraws
+            # end of loop over wards
+        # end of parallel
+
+        if ward_reduce:
+            # reduce in parallel over wards in a predictable order
+            reduce_play_foi(reduction, wards.day_foi, nthreads=nthreads)
+        else:
+            # perform the reduction in series in a predictable order
+            for j in range(0, num_threads):
+                add_from_buffer(&(day_buffers[j]), &(wards_day_foi[0]))
+    p = p.stop()
+
+    p = p.start("bg_foi")
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes_plus_one, schedule="static"):
+            if wards_bg_foi[i] > 0.0:
+                wards_day_foi[i] = wards_day_foi[i] + wards_bg_foi[i]
+                wards_night_foi[i] = wards_night_foi[i] + wards_bg_foi[i]
+            elif wards_bg_foi[i] < 0.0:
+                # must protect against negative values
+                wards_day_foi[i] = max(0.0, wards_day_foi[i] + wards_bg_foi[i])
+                wards_night_foi[i] = max(0.0, wards_night_foi[i] +
+                                              wards_bg_foi[i])
+    p = p.stop()
+
+    free_foi_buffers(&(day_buffers[0]), num_threads)
+    free_foi_buffers(&(night_buffers[0]), num_threads)
+    free(thread_moving)
+    free(stage_work)
+    free(stage_play)
+
+
+def advance_foi_fused_serial(network: Network, population: Population,
+                             infections: Infections, rngs,
+                             profiler: Profiler, **kwargs):
+    """Advance the model calculating the new force of infection (foi)
+       for all of the wards and links between wards, based on the
+       current number of infections. This uses the same model as
+       advance_foi, but visits each link and ward only once per day,
+       accumulating the foi from all of the infectious disease
+       stages together. This is the serial version of this function
+
+       Parameters
+       ----------
+       network: Network
+         The network being modelled
+       population: Population
+         The population experiencing the outbreak - contains the
+         day number of the outbreak
+       infections: Infections
+         The space that holds all of the infections
+       rngs:
+         The list of thread-safe random number generators, one per thread
+       profiler: Profiler
+         The profiler used to profile this calculation
+       kwargs:
+         Extra arguments that may be used by other advancers, but which
+         are not used by advance_foi_fused
+    """
+
+    links = network.links
+    wards = network.nodes
+    play = network.play
+    params = network.params
+
+    cdef double bg_foi = params.bg_foi
+
+    p = profiler.start("setup")
+    (stages, scl_foi_uv, too_ill_to_move, play_at_home,
+     work_active, play_active) = _get_infectious_classes(
+                                    network=network, population=population,
+                                    infections=infections)
+
+    cdef double * wards_day_foi = get_double_array_ptr(wards.day_foi)
+    cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
+
+    cdef double * wards_scale_uv = get_double_array_ptr(wards.scale_uv)
+    cdef double * wards_bg_foi = get_double_array_ptr(wards.bg_foi)
+
+    cdef double * play_weight = get_double_array_ptr(play.weight)
+
+    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
+    cdef int * links_ito = get_int_array_ptr(links.ito)
+
+    cdef int * play_ito = get_int_array_ptr(play.ito)
+
+    cdef int * wards_begin_p = get_int_array_ptr(wards.begin_p)
+    cdef int * wards_end_p = get_int_array_ptr(wards.end_p)
+
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=1)
+    cdef int * links_in_cutoff = get_int_array_ptr(links_mask)
+    cdef bint links_all_in_cutoff = (links_mask is None)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
+
+    # get the random number generator
+    cdef binomial_rng* rng = _get_binomial_ptr(rngs[0])
+
+    cdef int nnodes_plus_one = network.nnodes + 1
+
+    # the per-stage data of the infectious stages
+    cdef int nstages = len(stages)
+    cdef double * stage_scl_foi_uv
+    cdef double * stage_too_ill_to_move
+    cdef double * stage_play_at_home
+    cdef int ** stage_work = <int**>calloc(max(1, nstages), sizeof(int*))
+    cdef int ** stage_play = <int**>calloc(max(1, nstages), sizeof(int*))
+
+    # the number of players of each stage still to move
+    cdef int * moving = <int*>calloc(max(1, nstages), sizeof(int))
+
+    # only the links and wards with infections in any of the
+    # infectious stages are visited
+    cdef int nactive_work = len(work_active)
+    cdef int nactive_play = len(play_active)
+    cdef int * active_work = get_int_array_ptr(work_active) \
+                                if nactive_work > 0 else <int*>0
+    cdef int * active_play = get_int_array_ptr(play_active) \
+                                if nactive_play > 0 else <int*>0
+
+    cdef int i = 0
+    cdef int j = 0
+    cdef int k = 0
+    cdef int a = 0
+    cdef int s = 0
+    cdef int end_p = 0
+    cdef int inf_ij = 0
+    cdef int ifrom = 0
+    cdef int ito = 0
+    cdef int staying = 0
+    cdef int nmoving = 0
+    cdef int play_move = 0
+
+    cdef double cumulative_prob = 0.0
+    cdef double prob_scaled = 0.0
+    cdef double day_from = 0.0
+    cdef double day_to = 0.0
+    cdef double night_from = 0.0
+    cdef double day_home = 0.0
+    cdef double day_play = 0.0
+
+    if nstages > 0:
+        stage_scl_foi_uv = get_double_array_ptr(scl_foi_uv)
+        stage_too_ill_to_move = get_double_array_ptr(too_ill_to_move)
+        stage_play_at_home = get_double_array_ptr(play_at_home)
+
+        for s in range(0, nstages):
+            stage_work[s] = get_int_array_ptr(infections.work[stages[s]])
+            stage_play[s] = get_int_array_ptr(infections.play[stages[s]])
+
+    ## we begin by initialising the day and night fois to bg_foi
+    for i in range(1, nnodes_plus_one):
+        wards_day_foi[i] = bg_foi
+        wards_night_foi[i] = bg_foi
+    p = p.stop()
+
+    p = p.start("work")
+    with nogil:
+        for a in range(0, nactive_work):
+            j = active_work[a]
+            ifrom = links_ifrom[j]
+            ito = links_ito[j]
+
+            day_from = 0.0
+            day_to = 0.0
+            night_from = 0.0
+
+            # accumulate the foi from all stages for this link
+            for s in range(0, nstages):
+                inf_ij = stage_work[s][j]
+
+                if inf_ij > 0:
+                    if links_all_in_cutoff or links_in_cutoff[j]:
+                        # number staying - this is G_ij
+                        staying = _ran_binomial(rng,
+                                                stage_too_ill_to_move[s],
+                                                inf_ij)
+
+                        # the rest (I_ij - G_ij) move to the destination
+                        day_from += staying * stage_scl_foi_uv[s]
+                        day_to += (inf_ij - staying) * stage_scl_foi_uv[s]
+                    else:
+                        # outside cutoff
+                        day_from += inf_ij * stage_scl_foi_uv[s]
+
+                    # Nighttime Force of Infection is
+                    # prop. to the number of Infected individuals
+                    # in the ward
+                    night_from += inf_ij * stage_scl_foi_uv[s]
+
+            wards_day_foi[ifrom] += day_from * wards_scale_uv[ifrom]
+            wards_day_foi[ito] += day_to * wards_scale_uv[ito]
+            wards_night_foi[ifrom] += night_from * wards_scale_uv[ifrom]
+        # end of loop over links
+    # end of nogil
+    p = p.stop()
+
+    p = p.start("play")
+    with nogil:
+        for a in range(0, nactive_play):
+            j = active_play[a]
+
+            night_from = 0.0
+            day_home = 0.0
+            nmoving = 0
+
+            for s in range(0, nstages):
+                inf_ij = stage_play[s][j]
+                moving[s] = 0
+
+                if inf_ij > 0:
+                    night_from += inf_ij * stage_scl_foi_uv[s]
+
+                    staying = _ran_binomial(rng, stage_play_at_home[s],
+                                            inf_ij)
+                    moving[s] = inf_ij - staying
+                    nmoving += moving[s]
+
+                    day_home += staying * stage_scl_foi_uv[s]
+
+            cumulative_prob = 0.0
+            k = wards_begin_p[j]
+            end_p = wards_end_p[j]
+
+            # distribute the players of all stages across the
+            # play wards in a single pass over the play links
+            while (nmoving > 0) and (k < end_p):
+                if play_all_in_cutoff or play_in_cutoff[k]:
+                    prob_scaled = play_weight[k] / (1.0 - cumulative_prob)
+                    cumulative_prob = cumulative_prob + play_weight[k]
+
+                    day_play = 0.0
+
+                    for s in range(0, nstages):
+                        if moving[s] > 0:
+                            play_move = _ran_binomial(rng, prob_scaled,
+                                                      moving[s])
+                            day_play += play_move * stage_scl_foi_uv[s]
+                            moving[s] -= play_move
+                            nmoving -= play_move
+
+                    ito = play_ito[k]
+                    wards_day_foi[ito] += day_play * wards_scale_uv[ito]
+                # end of if within cutoff
+
+                k = k + 1
+            # end of while loop
+
+            for s in range(0, nstages):
+                day_home += moving[s] * stage_scl_foi_uv[s]
+
+            wards_day_foi[j] += day_home * wards_scale_uv[j]
+            wards_night_foi[j] += night_from * wards_scale_uv[j]
+        # end of loop over wards
+    # end of nogil
+    p = p.stop()
+
+    p = p.start("bg_foi")
+    with nogil:
+        for i in range(1, nnodes_plus_one):
+            if wards_bg_foi[i] > 0.0:
+                wards_day_foi[i] += wards_bg_foi[i]
+                wards_night_foi[i] += wards_bg_foi[i]
+            elif wards_bg_foi[i] < 0.0:
+                # Need to protect against negative values
+                wards_day_foi[i] = max(0.0, wards_day_foi[i] + wards_bg_foi[i])
+                wards_night_foi[i] = max(0.0, wards_night_foi[i] +
+                                              wards_bg_foi[i])
+    p = p.stop()
+
+    free(moving)
+    free(stage_work)
+    free(stage_play)
+
+
+def advance_foi_fused(nthreads: int, **kwargs):
+    """Advance the model calculating the new force of infection (foi)
+       for all of the wards and links between wards, based on the
+       current number of infections. This is a drop-in replacement
+       for advance_foi that uses the same model, but which visits
+       each link and ward only once per day, rather than once for
+       each disease stage. As the random numbers are drawn in a
+       different order, the results for a given seed will be
+       statistically equivalent to, but not the same as, those
+       of advance_foi
+
+       Parameters
+       ----------
+       network: Network or Networks
+         The network being modelled
+       population: Population
+         The population experiencing the outbreak - contains the
+         day number of the outbreak
+       infections: Infections
+         The space that holds all of the infections
+       rngs:
+         The list of thread-safe random number generators, one per thread
+       nthreads: int
+         The number of threads over which to parallelise the calculation
+       profiler: Profiler
+         The profiler used to profile this calculation
+       kwargs:
+         Extra arguments that may be used by other advancers, but which
+         are not used by advance_foi_fused
+    """
+    call_function_on_network(nthreads=nthreads,
+                             func=advance_foi_fused_serial,
+                             parallel=advance_foi_fused_omp,
+                             switch_to_parallel=5,
+                             **kwargs)
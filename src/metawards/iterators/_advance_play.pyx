@@ -5,6 +5,7 @@
 cimport cython
 from cython.parallel import parallel, prange
 from libc.stdint cimport uintptr_t
+from libc.stdlib cimport malloc, free
 
 from .._network import Network
 from .._infections import Infections
@@ -15,8 +16,18 @@ from ..utils._get_functions import call_function_on_network
 from ..utils._ran_binomial cimport _ran_binomial, \
                                    _get_binomial_ptr, binomial_rng
 
+from ..utils._cutoff_masks import get_cutoff_masks
+
+from ..utils._play_sampler cimport _use_play_alias, _sample_play_alias, \
+                                   PLAY_ALIAS_MAX_N
+from ..utils._play_sampler import get_play_sampler_id, \
+                                  get_play_alias_tables
+
 from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
 
+from ..utils._thread_schedule cimport _thread_begin, _thread_end
+from ..utils._thread_schedule import get_thread_bounds, get_thread_costs
+
 __all__ = ["advance_play", "advance_play_omp",
            "advance_play_serial"]
 
@@ -48,6 +59,7 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
     play = network.play
     params = network.params
 
+    all_infections = infections
     play_infections = infections.play
 
     # Copy arguments from Python into C cdef variables
@@ -62,19 +74,20 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
     cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
 
     cdef double * wards_play_suscept = get_double_array_ptr(wards.play_suscept)
-    cdef double * play_distance = get_double_array_ptr(play.distance)
 
     cdef double * wards_day_inf_prob = get_double_array_ptr(
                                                     wards.day_inf_prob)
     cdef double * wards_night_inf_prob = get_double_array_ptr(
                                                     wards.night_inf_prob)
 
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
 
     cdef double dyn_play_at_home = params.dyn_play_at_home
 
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=nthreads)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
 
     # Pointer to the play_infections array - only need [0] as this loop
     # is creating new infections
@@ -105,6 +118,44 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
     cdef int moving = 0
 
     cdef int play_move = 0
+    cdef int begin_p = 0
+    cdef int end_p = 0
+
+    # per-ward alias tables used to sample the play movements of
+    # small numbers of individuals (see set_play_sampler)
+    alias_tables = get_play_alias_tables(network)
+    cdef int sampler = get_play_sampler_id()
+    cdef int * alias_begin = <int*>0
+    cdef double * alias_prob = <double*>0
+    cdef int * alias_index = <int*>0
+    cdef int * slots
+    cdef int * counts
+    cdef int nslots = 0
+    cdef int islot = 0
+    cdef int itable = 0
+
+    if alias_tables is not None:
+        alias_begin = get_int_array_ptr(alias_tables["begin"])
+        alias_prob = get_double_array_ptr(alias_tables["prob"])
+        alias_index = get_int_array_ptr(alias_tables["alias"])
+    else:
+        sampler = 0
+
+    cdef int * play_scratch = <int *> malloc(2 * PLAY_ALIAS_MAX_N *
+                                             num_threads * sizeof(int))
+
+    # the cost of each ward is the number of random draws it needed
+    # on the previous day - this is used to balance the work between
+    # threads (see set_thread_schedule)
+    thread_costs = get_thread_costs(all_infections, "play", nnodes_plus_one)
+    thread_bounds = get_thread_bounds(nthreads, 1, nnodes_plus_one,
+                                      costs=thread_costs)
+
+    cdef bint record_costs = thread_costs is not None
+    cdef int * costs = get_int_array_ptr(thread_costs) if record_costs \
+                                                       else <int*>0
+    cdef int * bounds = get_int_array_ptr(thread_bounds)
+    cdef int ndraws = 0
 
     ## Finally(!) we can now declare the actual loop.
     ## This loops in parallel over all wards to create
@@ -115,25 +166,67 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
     with nogil, parallel(num_threads=num_threads):
         thread_id = cython.parallel.threadid()
         rng = _get_binomial_ptr(rngs_view[thread_id])
+        slots = &(play_scratch[2 * PLAY_ALIAS_MAX_N * thread_id])
+        counts = &(slots[PLAY_ALIAS_MAX_N])
 
-        for j in prange(1, nnodes_plus_one, schedule="static"):
+        for j in range(_thread_begin(bounds, num_threads),
+                       _thread_end(bounds, num_threads)):
             inf_prob = 0.0
             suscept = <int>wards_play_suscept[j]
             staying = _ran_binomial(rng, dyn_play_at_home, suscept)
+            ndraws = 1
 
             moving = suscept - staying
 
             cumulative_prob = 0.0
 
+            begin_p = wards_begin_p[j]
+            end_p = wards_end_p[j]
+
+            if _use_play_alias(sampler, moving, end_p - begin_p):
+                # sample each individual from the alias table
+                itable = alias_begin[j]
+                nslots = _sample_play_alias(rng, moving, end_p - begin_p,
+                                            &(alias_prob[itable]),
+                                            &(alias_index[itable]),
+                                            slots, counts)
+                ndraws = ndraws + moving
+
+                for islot in range(0, nslots):
+                    k = begin_p + slots[islot]
+
+                    # the last slot is 'not moving to any link'
+                    if k < end_p and (play_all_in_cutoff or
+                                      play_in_cutoff[k]):
+                        ito = play_ito[k]
+
+                        if wards_day_foi[ito] > 0.0:
+                            play_move = counts[islot]
+                            inf_prob = wards_day_inf_prob[ito]
+
+                            l = _ran_binomial(rng, inf_prob, play_move)
+                            ndraws = ndraws + 1
+
+                            moving = moving - play_move
+
+                            if l > 0:
+                                # infection
+                                play_infections_i[j] += l
+                                wards_play_suscept[j] -= l
+
+                begin_p = end_p
+
             # daytime infection of play matrix moves
-            for k in range(wards_begin_p[j], wards_end_p[j]):
+            for k in range(begin_p, end_p):
+                if moving <= 0:
+                    # everyone has been placed, so no more draws needed
+                    break
+
                 ifrom = play_ifrom[k]
                 ito = play_ito[k]
 
-                local_cutoff = min(cutoff, wards_cutoff[ifrom])
-                local_cutoff = min(local_cutoff, wards_cutoff[ito])
 
-                if play_distance[k] < local_cutoff:
+                if play_all_in_cutoff or play_in_cutoff[k]:
                     if wards_day_foi[ito] > 0.0:
                         weight = play_weight[k]
                         prob_scaled = weight / (1.0-cumulative_prob)
@@ -143,6 +236,7 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
                         inf_prob = wards_day_inf_prob[ito]
 
                         l = _ran_binomial(rng, inf_prob, play_move)
+                        ndraws = ndraws + 2
 
                         moving = moving - play_move
 
@@ -158,6 +252,7 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
                 # infect people staying at home
                 inf_prob = wards_day_inf_prob[j]
                 l = _ran_binomial(rng, inf_prob, staying+moving)
+                ndraws = ndraws + 1
 
                 if l > 0:
                     # another infections, this time from home
@@ -169,15 +264,24 @@ def advance_play_omp(network: Network, infections: Infections, rngs,
             inf_prob = wards_night_inf_prob[j]
             if inf_prob > 0.0:
                 l = _ran_binomial(rng, inf_prob, <int>(wards_play_suscept[j]))
+                ndraws = ndraws + 1
 
                 if l > 0:
                     # another infection
                     play_infections_i[j] += l
                     wards_play_suscept[j] -= l
+
+            if record_costs:
+                costs[j] = ndraws
         # end of loop over wards (nodes)
     # end of parallel
     p.stop()
 
+    free(play_scratch)
+
+    # new infections may have been added anywhere in stage 0
+    all_infections.invalidate_active(0, work=False, subinfs=False)
+
 
 def advance_play_serial(network: Network, infections: Infections, rngs,
                         profiler: Profiler, **kwargs):
@@ -206,6 +310,7 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
     play = network.play
     params = network.params
 
+    all_infections = infections
     play_infections = infections.play
 
     # Copy arguments from Python into C cdef variables
@@ -220,9 +325,7 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
     cdef double * wards_night_foi = get_double_array_ptr(wards.night_foi)
 
     cdef double * wards_play_suscept = get_double_array_ptr(wards.play_suscept)
-    cdef double * play_distance = get_double_array_ptr(play.distance)
 
-    cdef double * wards_cutoff = get_double_array_ptr(wards.cutoff)
 
     cdef double * wards_day_inf_prob = get_double_array_ptr(
                                                     wards.day_inf_prob)
@@ -231,8 +334,11 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
 
     cdef double dyn_play_at_home = params.dyn_play_at_home
 
-    cdef double cutoff = params.dyn_dist_cutoff
-    cdef double local_cutoff = cutoff
+    # masks of the links within the distance cutoff - these are cached
+    # and only rebuilt when the cutoffs change
+    (links_mask, play_mask) = get_cutoff_masks(network, nthreads=1)
+    cdef int * play_in_cutoff = get_int_array_ptr(play_mask)
+    cdef bint play_all_in_cutoff = (play_mask is None)
 
     # Pointer to the play_infections array - only need [0] as this loop
     # is creating new infections
@@ -258,6 +364,32 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
     cdef int moving = 0
 
     cdef int play_move = 0
+    cdef int begin_p = 0
+    cdef int end_p = 0
+
+    # per-ward alias tables used to sample the play movements of
+    # small numbers of individuals (see set_play_sampler)
+    alias_tables = get_play_alias_tables(network)
+    cdef int sampler = get_play_sampler_id()
+    cdef int * alias_begin = <int*>0
+    cdef double * alias_prob = <double*>0
+    cdef int * alias_index = <int*>0
+    cdef int * slots
+    cdef int * counts
+    cdef int nslots = 0
+    cdef int islot = 0
+    cdef int itable = 0
+
+    if alias_tables is not None:
+        alias_begin = get_int_array_ptr(alias_tables["begin"])
+        alias_prob = get_double_array_ptr(alias_tables["prob"])
+        alias_index = get_int_array_ptr(alias_tables["alias"])
+    else:
+        sampler = 0
+
+    cdef int play_scratch[2 * PLAY_ALIAS_MAX_N]
+    slots = &(play_scratch[0])
+    counts = &(play_scratch[PLAY_ALIAS_MAX_N])
 
     ## Finally(!) we can now declare the actual loop.
     ## This loops in parallel over all wards to create
@@ -275,15 +407,51 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
 
             cumulative_prob = 0.0
 
+            begin_p = wards_begin_p[j]
+            end_p = wards_end_p[j]
+
+            if _use_play_alias(sampler, moving, end_p - begin_p):
+                # sample each individual from the alias table
+                itable = alias_begin[j]
+                nslots = _sample_play_alias(rng, moving, end_p - begin_p,
+                                            &(alias_prob[itable]),
+                                            &(alias_index[itable]),
+                                            slots, counts)
+
+                for islot in range(0, nslots):
+                    k = begin_p + slots[islot]
+
+                    # the last slot is 'not moving to any link'
+                    if k < end_p and (play_all_in_cutoff or
+                                      play_in_cutoff[k]):
+                        ito = play_ito[k]
+
+                        if wards_day_foi[ito] > 0.0:
+                            play_move = counts[islot]
+                            inf_prob = wards_day_inf_prob[ito]
+
+                            l = _ran_binomial(rng, inf_prob, play_move)
+
+                            moving = moving - play_move
+
+                            if l > 0:
+                                # infection
+                                play_infections_i[j] += l
+                                wards_play_suscept[j] -= l
+
+                begin_p = end_p
+
             # daytime infection of play matrix moves
-            for k in range(wards_begin_p[j], wards_end_p[j]):
+            for k in range(begin_p, end_p):
+                if moving <= 0:
+                    # everyone has been placed, so no more draws needed
+                    break
+
                 ifrom = play_ifrom[k]
                 ito = play_ito[k]
 
-                local_cutoff = min(cutoff, wards_cutoff[ifrom])
-                local_cutoff = min(local_cutoff, wards_cutoff[ito])
 
-                if play_distance[k] < local_cutoff:
+                if play_all_in_cutoff or play_in_cutoff[k]:
                     if wards_day_foi[ito] > 0.0:
                         weight = play_weight[k]
                         prob_scaled = weight / (1.0-cumulative_prob)
@@ -328,6 +496,9 @@ def advance_play_serial(network: Network, infections: Infections, rngs,
     # end of nogil
     p.stop()
 
+    # new infections may have been added anywhere in stage 0
+    all_infections.invalidate_active(0, work=False, subinfs=False)
+
 def advance_play(nthreads: int, **kwargs):
     """Advance the model by triggering infections related to random
        'play' movements (parallel version of the function)
@@ -17,10 +17,36 @@ from ..utils._ran_binomial cimport _ran_binomial, \
 
 from ..utils._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
 
+from ..utils._thread_schedule cimport _thread_begin, _thread_end
+from ..utils._thread_schedule import get_thread_bounds
+from ..utils._active_infections import merge_active_infections
+
 __all__ = ["advance_recovery", "advance_recovery_omp",
            "advance_recovery_serial"]
 
 
+def _update_active(infections: Infections, stage: int, work, play,
+                   nthreads: int):
+    """Update the active sets after individuals have moved from
+       disease stage 'stage' to 'stage+1'. Only the links and wards
+       that were active in 'stage' can have changed
+    """
+    work_next = infections.get_active_work(stage+1, nthreads=nthreads)
+    play_next = infections.get_active_play(stage+1, nthreads=nthreads)
+
+    infections.set_active(stage+1,
+                          work=merge_active_infections(
+                              work_next, work, infections.work[stage+1]),
+                          play=merge_active_infections(
+                              play_next, play, infections.play[stage+1]))
+
+    infections.set_active(stage,
+                          work=merge_active_infections(
+                              work, None, infections.work[stage]),
+                          play=merge_active_infections(
+                              play, None, infections.play[stage]))
+
+
 def advance_recovery_omp(network: Network, infections: Infections, rngs,
                          nthreads: int, profiler: Profiler, **kwargs):
     """Advance the model by processing recovery of individual through
@@ -46,6 +72,7 @@ def advance_recovery_omp(network: Network, infections: Infections, rngs,
 
     params = network.params
 
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
 
@@ -57,6 +84,17 @@ def advance_recovery_omp(network: Network, infections: Infections, rngs,
     cdef int * play_infections_i
     cdef int * play_infections_i_plus_one
 
+    # only the links and wards with infections in each stage are visited
+    cdef int * active_work
+    cdef int * active_play
+    cdef int nactive_work = 0
+    cdef int nactive_play = 0
+    cdef int a = 0
+
+    # the items visited by each thread (see set_thread_schedule)
+    cdef int * work_bounds
+    cdef int * play_bounds
+
     # get the random number generator
     cdef uintptr_t [::1] rngs_view = rngs
     cdef binomial_rng* rng   # pointer to parallel rng
@@ -90,11 +128,31 @@ def advance_recovery_omp(network: Network, infections: Infections, rngs,
         play_infections_i_plus_one = get_int_array_ptr(play_infections[i+1])
         disease_progress = params.disease_params.progress[i]
 
+        work_i = all_infections.get_active_work(i, nthreads=nthreads)
+        play_i = all_infections.get_active_play(i, nthreads=nthreads)
+        nactive_work = len(work_i)
+        nactive_play = len(play_i)
+        active_work = get_int_array_ptr(work_i) if nactive_work > 0 \
+                                                else <int*>0
+        active_play = get_int_array_ptr(play_i) if nactive_play > 0 \
+                                                else <int*>0
+
+        # each infected link or ward needs one random draw
+        work_thread_bounds = get_thread_bounds(nthreads, 1, nlinks_plus_one,
+                                               active=work_i)
+        play_thread_bounds = get_thread_bounds(nthreads, 1, nnodes_plus_one,
+                                               active=play_i)
+        work_bounds = get_int_array_ptr(work_thread_bounds)
+        play_bounds = get_int_array_ptr(play_thread_bounds)
+
         with nogil, parallel(num_threads=num_threads):
             thread_id = cython.parallel.threadid()
             rng = _get_binomial_ptr(rngs_view[thread_id])
 
-            for j in prange(1, nlinks_plus_one, schedule="static"):
+            # visit this thread's share of the active links
+            for a in range(_thread_begin(work_bounds, num_threads),
+                           _thread_end(work_bounds, num_threads)):
+                j = active_work[a]
                 inf_ij = infections_i[j]
 
                 if inf_ij > 0:
@@ -104,7 +162,9 @@ def advance_recovery_omp(network: Network, infections: Infections, rngs,
                         infections_i_plus_one[j] += l
                         infections_i[j] -= l
 
-            for j in prange(1, nnodes_plus_one, schedule="static"):
+            for a in range(_thread_begin(play_bounds, num_threads),
+                           _thread_end(play_bounds, num_threads)):
+                j = active_play[a]
                 inf_ij = play_infections_i[j]
 
                 if inf_ij > 0:
@@ -115,6 +175,8 @@ def advance_recovery_omp(network: Network, infections: Infections, rngs,
                         play_infections_i[j] -= l
 
         # end of parallel section
+
+        _update_active(all_infections, i, work_i, play_i, nthreads)
     # end of recovery loop
     p = p.stop()
 
@@ -142,6 +204,7 @@ def advance_recovery_serial(network: Network, infections: Infections,
 
     params = network.params
 
+    all_infections = infections
     play_infections = infections.play
     infections = infections.work
 
@@ -153,6 +216,13 @@ def advance_recovery_serial(network: Network, infections: Infections,
     cdef int * play_infections_i
     cdef int * play_infections_i_plus_one
 
+    # only the links and wards with infections in each stage are visited
+    cdef int * active_work
+    cdef int * active_play
+    cdef int nactive_work = 0
+    cdef int nactive_play = 0
+    cdef int a = 0
+
     # get the random number generator
     cdef binomial_rng* rng = _get_binomial_ptr(rngs[0])
 
@@ -181,8 +251,18 @@ def advance_recovery_serial(network: Network, infections: Infections,
         play_infections_i_plus_one = get_int_array_ptr(play_infections[i+1])
         disease_progress = params.disease_params.progress[i]
 
+        work_i = all_infections.get_active_work(i)
+        play_i = all_infections.get_active_play(i)
+        nactive_work = len(work_i)
+        nactive_play = len(play_i)
+        active_work = get_int_array_ptr(work_i) if nactive_work > 0 \
+                                                else <int*>0
+        active_play = get_int_array_ptr(play_i) if nactive_play > 0 \
+                                                else <int*>0
+
         with nogil:
-            for j in range(1, nlinks_plus_one):
+            for a in range(0, nactive_work):
+                j = active_work[a]
                 inf_ij = infections_i[j]
 
                 if inf_ij > 0:
@@ -192,7 +272,8 @@ def advance_recovery_serial(network: Network, infections: Infections,
                         infections_i_plus_one[j] += l
                         infections_i[j] -= l
 
-            for j in range(1, nnodes_plus_one):
+            for a in range(0, nactive_play):
+                j = active_play[a]
                 inf_ij = play_infections_i[j]
 
                 if inf_ij > 0:
@@ -203,6 +284,8 @@ def advance_recovery_serial(network: Network, infections: Infections,
                         play_infections_i[j] -= l
 
         # end of parallel section
+
+        _update_active(all_infections, i, work_i, play_i, 1)
     # end of recovery loop
     p = p.stop()
 
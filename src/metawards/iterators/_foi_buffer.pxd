@@ -0,0 +1,98 @@
+
+from libc.stdlib cimport calloc, free
+
+# Per-thread buffers of (ward index, foi) contributions that are used
+# to reduce the force of infection calculated in parallel in a
+# deterministic order
+
+
+cdef struct foi_buffer:
+    int count
+    int *index
+    double *foi
+    foi_buffer *next_buffer
+
+
+cdef inline foi_buffer* allocate_foi_buffer(int buffer_size=4096) nogil:
+
+    cdef int size = buffer_size
+    cdef foi_buffer *buffer = <foi_buffer *> calloc(1, sizeof(foi_buffer))
+
+    buffer[0].count = 0
+    buffer[0].index = <int *> calloc(size, sizeof(int))
+    buffer[0].foi = <double *> calloc(size, sizeof(double))
+    buffer[0].next_buffer = <foi_buffer*>0
+
+    return buffer
+
+
+cdef inline foi_buffer* allocate_foi_buffers(int nthreads,
+                                             int buffer_size=4096) nogil:
+    cdef int size = buffer_size
+    cdef int n = nthreads
+
+    cdef foi_buffer *buffers = <foi_buffer *> calloc(n, sizeof(foi_buffer))
+
+    for i in range(0, nthreads):
+        buffers[i].count = 0
+        buffers[i].index = <int *> calloc(size, sizeof(int))
+        buffers[i].foi = <double *> calloc(size, sizeof(double))
+        buffers[i].next_buffer = <foi_buffer*>0
+
+    return buffers
+
+
+cdef inline void free_foi_buffer(foi_buffer *buffer) nogil:
+    if buffer:
+        free(buffer[0].index)
+        buffer[0].index = <int *>0
+        free(buffer[0].foi)
+        buffer[0].foi = <double *>0
+
+        if buffer[0].next_buffer:
+            free_foi_buffer(buffer[0].next_buffer)
+            free(buffer[0].next_buffer)
+            buffer[0].next_buffer = <foi_buffer *>0
+
+
+cdef inline void free_foi_buffers(foi_buffer *buffers, int nthreads) nogil:
+    cdef int n = nthreads
+
+    for i in range(0, nthreads):
+        free_foi_buffer(&(buffers[i]))
+
+    free(buffers)
+
+
+cdef inline void add_from_buffer(foi_buffer *buffer,
+                                 double *wards_foi) nogil:
+    cdef int i = 0
+    cdef int count = buffer[0].count
+
+    for i in range(0, count):
+        wards_foi[buffer[0].index[i]] += buffer[0].foi[i]
+
+    if buffer[0].next_buffer:
+        add_from_buffer(buffer[0].next_buffer, wards_foi)
+
+    # added all of buffer, so set count to 0 to empty
+    buffer[0].count = 0
+
+
+cdef inline void add_to_buffer(foi_buffer *buffer, int index, double value,
+                               double *wards_foi,
+                               int buffer_size=4096) nogil:
+
+    cdef int count = buffer[0].count
+
+    if buffer[0].count >= buffer_size:
+        # we need to allocate another buffer and set to use that
+        if not buffer[0].next_buffer:
+            buffer[0].next_buffer = allocate_foi_buffer(buffer_size)
+
+        add_to_buffer(buffer[0].next_buffer, index, value,
+                      wards_foi, buffer_size)
+    else:
+        buffer[0].index[count] = index
+        buffer[0].foi[count] = value
+        buffer[0].count = count + 1
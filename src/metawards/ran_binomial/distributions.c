@@ -13,7 +13,31 @@ void seed_ran_binomial(binomial_rng *rng, uint32_t seed){
 }
 
 int64_t ran_binomial(binomial_rng *rng, double p, int64_t n){
-  return random_binomial(&(rng->state), p, n, &(rng->binomial));
+  if (rng->engine == BINOMIAL_ENGINE_FAST){
+    return random_binomial_fast(&(rng->state), p, n, &(rng->binomial),
+                                &(rng->fast));
+  }
+  else {
+    return random_binomial(&(rng->state), p, n, &(rng->binomial));
+  }
+}
+
+void ran_binomial_batch(binomial_rng *rng, double p, const int *n,
+                        int *result, int count){
+  int i;
+
+  for (i = 0; i < count; ++i){
+    result[i] = (int)ran_binomial(rng, p, n[i]);
+  }
+}
+
+void binomial_rng_set_engine(binomial_rng *rng, int engine){
+  rng->engine = engine;
+  rng->fast.psave = 0.0;
+}
+
+int binomial_rng_get_engine(binomial_rng *rng){
+  return rng->engine;
 }
 
 binomial_rng * binomial_rng_alloc(void)
@@ -760,3 +784,84 @@ int64_t random_binomial(bitgen_t *bitgen_state, double p, int64_t n,
     }
   }
 }
+
+/* The fast binomial engine. This uses the same algorithms as
+   random_binomial, but caches the setup of the inversion algorithm
+   per p, rather than per (n, p), so that loops that draw with the
+   same p but different n (e.g. disease progression) do not need
+   to recalculate q^n. For small n q^n is read from a table of
+   powers of q that is filled in as needed */
+static RAND_INT_TYPE random_binomial_fast_inversion(bitgen_t *bitgen_state,
+                                                    RAND_INT_TYPE n,
+                                                    double p,
+                                                    binomial_fast_t *fast) {
+  double qn, np, px, U;
+  RAND_INT_TYPE X, bound;
+
+  if (fast->psave != p) {
+    fast->psave = p;
+    fast->q = 1.0 - p;
+    fast->pq = p / fast->q;
+    fast->has_logq = 0;
+    fast->npow = 0;
+    fast->qpow[0] = 1.0;
+  }
+
+  if (n <= BINOMIAL_SMALL_N) {
+    while (fast->npow < n) {
+      fast->qpow[fast->npow + 1] = fast->qpow[fast->npow] * fast->q;
+      fast->npow++;
+    }
+
+    qn = fast->qpow[n];
+    bound = n;
+  } else {
+    if (!(fast->has_logq)) {
+      fast->logq = log(fast->q);
+      fast->has_logq = 1;
+    }
+
+    qn = exp(n * fast->logq);
+    np = n * p;
+    bound = (RAND_INT_TYPE)MIN(n, np + 10.0 * sqrt(np * fast->q + 1));
+  }
+
+  X = 0;
+  px = qn;
+  U = next_double(bitgen_state);
+  while (U > px) {
+    X++;
+    if (X > bound) {
+      X = 0;
+      px = qn;
+      U = next_double(bitgen_state);
+    } else {
+      U -= px;
+      px = ((n - X + 1) * fast->pq * px) / X;
+    }
+  }
+  return X;
+}
+
+int64_t random_binomial_fast(bitgen_t *bitgen_state, double p, int64_t n,
+                             binomial_t *binomial, binomial_fast_t *fast) {
+  double q;
+
+  if ((n == 0LL) || (p == 0.0f))
+    return 0;
+
+  if (p <= 0.5) {
+    if (p * n <= 30.0) {
+      return random_binomial_fast_inversion(bitgen_state, n, p, fast);
+    } else {
+      return random_binomial_btpe(bitgen_state, n, p, binomial);
+    }
+  } else {
+    q = 1.0 - p;
+    if (q * n <= 30.0) {
+      return n - random_binomial_fast_inversion(bitgen_state, n, q, fast);
+    } else {
+      return n - random_binomial_btpe(bitgen_state, n, q, binomial);
+    }
+  }
+}
@@ -53,9 +53,35 @@ DECLDIR float random_standard_exponential_f(bitgen_t *bitgen_state);
 DECLDIR int64_t random_binomial(bitgen_t *bitgen_state, double p,
                                 int64_t n, binomial_t *binomial);
 
+/* The largest n for which the fast binomial engine uses a cached
+   table of powers of q, rather than calculating q^n */
+#define BINOMIAL_SMALL_N 16
+
+typedef struct s_binomial_fast_t {
+  double psave; /* p for which the following were calculated (0 if none) */
+  double q;
+  double pq;    /* p / q */
+  int has_logq; /* !=0: logq has been calculated for psave */
+  double logq;
+  int npow;     /* qpow[0] to qpow[npow] have been calculated */
+  double qpow[BINOMIAL_SMALL_N + 1];
+} binomial_fast_t;
+
+DECLDIR int64_t random_binomial_fast(bitgen_t *bitgen_state, double p,
+                                     int64_t n, binomial_t *binomial,
+                                     binomial_fast_t *fast);
+
+/* The binomial engines - the default engine reproduces numpy, while
+   the fast engine caches its setup per p (rather than per (n, p))
+   and uses a table of powers of q for small n */
+#define BINOMIAL_ENGINE_DEFAULT 0
+#define BINOMIAL_ENGINE_FAST 1
+
 typedef struct s_binomial_rng_t {
   bitgen_t state;
   binomial_t binomial;
+  int engine;
+  binomial_fast_t fast;
 } binomial_rng;
 
 DECLDIR void seed_ran_binomial(binomial_rng *rng, uint32_t seed);
@@ -64,6 +90,12 @@ DECLDIR double binomial_rng_uniform(binomial_rng *rng);
 
 DECLDIR int64_t ran_binomial(binomial_rng *rng, double p, int64_t n);
 
+DECLDIR void ran_binomial_batch(binomial_rng *rng, double p, const int *n,
+                                int *result, int count);
+
+DECLDIR void binomial_rng_set_engine(binomial_rng *rng, int engine);
+DECLDIR int binomial_rng_get_engine(binomial_rng *rng);
+
 DECLDIR binomial_rng * binomial_rng_alloc(void);
 DECLDIR void binomial_rng_free(binomial_rng *rng);
 
@@ -12,6 +12,7 @@ Functions
     add_wards_network_distance
     aggregate_networks
     assert_sane_network
+    attach_shared_network
     build_play_matrix
     build_wards_network
     call_function_on_network
@@ -25,21 +26,35 @@ Functions
     delete_ran_binomial
     fill_in_gaps
     get_available_num_threads
+    get_binomial_engine
+    get_cutoff_masks
+    get_foi_reduction
     get_functions
     get_initialise_functions
     get_finalise_functions
     get_model_loop_functions
     get_min_max_distances
+    get_network_cache_dir
+    get_network_cache_filename
+    get_network_cache_key
     get_number_of_processes
+    get_play_sampler
+    get_thread_schedule
     initialise_infections
+    initialise_worker
     initialise_play_infections
+    is_wards_binary
+    load_network_cache
     move_population_from_work_to_play
     move_population_from_play_to_work
+    open_matrix_file
     prepare_worker
     ran_binomial
+    ran_binomial_batch
     ran_int
     ran_uniform
     read_done_file
+    read_matrix_file
     recalculate_work_denominator_day
     recalculate_play_denominator_day
     rescale_play_matrix
@@ -52,11 +67,18 @@ Functions
     run_models
     run_worker
     safe_eval_number
+    save_network_cache
     scale_link_susceptibles
     scale_node_susceptibles
     seed_ran_binomial
+    set_binomial_engine
+    set_foi_reduction
+    set_play_sampler
+    set_thread_schedule
+    share_network
     string_to_ints
     update_metawards
+    validate_binomial_engine
     zero_workspace
 
 Classes
@@ -65,8 +87,12 @@ Classes
 .. autosummary::
     :toctree: generated/
 
+    NetworkSnapshot
     Profiler
     NullProfiler
+    SharedNetwork
+    SpatialIndex
+    WardsColumns
 
 """
 
@@ -94,6 +120,7 @@ from ._recalculate_denominators import *
 from ._move_population import *
 from ._fill_in_gaps import *
 from ._build_play_matrix import *
+from ._read_matrix import *
 from ._array import *
 from ._ran_binomial import *
 from ._parallel import *
@@ -101,5 +128,16 @@ from ._scale_susceptibles import *
 from ._assert_sane_network import *
 from ._clear_all_infections import *
 from ._network_wards import *
+from ._wards_columns import *
+from ._harmonise_wards import *
 from ._network_functions import *
+from ._network_cache import *
+from ._shared_network import *
+from ._network_snapshot import *
+from ._cutoff_masks import *
+from ._spatial_index import *
 from ._zero_workspace import *
+from ._active_infections import *
+from ._foi_reduction import *
+from ._thread_schedule import *
+from ._play_sampler import *
@@ -0,0 +1,19 @@
+
+
+cdef inline int _lower_bound(int *values, int n, int value) nogil:
+    """Return the index of the first item in the sorted 'values'
+       (of size n) that is not less than 'value'
+    """
+    cdef int begin = 0
+    cdef int end = n
+    cdef int mid = 0
+
+    while begin < end:
+        mid = begin + (end - begin) // 2
+
+        if values[mid] < value:
+            begin = mid + 1
+        else:
+            end = mid
+
+    return begin
@@ -0,0 +1,219 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+
+from libc.stdlib cimport qsort
+
+from ._get_array_ptr cimport get_int_array_ptr
+
+__all__ = ["find_active_infections", "merge_active_infections",
+           "union_active_infections", "keeps_active_infections"]
+
+
+cdef int _compare_ints(const void *a, const void *b) nogil:
+    cdef int ia = (<int*>a)[0]
+    cdef int ib = (<int*>b)[0]
+
+    if ia < ib:
+        return -1
+    elif ia > ib:
+        return 1
+    else:
+        return 0
+
+
+cdef int * _get_ptr(a):
+    """Return the pointer to the int array 'a', or NULL if it is empty"""
+    if a is None or len(a) == 0:
+        return <int*>0
+    else:
+        return get_int_array_ptr(a)
+
+
+def find_active_infections(values, nthreads: int = 1):
+    """Return the sorted array of the indexes (from 1) of all of the
+       non-zero entries in 'values' (e.g. the work or play infections
+       for a single disease stage). This is a full scan, so should only
+       be used when the active set has to be rebuilt from scratch
+    """
+    from array import array
+
+    cdef int n = len(values)
+    cdef int * v = _get_ptr(values)
+    cdef int num_threads = nthreads
+    cdef int nchunks = max(1, nthreads)
+    cdef int chunk = 0
+    cdef int j = 0
+    cdef int start = 0
+    cdef int end = 0
+    cdef int pos = 0
+
+    if n <= 1:
+        return array("i")
+
+    # count the number of active indexes in each chunk, then fill
+    # each chunk in parallel at its offset
+    counts = array("i", [0]) * (nchunks + 1)
+    cdef int * c = get_int_array_ptr(counts)
+    cdef int size = (n - 1 + nchunks - 1) // nchunks
+
+    with nogil, parallel(num_threads=num_threads):
+        for chunk in prange(0, nchunks, schedule="static"):
+            start = 1 + chunk * size
+            end = min(n, start + size)
+            c[chunk+1] = 0
+
+            for j in range(start, end):
+                if v[j] != 0:
+                    c[chunk+1] += 1
+
+    for chunk in range(0, nchunks):
+        c[chunk+1] += c[chunk]
+
+    result = array("i", [0]) * c[nchunks]
+
+    if len(result) == 0:
+        return result
+
+    cdef int * r = get_int_array_ptr(result)
+
+    with nogil, parallel(num_threads=num_threads):
+        for chunk in prange(0, nchunks, schedule="static"):
+            start = 1 + chunk * size
+            end = min(n, start + size)
+            pos = c[chunk]
+
+            for j in range(start, end):
+                if v[j] != 0:
+                    r[pos] = j
+                    pos = pos + 1
+
+    return result
+
+
+def merge_active_infections(active1, active2, values):
+    """Return the sorted union of the sorted indexes in 'active1' and
+       'active2', keeping only those indexes with non-zero 'values'.
+       This takes a time proportional to the size of the active sets
+    """
+    from array import array
+
+    cdef int n1 = len(active1) if active1 is not None else 0
+    cdef int n2 = len(active2) if active2 is not None else 0
+    cdef int * a1 = _get_ptr(active1)
+    cdef int * a2 = _get_ptr(active2)
+    cdef int * v = _get_ptr(values)
+
+    result = array("i", [0]) * (n1 + n2)
+
+    if n1 + n2 == 0:
+        return result
+
+    cdef int * r = get_int_array_ptr(result)
+    cdef int i1 = 0
+    cdef int i2 = 0
+    cdef int n = 0
+    cdef int j = 0
+
+    with nogil:
+        while i1 < n1 or i2 < n2:
+            if i2 >= n2 or (i1 < n1 and a1[i1] < a2[i2]):
+                j = a1[i1]
+                i1 = i1 + 1
+            elif i1 >= n1 or a2[i2] < a1[i1]:
+                j = a2[i2]
+                i2 = i2 + 1
+            else:
+                j = a1[i1]
+                i1 = i1 + 1
+                i2 = i2 + 1
+
+            if v[j] != 0:
+                r[n] = j
+                n = n + 1
+
+    del result[n:]
+
+    return result
+
+
+def union_active_infections(candidates, values=None):
+    """Return the sorted, unique indexes from the (unsorted) array
+       'candidates' for which 'values' is non-zero (or all of the
+       unique indexes if 'values' is None)
+    """
+    from array import array
+
+    result = array("i", candidates)
+
+    cdef int n = len(result)
+
+    if n == 0:
+        return result
+
+    cdef int * r = get_int_array_ptr(result)
+    cdef int * v = _get_ptr(values)
+    cdef bint filter_values = (values is not None)
+    cdef int i = 0
+    cdef int nunique = 0
+
+    with nogil:
+        qsort(r, n, sizeof(int), &_compare_ints)
+
+        for i in range(0, n):
+            if filter_values and v[r[i]] == 0:
+                continue
+
+            if nunique == 0 or r[i] != r[nunique-1]:
+                r[nunique] = r[i]
+                nunique = nunique + 1
+
+    del result[nunique:]
+
+    return result
+
+
+_keeping_funcs = None
+
+
+def keeps_active_infections(func) -> bool:
+    """Return whether or not the passed model function is known to
+       keep the active infection sets of Infections up to date
+       (all functions that may change the infections without doing
+       this must be followed by Infections.invalidate_active)
+    """
+    global _keeping_funcs
+
+    if _keeping_funcs is None:
+        from ..iterators._advance_foi import advance_foi
+        from ..iterators._advance_foi_fused import advance_foi_fused
+        from ..iterators._advance_recovery import advance_recovery
+        from ..iterators._advance_infprob import advance_infprob
+        from ..iterators._advance_fixed import advance_fixed
+        from ..iterators._advance_play import advance_play
+        from ..iterators._advance_additional import advance_additional
+        from ..extractors._output_core import setup_core, output_core
+        from ..extractors._output_basic import output_basic
+        from ..extractors._output_dispersal import output_dispersal
+        from ..extractors._output_incidence import output_incidence
+        from ..extractors._output_prevalence import output_prevalence
+        from ..extractors._output_trajectory import output_trajectory
+        from ..extractors._output_final_report import output_final_report
+
+        _keeping_funcs = set([advance_foi, advance_foi_fused,
+                              advance_recovery,
+                              advance_infprob, advance_fixed,
+                              advance_play, advance_additional,
+                              setup_core, output_core, output_basic,
+                              output_dispersal, output_incidence,
+                              output_prevalence, output_trajectory,
+                              output_final_report])
+
+    try:
+        return func in _keeping_funcs
+    except TypeError:
+        # unhashable, so cannot be one of the known functions
+        return False
@@ -40,12 +40,14 @@ def aggregate_infections(infections: Infections, profiler: Profiler,
 
     p = profiler.start("aggregate_infections")
 
+    from array import array
+    from ._active_infections import union_active_infections
+
     cdef int i = 0
     cdef int j = 0
+    cdef int a = 0
     cdef int idx = 0
-    cdef int nnodes_plus_one = infections.nnodes + 1
-    cdef int nlinks_plus_one = infections.nlinks + 1
-    cdef int nsublinks_plus_one = 0
+    cdef int nactive = 0
     cdef int num_threads = nthreads
 
     cdef int * infections_i
@@ -53,21 +55,43 @@ def aggregate_infections(infections: Infections, profiler: Profiler,
     cdef int * sub_infections_i
     cdef int * sub_play_infections_i
     cdef int * idxs
+    cdef int * active
+    cdef int * mapped
+
+    # Only the links and wards with infections are visited, so this
+    # takes a time proportional to the number of infected links
 
-    # zero the overal infections
+    # zero the overall infections
     p = p.start("zero")
     for i in range(0, infections.N_INF_CLASSES):
         infections_i = get_int_array_ptr(infections.work[i])
         play_infections_i = get_int_array_ptr(infections.play[i])
 
-        with nogil, parallel(num_threads=num_threads):
-            for j in prange(1, nnodes_plus_one, schedule="static"):
-                play_infections_i[j] = 0
+        work_i = infections.get_active_work(i, nthreads=nthreads)
+        nactive = len(work_i)
+
+        if nactive > 0:
+            active = get_int_array_ptr(work_i)
+
+            with nogil, parallel(num_threads=num_threads):
+                for a in prange(0, nactive, schedule="static"):
+                    infections_i[active[a]] = 0
+
+        play_i = infections.get_active_play(i, nthreads=nthreads)
+        nactive = len(play_i)
+
+        if nactive > 0:
+            active = get_int_array_ptr(play_i)
 
-            for j in prange(1, nlinks_plus_one, schedule="static"):
-                infections_i[j] = 0
+            with nogil, parallel(num_threads=num_threads):
+                for a in prange(0, nactive, schedule="static"):
+                    play_infections_i[active[a]] = 0
     p = p.stop()
 
+    # the (overall) indexes that may now have infections in each stage
+    work_candidates = [array("i") for _ in range(infections.N_INF_CLASSES)]
+    play_candidates = [array("i") for _ in range(infections.N_INF_CLASSES)]
+
     # aggregate from the sub-infections
     for ii, subinf in enumerate(infections.subinfs):
         p = p.start(f"aggregate_{ii}")
@@ -80,32 +104,61 @@ def aggregate_infections(infections: Infections, profiler: Profiler,
             sub_play_infections_i = get_int_array_ptr(subinf.play[i])
 
             # aggregate the work infections
-            if subinf.has_different_work_matrix():
-                # the subnetwork has a different work matrix
-                idxs = get_int_array_ptr(subinf.get_work_index())
-                nsublinks_plus_one = subinf.nlinks + 1
+            work_i = subinf.get_active_work(i, nthreads=nthreads)
+            nactive = len(work_i)
+
+            if nactive > 0:
+                active = get_int_array_ptr(work_i)
+
+                if subinf.has_different_work_matrix():
+                    # the subnetwork has a different work matrix
+                    idxs = get_int_array_ptr(subinf.get_work_index())
+                    mapped_i = array("i", [0]) * nactive
+                    mapped = get_int_array_ptr(mapped_i)
+
+                    with nogil, parallel(num_threads=num_threads):
+                        for a in prange(0, nactive, schedule="static"):
+                            j = active[a]
+                            idx = idxs[j]
+                            mapped[a] = idx
+                            infections_i[idx] = infections_i[idx] + \
+                                                sub_infections_i[j]
+
+                    work_candidates[mapping[i]].extend(mapped_i)
+                else:
+                    # the subnetwork has the same work matrix
+                    with nogil, parallel(num_threads=num_threads):
+                        for a in prange(0, nactive, schedule="static"):
+                            j = active[a]
+                            infections_i[j] = infections_i[j] + \
+                                              sub_infections_i[j]
+
+                    work_candidates[mapping[i]].extend(work_i)
 
-                with nogil, parallel(num_threads=num_threads):
-                    for j in prange(1, nsublinks_plus_one, schedule="static"):
-                        idx = idxs[j]
-                        infections_i[idx] = infections_i[idx] + \
-                                            sub_infections_i[j]
+            # aggregate the play infections
+            play_i = subinf.get_active_play(i, nthreads=nthreads)
+            nactive = len(play_i)
+
+            if nactive > 0:
+                active = get_int_array_ptr(play_i)
 
-            else:
-                # the subnetwork has the same work matrix
                 with nogil, parallel(num_threads=num_threads):
-                    for j in prange(1, nlinks_plus_one, schedule="static"):
-                        infections_i[j] = infections_i[j] + \
-                                          sub_infections_i[j]
+                    for a in prange(0, nactive, schedule="static"):
+                        j = active[a]
+                        play_infections_i[j] = play_infections_i[j] + \
+                                               sub_play_infections_i[j]
 
-            # aggregate the play infections
-            with nogil, parallel(num_threads=num_threads):
-                for j in prange(1, nnodes_plus_one, schedule="static"):
-                    play_infections_i[j] = play_infections_i[j] + \
-                                           sub_play_infections_i[j]
+                play_candidates[mapping[i]].extend(play_i)
 
         p = p.stop()
 
+    for i in range(0, infections.N_INF_CLASSES):
+        infections.set_active(
+            i, work=union_active_infections(work_candidates[i],
+                                            infections.work[i]),
+            play=union_active_infections(play_candidates[i],
+                                         infections.play[i]))
+
     p = p.stop()
 
 
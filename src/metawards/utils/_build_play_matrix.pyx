@@ -12,7 +12,7 @@ __all__ = ["build_play_matrix"]
 
 def build_play_matrix(network: Network,
                       max_nodes: int, max_links: int,
-                      profiler: Profiler=None):
+                      profiler: Profiler=None, nthreads: int = 1):
     """Build the play matrix for the passed network"""
     if profiler is None:
         profiler = NullProfiler()
@@ -38,9 +38,12 @@ def build_play_matrix(network: Network,
     cdef int to_id = 0
     cdef double weight = 0.0
 
-    cdef int linenum = 0
-    cdef int nlines = 0
-    cdef int update_freq = 0
+    cdef int i = 0
+    cdef int nrecords = 0
+    cdef int bad_record = -1
+    cdef int * records_from
+    cdef int * records_to
+    cdef double * records_weight
 
     cdef int * nodes_label = get_int_array_ptr(nodes.label)
     cdef int * nodes_begin_p = get_int_array_ptr(nodes.begin_p)
@@ -61,8 +64,8 @@ def build_play_matrix(network: Network,
     cdef int MAX_NODES = max_nodes
 
     from ._console import Console
+    from ._read_matrix import read_matrix_file
 
-    # need to use C file reading as too slow in python
     if params.input_files.play is None:
         Console.print("No play links file to read")
     else:
@@ -70,51 +73,35 @@ def build_play_matrix(network: Network,
 
         filename = params.input_files.play
 
-        Console.print(f"Reading {filename} into memory...")
-        lines = open(filename, "r").readlines()
+        (from_ids, to_ids, weights) = read_matrix_file(filename=filename,
+                                                       ncols=3,
+                                                       nthreads=nthreads,
+                                                       profiler=p)
 
-        # try to read the lines using the csv module - should be space or
-        # comma-separated lines
-        import csv
-        dialect = csv.Sniffer().sniff(lines[0], delimiters=[" ", ","])
-
-        nlines = len(lines)
-        update_freq = int(nlines / 1000)
+        nrecords = len(from_ids)
+        records_from = get_int_array_ptr(from_ids)
+        records_to = get_int_array_ptr(to_ids)
+        records_weight = get_double_array_ptr(weights)
 
         # resets the node label as a flag to check progress?
         for j in range(1, nnodes_plus_one):
             nodes_label[j] = -1
 
-        with Console.progress() as progress:
-            task = progress.add_task("Parsing contents", total=nlines)
-
-            for parts in csv.reader(lines, dialect=dialect):
-                linenum += 1
-
-                if len(parts) == 0:
-                    continue
-                elif len(parts) != 3:
-                    Console.error(
-                        f"Read invalid line from {filename} line {linenum}\n"
-                        f"{parts}")
-                    raise IOError(f"Invalid line read from {filename}")
-
-                from_id = int(parts[0])
-                to_id = int(parts[1])
-                weight = float(parts[2])
+        # merge the parsed records into the pre-allocated links
+        with nogil:
+            for i in range(0, nrecords):
+                from_id = records_from[i]
+                to_id = records_to[i]
+                weight = records_weight[i]
 
                 nlinks += 1
 
                 if nlinks >= MAX_LINKS:
                     break
 
-                if from_id == 0 or to_id == 0:
-                    Console.error(
-                        f"{filename} is corrupted! Error on line {linenum}.\n"
-                        f"{parts}\n"
-                        f"Zero in link list: {from_id}-{to_id}!\n"
-                        f"Renumber files and start again")
-                    raise IOError(f"Corrupted file {filename}, line {linenum}")
+                if from_id <= 0 or to_id <= 0:
+                    bad_record = i
+                    break
 
                 if nodes_label[from_id] == -1:
                     nodes_label[from_id] = from_id
@@ -133,10 +120,13 @@ def build_play_matrix(network: Network,
                 nodes_denominator_p[from_id] += weight
                 nodes_play_suscept[from_id] += weight
 
-                if linenum % update_freq == 0:
-                    progress.update(task, completed=linenum)
-
-            progress.update(task, completed=nlines, force_update=True)
+        if bad_record != -1:
+            Console.error(
+                f"{filename} is corrupted! Error in entry {bad_record+1}.\n"
+                f"Zero in link list: {from_id}-{to_id}!\n"
+                f"Renumber files and start again")
+            raise IOError(f"Corrupted file {filename}, "
+                          f"entry {bad_record+1}")
 
         if nlinks >= MAX_LINKS:
             raise MemoryError(f"There are too many links (>{nlinks}) to fit "
@@ -175,47 +165,41 @@ def build_play_matrix(network: Network,
     if params.input_files.play_size is None:
         Console.print("No play_size file to read")
     else:
-        # need to use C file reading as too slow in python
         p = p.start("read_play_size_file")
         filename = params.input_files.play_size
 
-        Console.print(f"Reading {filename} into memory...")
-        lines = open(filename, "r").readlines()
-
-        dialect = csv.Sniffer().sniff(lines[0], delimiters=[" ", ","])
+        (ids, sizes) = read_matrix_file(filename=filename, ncols=2,
+                                        nthreads=nthreads, profiler=p)
 
-        linenum = 0
-        nlines = len(lines)
-        update_freq = int(nlines / 1000)
+        nrecords = len(ids)
+        records_from = get_int_array_ptr(ids)
+        records_to = get_int_array_ptr(sizes)
 
-        with Console.progress() as progress:
-            task = progress.add_task("Parsing contents", total=nlines)
+        with nogil:
+            for i in range(0, nrecords):
+                i1 = records_from[i]
+                i2 = records_to[i]
 
-            for parts in csv.reader(lines, dialect=dialect):
-                linenum += 1
-
-                if len(parts) == 0:
-                    continue
-                elif len(parts) != 2:
-                    Console.error(
-                        f"Read invalid line from {filename} line {linenum}\n"
-                        f"{parts}")
-                    raise IOError(f"Invalid line read from {filename}")
-
-                i1 = int(parts[0])
-                i2 = int(parts[1])
+                if i1 <= 0:
+                    bad_record = i
+                    break
 
                 if i1 > max_node_id:
                     max_node_id = i1
 
+                if i1 >= MAX_NODES:
+                    # too many nodes - this is reported below
+                    break
+
                 nodes_play_suscept[i1] = i2
                 nodes_denominator_p[i1] = i2
                 nodes_save_play_suscept[i1] = i2
 
-                if linenum % update_freq == 0:
-                    progress.update(task, completed=linenum)
-
-            progress.update(task, completed=nlines, force_update=True)
+        if bad_record != -1:
+            Console.error(f"{filename} is corrupted! Invalid ward ID "
+                          f"{i1} in entry {bad_record+1}")
+            raise IOError(f"Corrupted file {filename}, "
+                          f"entry {bad_record+1}")
 
         # we now need to fill in the missing nodes that are defined
         # in the play_size file, but were not linked to in the node
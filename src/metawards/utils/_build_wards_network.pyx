@@ -14,12 +14,20 @@ from ._profiler import Profiler, NullProfiler
 __all__ = ["build_wards_network"]
 
 
-def _read_network(filename: str, max_nodes: int, max_links: int):
+def _read_network(filename: str, max_nodes: int, max_links: int,
+                  nthreads: int = 1, profiler: Profiler = None):
     """This function reads in the network of nodes and links
        from the passed file, returning a tuple of (Nodes, Links)
     """
-    nodes = Nodes(max_nodes + 1)     # need to pre-allocate nodes and links
-    links = Links(max_links + 1)   # both of these use 1-indexing
+    from ._read_matrix import read_matrix_file
+
+    (from_ids, to_ids, weights) = read_matrix_file(filename=filename,
+                                                   ncols=3,
+                                                   nthreads=nthreads,
+                                                   profiler=profiler)
+
+    nodes = Nodes(max_nodes + 1)     # need to pre-allocate nodes and links
+    links = Links(max_links + 1)   # both of these use 1-indexing
 
     cdef int MAX_LINKS = max_links
     cdef int MAX_NODES = max_nodes
@@ -31,9 +39,9 @@ def _read_network(filename: str, max_nodes: int, max_links: int):
     cdef int to_id = 0
     cdef double weight = 0.0
 
-    cdef int linenum = 0
-    cdef int nlines = 0
-    cdef int update_freq = 0
+    cdef int i = 0
+    cdef int nrecords = len(from_ids)
+    cdef int bad_record = -1
 
     cdef int * nodes_begin_to = get_int_array_ptr(nodes.begin_to)
     cdef int * nodes_end_to = get_int_array_ptr(nodes.end_to)
@@ -50,45 +58,22 @@ def _read_network(filename: str, max_nodes: int, max_links: int):
     cdef double * nodes_denominator_n = get_double_array_ptr(
                                                     nodes.denominator_n)
 
-    # read all the lines of the file into memory
-    from ._console import Console
-
-    Console.print(f"Reading {filename} into memory...")
-    lines = open(filename, "r").readlines()
-
-    # try to read the lines using the csv module - should be space or
-    # comma-separated lines
-    import csv
-    dialect = csv.Sniffer().sniff(lines[0], delimiters=[" ", ","])
-
-    nlines = len(lines)
-    update_freq = int(nlines / 1000)
+    cdef int * records_from = get_int_array_ptr(from_ids)
+    cdef int * records_to = get_int_array_ptr(to_ids)
+    cdef double * records_weight = get_double_array_ptr(weights)
 
-    with Console.progress() as progress:
-        task = progress.add_task("Parsing contents", total=nlines)
-
-        for parts in csv.reader(lines, dialect=dialect):
-            linenum += 1
-
-            if len(parts) == 0:
-                continue
-            elif len(parts) != 3:
-                Console.error(
-                    f"Read invalid line from {filename} line {linenum}\n"
-                    f"{parts}")
-                raise IOError(f"Invalid line read from {filename}")
+    from ._console import Console
 
-            from_id = int(parts[0])
-            to_id = int(parts[1])
-            weight = float(parts[2])
+    # merge the parsed records into the pre-allocated nodes and links
+    with nogil:
+        for i in range(0, nrecords):
+            from_id = records_from[i]
+            to_id = records_to[i]
+            weight = records_weight[i]
 
-            if from_id == 0 or to_id == 0:
-                Console.error(
-                    f"{filename} is corrupted! Error on line {linenum}.\n"
-                    f"{parts}\n"
-                    f"Zero in link list: {from_id}-{to_id}!\n"
-                    f"Renumber files and start again")
-                raise IOError(f"Corrupted file {filename}, line {linenum}")
+            if from_id <= 0 or to_id <= 0:
+                bad_record = i
+                break
 
             nlinks += 1
 
@@ -122,10 +107,12 @@ def _read_network(filename: str, max_nodes: int, max_links: int):
             nodes_denominator_n[from_id] += weight
             nodes_denominator_d[to_id] += weight
 
-            if linenum % update_freq == 0:
-                progress.update(task, completed=linenum)
-
-        progress.update(task, completed=nlines, force_update=True)
+    if bad_record != -1:
+        Console.error(
+            f"{filename} is corrupted! Error in entry {bad_record+1}.\n"
+            f"Zero in link list: {from_id}-{to_id}!\n"
+            f"Renumber files and start again")
+        raise IOError(f"Corrupted file {filename}, entry {bad_record+1}")
 
     if nlinks >= MAX_LINKS or nnodes >= MAX_NODES:
         raise MemoryError(
@@ -191,7 +178,9 @@ def build_wards_network(params: Parameters,
             (nodes, links,
              nnodes, nlinks) = _read_network(filename=workfile,
                                              max_nodes=max_nodes,
-                                             max_links=max_links)
+                                             max_links=max_links,
+                                             nthreads=nthreads,
+                                             profiler=p)
         except MemoryError as e:
             Console.print(f"Increasing max_nodes to {max_nodes*2} and "
                           f"max_links to {max_links*2}")
@@ -231,7 +220,7 @@ def build_wards_network(params: Parameters,
     from . import build_play_matrix
     p = p.start("build_play_matrix")
     build_play_matrix(network=network, profiler=p, max_nodes=max_nodes,
-                      max_links=max_links)
+                      max_links=max_links, nthreads=nthreads)
     p = p.stop()
 
     # now finally go through all of the nodes and make sure that their
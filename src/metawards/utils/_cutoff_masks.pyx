@@ -0,0 +1,139 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+
+from libc.string cimport memcmp
+
+from .._network import Network
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+__all__ = ["get_cutoff_masks"]
+
+
+def _build_mask(links, int nlinks, wards_cutoff, double cutoff,
+                int nthreads):
+    """Return the mask of which of the 'nlinks' links are within
+       the effective cutoff distance, or None if all are
+    """
+    from ._array import create_int_array
+
+    mask = create_int_array(nlinks + 1, 0)
+
+    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
+    cdef int * links_ito = get_int_array_ptr(links.ito)
+    cdef double * links_distance = get_double_array_ptr(links.distance)
+    cdef double * cutoffs = get_double_array_ptr(wards_cutoff)
+    cdef int * in_cutoff = get_int_array_ptr(mask)
+
+    cdef int nlinks_plus_one = nlinks + 1
+    cdef int num_threads = nthreads
+    cdef int j = 0
+    cdef int ninside = 0
+    cdef double local_cutoff = 0.0
+
+    with nogil, parallel(num_threads=num_threads):
+        for j in prange(1, nlinks_plus_one, schedule="static"):
+            local_cutoff = min(cutoff, cutoffs[links_ifrom[j]])
+            local_cutoff = min(local_cutoff, cutoffs[links_ito[j]])
+
+            if links_distance[j] < local_cutoff:
+                in_cutoff[j] = 1
+                ninside += 1
+
+    if ninside == nlinks:
+        return None
+    else:
+        return mask
+
+
+def _get_topology(network: Network):
+    """Return the arrays that describe the topology of the network.
+       These are shared by copies of the network, so the masks
+       remain valid for copies
+    """
+    return [network.links.ifrom, network.links.ito, network.links.distance,
+            network.play.ifrom, network.play.ito, network.play.distance]
+
+
+def _is_unchanged(masks, network: Network, double cutoff) -> bool:
+    """Return whether the cached 'masks' are still valid for 'network'"""
+    if masks is None:
+        return False
+
+    if masks["cutoff"] != cutoff or \
+            masks["nlinks"] != network.nlinks or \
+            masks["nplay"] != network.nplay:
+        return False
+
+    for old, new in zip(masks["topology"], _get_topology(network)):
+        if old is not new:
+            return False
+
+    saved = masks["wards_cutoff"]
+    wards_cutoff = network.nodes.cutoff
+
+    if len(saved) != len(wards_cutoff):
+        return False
+
+    cdef double * a = get_double_array_ptr(saved)
+    cdef double * b = get_double_array_ptr(wards_cutoff)
+    cdef int n = len(saved)
+
+    return memcmp(a, b, n * sizeof(double)) == 0
+
+
+def get_cutoff_masks(network: Network, nthreads: int = 1):
+    """Return the masks of which work and play links are within
+       the effective distance cutoff, i.e. for which
+
+       distance < min(params.dyn_dist_cutoff,
+                      nodes.cutoff[ifrom], nodes.cutoff[ito])
+
+       The masks are int arrays (1 if the link is within the cutoff,
+       0 if it is outside) indexed by link. These are cached on the
+       network and are only rebuilt if params.dyn_dist_cutoff or
+       nodes.cutoff change, so that the iterators don't have to
+       calculate the cutoff of each link for each disease class on
+       every day.
+
+       Parameters
+       ----------
+       network: Network
+         The network for which to return the masks
+       nthreads: int
+         The number of threads to use to build the masks
+
+       Returns
+       -------
+       (links_mask, play_mask): tuple
+         The masks for the work and play links. A mask is None if
+         all links are within the cutoff, so that no check is needed
+    """
+    cdef double cutoff = network.params.dyn_dist_cutoff
+
+    masks = network._cutoff_masks
+
+    if not _is_unchanged(masks, network=network, cutoff=cutoff):
+        from copy import deepcopy
+
+        wards_cutoff = network.nodes.cutoff
+
+        # the masks are replaced rather than updated in-place, as
+        # shallow copies of this network will share the old masks
+        masks = {"cutoff": cutoff,
+                 "wards_cutoff": deepcopy(wards_cutoff),
+                 "topology": _get_topology(network),
+                 "nlinks": network.nlinks,
+                 "nplay": network.nplay,
+                 "links_mask": _build_mask(network.links, network.nlinks,
+                                           wards_cutoff, cutoff, nthreads),
+                 "play_mask": _build_mask(network.play, network.nplay,
+                                          wards_cutoff, cutoff, nthreads)}
+
+        network._cutoff_masks = masks
+
+    return (masks["links_mask"], masks["play_mask"])
@@ -0,0 +1,315 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+
+from .._network import Network
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+__all__ = ["get_foi_reduction", "set_foi_reduction", "use_ward_reduction",
+           "get_ward_reduction", "reduce_work_foi", "reduce_play_foi"]
+
+
+_foi_reduction = "auto"
+
+
+def get_foi_reduction() -> str:
+    """Return the method used to reduce the force of infection
+       calculated in parallel by the iterators. This is one of
+       "auto", "buffer" or "ward" (see set_foi_reduction)
+    """
+    return _foi_reduction
+
+
+def set_foi_reduction(method: str = "auto") -> None:
+    """Set the method used to reduce the force of infection calculated
+       in parallel by the iterators (e.g. advance_foi_omp). Both methods
+       give bitwise identical results.
+
+       Parameters
+       ----------
+       method: str
+         "buffer" - each thread buffers its (ward, foi) contributions,
+                    which are then added serially in thread order.
+                    This is fastest when few links are infected.
+         "ward" - each link stores its contribution, which are then
+                  added in parallel over the destination wards, in
+                  the same order as for "buffer". This is fastest
+                  when many links are infected and there are many
+                  threads.
+         "auto" - choose the fastest method based on the number of
+                  contributions, links, wards and threads (default)
+    """
+    global _foi_reduction
+
+    if method is None:
+        method = "auto"
+
+    method = str(method).strip().lower()
+
+    if method not in ["auto", "buffer", "ward"]:
+        raise ValueError(
+            f"Unrecognised foi reduction method '{method}'. This should "
+            f"be one of 'auto', 'buffer' or 'ward'")
+
+    _foi_reduction = method
+
+
+def use_ward_reduction(ncontribs: int, nlinks: int, nnodes: int,
+                       nthreads: int) -> bool:
+    """Return whether or not the ward-partitioned reduction should be
+       used to reduce 'ncontribs' (estimated) foi contributions from
+       'nlinks' links into 'nnodes' wards using 'nthreads' threads.
+       The buffered reduction costs one serial add per contribution,
+       while the ward-partitioned reduction visits every link and
+       ward, but divides this work between the threads
+    """
+    if _foi_reduction == "buffer":
+        return False
+    elif _foi_reduction == "ward":
+        return True
+    elif nthreads is None or nthreads <= 1:
+        return False
+    else:
+        return ncontribs * nthreads > 2 * (nlinks + nnodes)
+
+
+def _build_index(keys, order, int nnodes):
+    """Return the (begin, items) CSR index that lists, for each ward
+       from 1 to nnodes, the items in 'order' whose 'keys' equal
+       that ward, in the same order as they appear in 'order'
+    """
+    from ._array import create_int_array
+
+    begin = create_int_array(nnodes + 2, 0)
+    items = create_int_array(max(1, len(order)), 0)
+
+    cdef int * k = get_int_array_ptr(keys)
+    cdef int * b = get_int_array_ptr(begin)
+    cdef int * it = get_int_array_ptr(items)
+    cdef int * o = get_int_array_ptr(order) if len(order) > 0 else <int*>0
+    cdef int norder = len(order)
+    cdef int i = 0
+    cdef int j = 0
+    cdef int w = 0
+
+    with nogil:
+        for i in range(0, norder):
+            w = k[o[i]]
+            b[w + 1] += 1
+
+        for w in range(1, nnodes + 1):
+            b[w + 1] += b[w]
+
+        for i in range(0, norder):
+            j = o[i]
+            w = k[j]
+            it[b[w]] = j
+            b[w] += 1
+
+        # b[w] now points to the end of w, so shift back by one ward
+        for w in range(nnodes, 0, -1):
+            b[w] = b[w - 1]
+
+        b[0] = 0
+
+    return (begin, items)
+
+
+def _play_order(network: Network):
+    """Return the play links in the order in which they are visited
+       by the iterators, i.e. by source ward and then from
+       begin_p to end_p
+    """
+    from array import array
+
+    wards = network.nodes
+
+    cdef int * begin_p = get_int_array_ptr(wards.begin_p)
+    cdef int * end_p = get_int_array_ptr(wards.end_p)
+    cdef int nnodes = network.nnodes
+    cdef int i = 0
+    cdef int k = 0
+    cdef int n = 0
+
+    for i in range(1, nnodes + 1):
+        if end_p[i] > begin_p[i] and begin_p[i] > 0:
+            n += end_p[i] - begin_p[i]
+
+    order = array("i", [0]) * n
+
+    if n == 0:
+        return order
+
+    cdef int * o = get_int_array_ptr(order)
+    n = 0
+
+    for i in range(1, nnodes + 1):
+        if end_p[i] > begin_p[i] and begin_p[i] > 0:
+            for k in range(begin_p[i], end_p[i]):
+                o[n] = k
+                n += 1
+
+    return order
+
+
+def _get_topology(network: Network):
+    """Return the arrays that describe the topology of the network.
+       These are shared by copies of the network, so the index
+       remains valid for copies
+    """
+    return [network.links.ifrom, network.links.ito,
+            network.play.ifrom, network.play.ito,
+            network.nodes.begin_p, network.nodes.end_p]
+
+
+def get_ward_reduction(network: Network):
+    """Return the index (a dictionary) used by the ward-partitioned
+       reduction of the force of infection. This lists, for each
+       ward, the work links that start and end in that ward and
+       the play links that end in that ward, plus the per-link
+       arrays into which the iterators write their contributions.
+       This is built on first use and then cached on the network
+    """
+    from array import array
+    from ._array import create_double_array
+
+    index = network._ward_reduction
+
+    if index is not None:
+        if index["nnodes"] == network.nnodes and \
+                index["nlinks"] == network.nlinks and \
+                index["nplay"] == network.nplay and \
+                all(old is new for old, new in
+                    zip(index["topology"], _get_topology(network))):
+            return index
+
+    nnodes = network.nnodes
+    nlinks = network.nlinks
+    nplay = network.nplay
+
+    # work links are visited in order of link index
+    links_order = array("i", range(1, nlinks + 1))
+
+    (from_begin, from_links) = _build_index(network.links.ifrom, links_order,
+                                            nnodes)
+    (to_begin, to_links) = _build_index(network.links.ito, links_order,
+                                        nnodes)
+    (play_begin, play_links) = _build_index(network.play.ito,
+                                            _play_order(network), nnodes)
+
+    index = {"nnodes": nnodes, "nlinks": nlinks, "nplay": nplay,
+             "topology": _get_topology(network),
+             "from_begin": from_begin, "from_links": from_links,
+             "to_begin": to_begin, "to_links": to_links,
+             "play_begin": play_begin, "play_links": play_links,
+             # contributions of each link - these are zeroed as they
+             # are reduced, so are ready for the next use
+             "day_from": create_double_array(nlinks + 1, 0.0),
+             "day_to": create_double_array(nlinks + 1, 0.0),
+             "night_from": create_double_array(nlinks + 1, 0.0),
+             "play_day": create_double_array(nplay + 1, 0.0)}
+
+    network._ward_reduction = index
+
+    return index
+
+
+def reduce_work_foi(index, day_foi, night_foi, nthreads: int = 1) -> None:
+    """Add the per-link work contributions in 'index' (written by the
+       iterators into index["day_from"], index["day_to"] and
+       index["night_from"]) onto 'day_foi' and 'night_foi', in
+       parallel over the wards. The contributions to each ward are
+       added in order of link index (with the contribution to the
+       source before that to the destination), which is the same
+       order as the buffered reduction, so the result is bitwise
+       identical. The contributions are zeroed as they are added
+    """
+    cdef int nnodes_plus_one = index["nnodes"] + 1
+
+    cdef int * from_begin = get_int_array_ptr(index["from_begin"])
+    cdef int * from_links = get_int_array_ptr(index["from_links"])
+    cdef int * to_begin = get_int_array_ptr(index["to_begin"])
+    cdef int * to_links = get_int_array_ptr(index["to_links"])
+
+    cdef double * day_from = get_double_array_ptr(index["day_from"])
+    cdef double * day_to = get_double_array_ptr(index["day_to"])
+    cdef double * night_from = get_double_array_ptr(index["night_from"])
+
+    cdef double * wards_day_foi = get_double_array_ptr(day_foi)
+    cdef double * wards_night_foi = get_double_array_ptr(night_foi)
+
+    cdef int num_threads = nthreads
+    cdef int w = 0
+    cdef int f = 0
+    cdef int f_end = 0
+    cdef int t = 0
+    cdef int t_end = 0
+    cdef int j = 0
+    cdef double day = 0.0
+    cdef double night = 0.0
+
+    with nogil, parallel(num_threads=num_threads):
+        for w in prange(1, nnodes_plus_one, schedule="static"):
+            f = from_begin[w]
+            f_end = from_begin[w + 1]
+            t = to_begin[w]
+            t_end = to_begin[w + 1]
+
+            day = wards_day_foi[w]
+            night = wards_night_foi[w]
+
+            # merge the links from and to this ward in link order
+            while f < f_end or t < t_end:
+                if t >= t_end or (f < f_end and from_links[f] <= to_links[t]):
+                    j = from_links[f]
+                    day = day + day_from[j]
+                    night = night + night_from[j]
+                    day_from[j] = 0.0
+                    night_from[j] = 0.0
+                    f = f + 1
+                else:
+                    j = to_links[t]
+                    day = day + day_to[j]
+                    day_to[j] = 0.0
+                    t = t + 1
+
+            wards_day_foi[w] = day
+            wards_night_foi[w] = night
+
+
+def reduce_play_foi(index, day_foi, nthreads: int = 1) -> None:
+    """Add the per-play-link contributions in index["play_day"] onto
+       'day_foi', in parallel over the destination wards. These are
+       added in the order in which the play links are visited by
+       the iterators, so the result is bitwise identical to the
+       buffered reduction. The contributions are zeroed as they
+       are added
+    """
+    cdef int nnodes_plus_one = index["nnodes"] + 1
+
+    cdef int * play_begin = get_int_array_ptr(index["play_begin"])
+    cdef int * play_links = get_int_array_ptr(index["play_links"])
+    cdef double * play_day = get_double_array_ptr(index["play_day"])
+
+    cdef double * wards_day_foi = get_double_array_ptr(day_foi)
+
+    cdef int num_threads = nthreads
+    cdef int w = 0
+    cdef int t = 0
+    cdef int k = 0
+    cdef double day = 0.0
+
+    with nogil, parallel(num_threads=num_threads):
+        for w in prange(1, nnodes_plus_one, schedule="static"):
+            day = wards_day_foi[w]
+
+            for t in range(play_begin[w], play_begin[w + 1]):
+                k = play_links[t]
+                day = day + play_day[k]
+                play_day[k] = 0.0
+
+            wards_day_foi[w] = day
@@ -0,0 +1,852 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+
+from libc.math cimport floor
+from libc.stdlib cimport qsort, malloc, free
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+
+cdef int * _int_ptr(a):
+    """Return the pointer to the int array 'a', or NULL if it is empty"""
+    if a is None or len(a) == 0:
+        return <int*>0
+    else:
+        return get_int_array_ptr(a)
+
+
+cdef double * _double_ptr(a):
+    """Return the pointer to the double array 'a', or NULL if it
+       is empty
+    """
+    if a is None or len(a) == 0:
+        return <double*>0
+    else:
+        return get_double_array_ptr(a)
+
+__all__ = ["harmonise_wards_columns", "scale_wards_columns"]
+
+
+cdef int _compare_ints(const void *a, const void *b) nogil:
+    cdef int ia = (<int*>a)[0]
+    cdef int ib = (<int*>b)[0]
+
+    if ia < ib:
+        return -1
+    elif ia > ib:
+        return 1
+    else:
+        return 0
+
+
+cdef int _compare_keys(const void *a, const void *b) nogil:
+    cdef long long ka = (<long long*>a)[0]
+    cdef long long kb = (<long long*>b)[0]
+
+    if ka < kb:
+        return -1
+    elif ka > kb:
+        return 1
+    else:
+        return 0
+
+
+cdef long long _find(long long *keys, long long begin, long long end,
+                     int dest) nogil:
+    """Return the index of the link to 'dest' in the sorted 'keys'
+       between 'begin' and 'end', or -1 if there is no such link
+    """
+    cdef long long target = (<long long>dest) << 32
+    cdef long long last = end
+    cdef long long mid = 0
+
+    while begin < end:
+        mid = begin + (end - begin) // 2
+
+        if keys[mid] < target:
+            begin = mid + 1
+        else:
+            end = mid
+
+    if begin < last and (keys[begin] >> 32) == dest:
+        return begin
+    else:
+        return -1
+
+
+cdef int _union_dests(int k, long long *contrib_begin, int *contrib_g,
+                      long long *begin, long long *keys,
+                      int *buffer) nogil:
+    """Fill 'buffer' with the sorted, unique destinations of the
+       links of all of the input wards that contribute to overall
+       ward 'k', returning the number of destinations
+    """
+    cdef int n = 0
+    cdef int nunique = 0
+    cdef int g = 0
+    cdef long long c = 0
+    cdef long long j = 0
+
+    for c in range(contrib_begin[k], contrib_begin[k+1]):
+        g = contrib_g[c]
+
+        for j in range(begin[g], begin[g+1]):
+            buffer[n] = <int>(keys[j] >> 32)
+            n = n + 1
+
+    if n > 1:
+        qsort(buffer, n, sizeof(int), &_compare_ints)
+
+    for j in range(0, n):
+        if nunique == 0 or buffer[j] != buffer[nunique-1]:
+            buffer[nunique] = buffer[j]
+            nunique = nunique + 1
+
+    return nunique
+
+
+def _concatenate_links(inputs, id_maps, prefix: str, value_type: str,
+                       int nthreads):
+    """Concatenate the 'prefix' (work or play) CSR links of all of the
+       inputs, mapping the destinations to the overall IDs. Returns
+       (begin, keys, values), where the links of each input ward are
+       sorted by destination and packed into keys as
+       (dest << 32 | index into values)
+    """
+    from array import array
+
+    begin = array("q", [0])
+    keys = array("q")
+    values = array(value_type)
+
+    cdef long long offset = 0
+    cdef long long i = 0
+    cdef long long n = 0
+    cdef long long start = 0
+    cdef int * id_map
+    cdef int * dests
+    cdef long long [::1] k
+    cdef long long [::1] b
+
+    for col, id_map_array in zip(inputs, id_maps):
+        a = col.arrays
+        local_begin = a[f"{prefix}_begin"]
+
+        # the first entry of each input's begin is always zero
+        for i in range(1, len(local_begin)):
+            begin.append(local_begin[i] + offset)
+
+        n = len(a[f"{prefix}_dest"])
+        start = len(keys)
+        keys.extend(array("q", [0]) * n)
+        values.extend(a[f"{prefix}_{'pop' if prefix == 'work' else 'weight'}"])
+
+        k = keys
+        id_map = _int_ptr(id_map_array)
+        dests = _int_ptr(a[f"{prefix}_dest"])
+
+        with nogil:
+            for i in range(0, n):
+                k[start + i] = ((<long long>id_map[dests[i]]) << 32) | \
+                                   (offset + i)
+
+        k = None
+        offset += n
+
+    # sentinel so that the keys are never empty
+    keys.append(0)
+
+    cdef int nwards = len(begin) - 1
+    cdef int num_threads = nthreads
+    cdef int g = 0
+    cdef long long start_g = 0
+
+    k = keys
+    b = begin
+
+    with nogil, parallel(num_threads=num_threads):
+        for g in prange(0, nwards, schedule="dynamic"):
+            start_g = b[g]
+
+            if b[g+1] - start_g > 1:
+                qsort(&(k[start_g]), b[g+1] - start_g,
+                      sizeof(long long), &_compare_keys)
+
+    return (begin, keys, values)
+
+
+def _info_keys(col):
+    """Return the list of hashable keys of the WardInfo of each ward
+       in the passed columns (None for wards that don't exist)
+    """
+    from ._wards_columns import _info_fields, _info_list_fields
+
+    strings = col.get_strings()
+    a = col.arrays
+    present = a["present"]
+
+    fields = [a[f"info_{field}"] for field in _info_fields]
+    lists = [(a[f"info_{field}_begin"], a[f"info_{field}"])
+             for field in _info_list_fields]
+
+    keys = [None] * len(present)
+
+    for i in range(0, len(present)):
+        if present[i]:
+            key = [strings[f[i]] for f in fields]
+
+            for (begin, values) in lists:
+                key.append(tuple(strings[values[j]]
+                                 for j in range(begin[i], begin[i+1])))
+
+            keys[i] = tuple(key)
+
+    return keys
+
+
+def harmonise_wards_columns(columns, nthreads: int = 1):
+    """Harmonise the passed list of WardsColumns, returning a tuple of
+       the overall sum of all of the wards, plus the list of
+       harmonised columns, which all share the ward IDs and link
+       layout of the overall columns. This follows exactly the rules
+       of Wards.harmonise (wards are matched by their WardInfo,
+       workers are summed and player weights averaged), but works
+       on the arrays directly, so is linear in the number of links
+       and parallel over wards
+    """
+    from array import array
+    from ._wards_columns import WardsColumns
+
+    inputs = [col for col in columns if col is not None]
+
+    for col in inputs:
+        if not isinstance(col, WardsColumns):
+            raise TypeError(f"Cannot harmonise non-WardsColumns objects")
+
+    # Match the wards of all inputs by their WardInfo. The overall
+    # wards are numbered in order of first appearance
+    overall_ids = {}
+    first = [-1]
+    contribs = [[]]
+    id_maps = []
+    offsets = []
+
+    cdef long long offset = 0
+
+    for col in inputs:
+        keys = _info_keys(col)
+        id_map = array("i", [0]) * len(col)
+        seen = set()
+
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+
+            if key in seen:
+                raise AssertionError(f"Duplicate ward info {key}")
+
+            seen.add(key)
+
+            ward_id = overall_ids.get(key, None)
+
+            if ward_id is None:
+                ward_id = len(first)
+                overall_ids[key] = ward_id
+                first.append(offset + i)
+                contribs.append([])
+
+            contribs[ward_id].append(offset + i)
+            id_map[i] = ward_id
+
+        id_maps.append(id_map)
+        offsets.append(offset)
+        offset += len(col)
+
+    cdef int nwards = len(first)
+
+    if nwards == 1:
+        return (WardsColumns(), [WardsColumns() for _ in inputs])
+
+    contrib_begin = array("q", [0])
+    contrib_g = array("i")
+
+    for ward_contribs in contribs:
+        contrib_g.extend(ward_contribs)
+        contrib_begin.append(len(contrib_g))
+
+    contribs = None
+
+    # concatenate the node arrays of all inputs, indexed by global
+    # ward index (offset + local index)
+    node_arrays = ["auto_assign", "num_workers", "num_players",
+                   "player_total", "pos_type", "x", "y", "scale_uv",
+                   "cutoff", "bg_foi"]
+
+    g_nodes = {}
+
+    for name in node_arrays:
+        g_nodes[name] = array(inputs[0].arrays[name].typecode)
+
+        for col in inputs:
+            g_nodes[name].extend(col.arrays[name])
+
+    (work_begin, work_keys, work_pop) = _concatenate_links(
+        inputs, id_maps, "work", "i", nthreads)
+    (play_begin, play_keys, play_weight) = _concatenate_links(
+        inputs, id_maps, "play", "d", nthreads)
+
+    cdef long long [::1] cb_view = contrib_begin
+    cdef long long * cb = &(cb_view[0])
+    cdef int * cg = _int_ptr(contrib_g)
+
+    cdef long long [::1] wb = work_begin
+    cdef long long [::1] wk = work_keys
+    cdef long long [::1] pb = play_begin
+    cdef long long [::1] pk = play_keys
+
+    cdef int * g_pop = _int_ptr(work_pop)
+    cdef double * g_weight = _double_ptr(play_weight)
+
+    # the size of buffer needed to gather the links of each ward
+    cdef long long maxdeg = 1
+    cdef long long deg = 0
+    cdef int k = 0
+    cdef long long c = 0
+    cdef int g = 0
+
+    for k in range(1, nwards):
+        deg = 0
+
+        for c in range(cb[k], cb[k+1]):
+            g = cg[c]
+            deg += max(wb[g+1] - wb[g], pb[g+1] - pb[g])
+
+        if deg > maxdeg:
+            maxdeg = deg
+
+    cdef int num_threads = nthreads
+
+    overall = WardsColumns()
+    o = overall.arrays
+
+    # first the nodes - the overall ward is the first contribution,
+    # with the populations summed
+    for name in node_arrays:
+        o[name] = array(g_nodes[name].typecode,
+                        [g_nodes[name][first[k]] if k > 0 else 0
+                         for k in range(0, nwards)])
+
+    o["present"] = array("i", [1]) * nwards
+    o["present"][0] = 0
+    o["scale_uv"][0] = 1.0
+    o["cutoff"][0] = 99999.99
+
+    cdef int * o_num_workers = _int_ptr(o["num_workers"])
+    cdef int * o_num_players = _int_ptr(o["num_players"])
+    cdef double * o_player_total = _double_ptr(o["player_total"])
+    cdef int * g_num_workers = _int_ptr(g_nodes["num_workers"])
+    cdef int * g_num_players = _int_ptr(g_nodes["num_players"])
+
+    with nogil, parallel(num_threads=num_threads):
+        for k in prange(1, nwards, schedule="static"):
+            o_num_workers[k] = 0
+            o_num_players[k] = 0
+
+            for c in range(cb[k], cb[k+1]):
+                o_num_workers[k] += g_num_workers[cg[c]]
+                o_num_players[k] += g_num_players[cg[c]]
+
+    # now the links - count the union of destinations of each ward
+    work_count = array("q", [0]) * (nwards + 1)
+    play_count = array("q", [0]) * (nwards + 1)
+
+    cdef long long [::1] wu = work_count
+    cdef long long [::1] pu = play_count
+    cdef int * buffer = NULL
+
+    with nogil, parallel(num_threads=num_threads):
+        buffer = <int*>malloc(maxdeg * sizeof(int))
+
+        for k in prange(1, nwards, schedule="dynamic"):
+            wu[k+1] = _union_dests(k, cb, cg, &(wb[0]), &(wk[0]), buffer)
+            pu[k+1] = _union_dests(k, cb, cg, &(pb[0]), &(pk[0]), buffer)
+
+        free(buffer)
+
+    for k in range(1, nwards + 1):
+        wu[k] += wu[k-1]
+        pu[k] += pu[k-1]
+
+    o["work_begin"] = work_count
+    o["work_dest"] = array("i", [0]) * wu[nwards]
+    o["work_pop"] = array("i", [0]) * wu[nwards]
+    o["play_begin"] = play_count
+    o["play_dest"] = array("i", [0]) * pu[nwards]
+    o["play_weight"] = array("d", [0.0]) * pu[nwards]
+
+    cdef int * o_work_dest = _int_ptr(o["work_dest"])
+    cdef int * o_work_pop = _int_ptr(o["work_pop"])
+    cdef int * o_play_dest = _int_ptr(o["play_dest"])
+    cdef double * o_play_weight = _double_ptr(o["play_weight"])
+
+    cdef int n = 0
+    cdef long long j = 0
+    cdef long long idx = 0
+    cdef int dest = 0
+    cdef int nworkers = 0
+    cdef double weight = 0.0
+    cdef double total = 0.0
+    cdef int nerrors = 0
+
+    with nogil, parallel(num_threads=num_threads):
+        buffer = <int*>malloc(maxdeg * sizeof(int))
+
+        for k in prange(1, nwards, schedule="dynamic"):
+            n = _union_dests(k, cb, cg, &(wb[0]), &(wk[0]), buffer)
+            nworkers = 0
+
+            for j in range(0, n):
+                dest = buffer[j]
+                o_work_dest[wu[k] + j] = dest
+                o_work_pop[wu[k] + j] = 0
+
+                for c in range(cb[k], cb[k+1]):
+                    g = cg[c]
+                    idx = _find(&(wk[0]), wb[g], wb[g+1], dest)
+
+                    if idx != -1:
+                        o_work_pop[wu[k] + j] += \
+                            g_pop[wk[idx] & 0x7FFFFFFF]
+
+                nworkers = nworkers + o_work_pop[wu[k] + j]
+
+            if nworkers != o_num_workers[k]:
+                nerrors += 1
+
+            n = _union_dests(k, cb, cg, &(pb[0]), &(pk[0]), buffer)
+            total = 0.0
+
+            for j in range(0, n):
+                dest = buffer[j]
+                o_play_dest[pu[k] + j] = dest
+
+                # the first ward's weights are copied, then the weights
+                # of each merged ward are averaged in (as Ward.merge)
+                for c in range(cb[k], cb[k+1]):
+                    g = cg[c]
+                    idx = _find(&(pk[0]), pb[g], pb[g+1], dest)
+
+                    if c == cb[k]:
+                        if idx != -1:
+                            weight = g_weight[pk[idx] & 0x7FFFFFFF]
+                        else:
+                            weight = 0.0
+                    elif idx != -1:
+                        weight = (0.5 * weight) + \
+                                 (0.5 * g_weight[pk[idx] & 0x7FFFFFFF])
+                    else:
+                        weight = 0.5 * weight
+
+                o_play_weight[pu[k] + j] = weight
+                total = total + weight
+
+            if cb[k+1] - cb[k] > 1:
+                o_player_total[k] = 1.0 - total
+
+                if o_player_total[k] < 0.0:
+                    nerrors += 1
+
+        free(buffer)
+
+    if nerrors > 0:
+        raise AssertionError(f"There are {nerrors} merged wards with "
+                             f"disagreements in the number of workers "
+                             f"or sums of player weights above 1.0")
+
+    # the infos are the same as those of the first contribution, so
+    # the string table can be rebuilt in ward order
+    _copy_infos(overall, inputs, offsets, first)
+
+    _copy_custom(overall, inputs, offsets,
+                 sources=[(first[k], first[k]) for k in range(0, nwards)])
+
+    # now the harmonised inputs, which have the same wards and
+    # links as the overall wards
+    harmonised = []
+
+    for c, col in enumerate(inputs):
+        h = _harmonise_input(overall, col, offsets[c], id_maps[c], first,
+                             g_nodes, work_keys, work_pop, work_begin,
+                             play_keys, play_weight, play_begin, nthreads)
+
+        for key in ["strings", "string_offsets"] + \
+                [x for x in overall.arrays.keys() if x.startswith("info_")]:
+            h.arrays[key] = array(overall.arrays[key].typecode,
+                                  overall.arrays[key])
+
+        harmonised.append(h)
+
+        _copy_custom(h, inputs, offsets,
+                     sources=_custom_sources(col, offsets[c], id_maps[c],
+                                             first, nwards))
+
+    _reorder(overall)
+
+    for h in harmonised:
+        _reorder(h)
+
+    return (overall, harmonised)
+
+
+def _custom_sources(col, offset, id_map, first, nwards):
+    """Return, for each overall ward, the (global) ward from which
+       the harmonised 'col' takes its custom parameters
+    """
+    sources = [(first[k], first[k]) for k in range(0, nwards)]
+
+    for i in range(0, len(col)):
+        k = id_map[i]
+
+        if k > 0:
+            sources[k] = (offset + i, offset + i)
+
+    return sources
+
+
+def _copy_infos(target, inputs, offsets, first):
+    """Rebuild the info arrays of 'target' from the infos of the
+       'first' (global) ward of each overall ward
+    """
+    from array import array
+    import bisect
+    from ._wards_columns import _StringTable, _info_fields, \
+        _info_list_fields
+
+    strings = _StringTable()
+    nwards = len(first)
+
+    fields = {field: array("i", [0]) * nwards for field in _info_fields}
+    lists = {field: (array("q", [0, 0]), array("i"))
+             for field in _info_list_fields}
+
+    tables = [col.get_strings() for col in inputs]
+
+    for k in range(1, nwards):
+        g = first[k]
+        c = bisect.bisect_right(offsets, g) - 1
+        i = g - offsets[c]
+        a = inputs[c].arrays
+        table = tables[c]
+
+        for field in _info_fields:
+            fields[field][k] = strings.add(table[a[f"info_{field}"][i]])
+
+        for field in _info_list_fields:
+            begin = a[f"info_{field}_begin"]
+            values = a[f"info_{field}"]
+            (b, v) = lists[field]
+
+            for j in range(begin[i], begin[i+1]):
+                v.append(strings.add(table[values[j]]))
+
+            b.append(len(v))
+
+    (blob, string_offsets) = strings.to_arrays()
+
+    target.arrays["strings"] = blob
+    target.arrays["string_offsets"] = string_offsets
+
+    for field in _info_fields:
+        target.arrays[f"info_{field}"] = fields[field]
+
+    for field in _info_list_fields:
+        (b, v) = lists[field]
+        target.arrays[f"info_{field}_begin"] = b
+        target.arrays[f"info_{field}"] = v
+
+
+def _copy_custom(target, inputs, offsets, sources):
+    """Set the custom parameters of 'target', taking those of overall
+       ward k from the (global) ward sources[k][0]. The keys are
+       ordered as they would be encountered in ward order
+    """
+    from array import array
+    import bisect
+
+    nwards = len(sources)
+
+    # (mask, values) of each key over the global ward index
+    g_custom = {}
+    total = sum(len(col) for col in inputs)
+
+    for c, col in enumerate(inputs):
+        for idx, key in enumerate(col.custom_keys):
+            if key not in g_custom:
+                g_custom[key] = (array("i", [0]) * total,
+                                 array("d", [0.0]) * total)
+
+            (mask, values) = g_custom[key]
+            start = offsets[c]
+            end = start + len(col)
+            mask[start:end] = col.arrays[f"custom_mask_{idx}"]
+            values[start:end] = col.arrays[f"custom_{idx}"]
+
+    # the order of the keys in each input (used to order keys that are
+    # first set in the same ward)
+    rank = {}
+
+    for col in inputs:
+        for key in col.custom_keys:
+            if key not in rank:
+                rank[key] = len(rank)
+
+    custom = []
+
+    for key, (g_mask, g_values) in g_custom.items():
+        mask = array("i", [0]) * nwards
+        values = array("d", [0.0]) * nwards
+        first_k = None
+
+        for k in range(1, nwards):
+            g = sources[k][0]
+
+            if g_mask[g]:
+                mask[k] = 1
+                values[k] = g_values[g]
+
+                if first_k is None:
+                    first_k = k
+
+        if first_k is not None:
+            # find the position of this key in its input's key list
+            g = sources[first_k][0]
+            c = bisect.bisect_right(offsets, g) - 1
+            custom.append(((first_k, inputs[c].custom_keys.index(key)),
+                           key, mask, values))
+
+    custom.sort(key=lambda x: x[0])
+
+    for key in list(target.arrays.keys()):
+        if key.startswith("custom_"):
+            del target.arrays[key]
+
+    target.custom_keys = []
+
+    for idx, (_order, key, mask, values) in enumerate(custom):
+        target.custom_keys.append(key)
+        target.arrays[f"custom_mask_{idx}"] = mask
+        target.arrays[f"custom_{idx}"] = values
+
+
+def _harmonise_input(overall, col, offset, id_map, first, g_nodes,
+                     work_keys, work_pop, work_begin,
+                     play_keys, play_weight, play_begin, int nthreads):
+    """Return the harmonised copy of the input 'col', which has the same
+       wards and links as 'overall'. Wards that are missing from 'col'
+       are zero-populated copies of the overall ward, and links that
+       are missing are added with zero workers or weight
+    """
+    from array import array
+    from ._wards_columns import WardsColumns
+
+    cdef int nwards = len(overall)
+
+    # the global index of the ward of this input for each overall ward,
+    # or -1 if this input doesn't have that ward
+    own = array("i", [-1]) * nwards
+    cdef int * own_g = _int_ptr(own)
+
+    cdef int i = 0
+
+    for i in range(0, len(col)):
+        if id_map[i] > 0:
+            own_g[id_map[i]] = offset + i
+
+    o = overall.arrays
+
+    result = WardsColumns()
+    h = result.arrays
+
+    for name in ["present", "auto_assign", "pos_type", "x", "y",
+                 "scale_uv", "cutoff", "bg_foi"]:
+        h[name] = array(o[name].typecode, o[name])
+
+    h["num_workers"] = array("i", [0]) * nwards
+    h["num_players"] = array("i", [0]) * nwards
+    h["player_total"] = array("d", [1.0]) * nwards
+    h["player_total"][0] = 0.0
+
+    h["work_begin"] = array("q", o["work_begin"])
+    h["work_dest"] = array("i", o["work_dest"])
+    h["work_pop"] = array("i", [0]) * len(o["work_dest"])
+    h["play_begin"] = array("q", o["play_begin"])
+    h["play_dest"] = array("i", o["play_dest"])
+    h["play_weight"] = array("d", [0.0]) * len(o["play_dest"])
+
+    cdef int * auto_assign = _int_ptr(h["auto_assign"])
+    cdef int * pos_type = _int_ptr(h["pos_type"])
+    cdef double * x = _double_ptr(h["x"])
+    cdef double * y = _double_ptr(h["y"])
+    cdef double * scale_uv = _double_ptr(h["scale_uv"])
+    cdef double * cutoff = _double_ptr(h["cutoff"])
+    cdef double * bg_foi = _double_ptr(h["bg_foi"])
+    cdef int * num_workers = _int_ptr(h["num_workers"])
+    cdef int * num_players = _int_ptr(h["num_players"])
+    cdef double * player_total = _double_ptr(h["player_total"])
+
+    cdef int * g_auto_assign = _int_ptr(g_nodes["auto_assign"])
+    cdef int * g_pos_type = _int_ptr(g_nodes["pos_type"])
+    cdef double * g_x = _double_ptr(g_nodes["x"])
+    cdef double * g_y = _double_ptr(g_nodes["y"])
+    cdef double * g_scale_uv = _double_ptr(g_nodes["scale_uv"])
+    cdef double * g_cutoff = _double_ptr(g_nodes["cutoff"])
+    cdef double * g_bg_foi = _double_ptr(g_nodes["bg_foi"])
+    cdef int * g_num_workers = _int_ptr(g_nodes["num_workers"])
+    cdef int * g_num_players = _int_ptr(g_nodes["num_players"])
+    cdef double * g_player_total = _double_ptr(
+                                                g_nodes["player_total"])
+
+    cdef long long [::1] wb = work_begin
+    cdef long long [::1] wk = work_keys
+    cdef long long [::1] pb = play_begin
+    cdef long long [::1] pk = play_keys
+    cdef int * g_pop = _int_ptr(work_pop)
+    cdef double * g_weight = _double_ptr(play_weight)
+
+    cdef long long [::1] hwb = h["work_begin"]
+    cdef long long [::1] hpb = h["play_begin"]
+    cdef int * h_work_dest = _int_ptr(h["work_dest"])
+    cdef int * h_work_pop = _int_ptr(h["work_pop"])
+    cdef int * h_play_dest = _int_ptr(h["play_dest"])
+    cdef double * h_play_weight = _double_ptr(h["play_weight"])
+
+    cdef int k = 0
+    cdef int g = 0
+    cdef long long j = 0
+    cdef long long idx = 0
+    cdef int nerrors = 0
+    cdef int num_threads = nthreads
+
+    with nogil, parallel(num_threads=num_threads):
+        for k in prange(1, nwards, schedule="dynamic"):
+            g = own_g[k]
+
+            if g == -1:
+                # zero-populated copy of the overall ward
+                continue
+
+            if g_pos_type[g] != pos_type[k] or g_x[g] != x[k] or \
+                    g_y[g] != y[k]:
+                nerrors += 1
+
+            auto_assign[k] = g_auto_assign[g]
+            scale_uv[k] = g_scale_uv[g]
+            cutoff[k] = g_cutoff[g]
+            bg_foi[k] = g_bg_foi[g]
+            num_workers[k] = g_num_workers[g]
+            num_players[k] = g_num_players[g]
+            player_total[k] = g_player_total[g]
+
+            for j in range(hwb[k], hwb[k+1]):
+                idx = _find(&(wk[0]), wb[g], wb[g+1], h_work_dest[j])
+
+                if idx != -1:
+                    h_work_pop[j] = g_pop[wk[idx] & 0x7FFFFFFF]
+
+            for j in range(hpb[k], hpb[k+1]):
+                idx = _find(&(pk[0]), pb[g], pb[g+1], h_play_dest[j])
+
+                if idx != -1:
+                    h_play_weight[j] = g_weight[pk[idx] & 0x7FFFFFFF]
+
+    if nerrors > 0:
+        from ._console import Console
+        Console.error(f"There are {nerrors} wards that exist in several "
+                      f"networks, but have different positions.")
+        raise ValueError("Cannot harmonise incompatible Wards")
+
+    return result
+
+
+def _reorder(columns):
+    """Put the arrays of 'columns' into the same order as
+       WardsColumns.from_wards
+    """
+    from ._wards_columns import _info_fields, _info_list_fields
+
+    order = ["present", "auto_assign", "num_workers", "num_players",
+             "player_total", "pos_type", "x", "y", "scale_uv", "cutoff",
+             "bg_foi", "work_begin", "work_dest", "work_pop",
+             "play_begin", "play_dest", "play_weight",
+             "strings", "string_offsets"]
+
+    order += [f"info_{field}" for field in _info_fields]
+
+    for field in _info_list_fields:
+        order += [f"info_{field}_begin", f"info_{field}"]
+
+    for idx in range(0, len(columns.custom_keys)):
+        order += [f"custom_mask_{idx}", f"custom_{idx}"]
+
+    columns.arrays = {key: columns.arrays[key] for key in order}
+
+
+cdef inline int _scale_and_round(int value, double scale) nogil:
+    """Scale and round as Ward.scale"""
+    if scale > 0.5:
+        # round up for large scales, as smaller scales will always
+        # round down
+        return <int>floor((value * scale) + 0.5)
+    else:
+        return <int>floor(value * scale)
+
+
+def scale_wards_columns(columns, work_ratio: float = 1.0,
+                        play_ratio: float = 1.0, nthreads: int = 1):
+    """Return a copy of the passed WardsColumns where the number of
+       workers and players have been scaled by 'work_ratio' and
+       'play_ratio' respectively (as Wards.scale)
+    """
+    from array import array
+    from copy import deepcopy
+
+    result = deepcopy(columns)
+    a = result.arrays
+
+    cdef double work = float(work_ratio)
+    cdef double play = float(play_ratio)
+    cdef int nwards = len(result)
+    cdef int num_threads = nthreads
+
+    if nwards == 0:
+        return result
+
+    cdef int * present = _int_ptr(a["present"])
+    cdef int * num_players = _int_ptr(a["num_players"])
+    cdef int * num_workers = _int_ptr(a["num_workers"])
+    cdef long long [::1] begin = a["work_begin"]
+    cdef int * pop = _int_ptr(a["work_pop"])
+
+    cdef int i = 0
+    cdef long long j = 0
+
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(0, nwards, schedule="static"):
+            if not present[i]:
+                continue
+
+            if play != 1.0:
+                num_players[i] = _scale_and_round(num_players[i], play)
+
+            if work != 1.0:
+                num_workers[i] = 0
+
+                for j in range(begin[i], begin[i+1]):
+                    pop[j] = _scale_and_round(pop[j], work)
+                    num_workers[i] = num_workers[i] + pop[j]
+
+    return result
@@ -0,0 +1,365 @@
+
+from typing import Dict as _Dict
+from typing import Tuple as _Tuple
+
+from .._network import Network
+from .._inputfiles import InputFiles
+
+__all__ = ["get_network_cache_dir", "get_network_cache_key",
+           "get_network_cache_filename",
+           "load_network_cache", "save_network_cache"]
+
+#: Magic bytes at the start of every compiled network cache file
+_MAGIC = b"MWNETCAC"
+
+#: Version of the compiled network cache format. Increment this
+#: whenever the layout of the file changes, as old caches will
+#: then be ignored (and rebuilt)
+_CACHE_VERSION = 1
+
+#: All arrays in the cache are aligned to this number of bytes,
+#: so that they can be mapped directly from the memory-mapped file
+_ALIGNMENT = 64
+
+#: The members of InputFiles whose contents define the topology
+#: of the network (and so are part of the cache key)
+_keyed_files = ["work", "play", "play_size", "position", "lookup"]
+
+#: The arrays of Nodes and Links that are stored in the cache
+_node_arrays = ["label", "begin_to", "end_to", "self_w",
+                "begin_p", "end_p", "self_p",
+                "day_foi", "night_foi", "play_suscept", "save_play_suscept",
+                "denominator_n", "denominator_d",
+                "denominator_p", "denominator_pd",
+                "day_inf_prob", "night_inf_prob",
+                "x", "y", "scale_uv", "cutoff", "bg_foi"]
+
+_link_arrays = ["ifrom", "ito", "weight", "suscept", "distance"]
+
+
+def get_network_cache_dir(cache_dir: str = None) -> str:
+    """Return the directory in which compiled networks are cached.
+       This is either the passed 'cache_dir', or the value of the
+       environment variable METAWARDS_NETWORK_CACHE. This returns
+       None if neither is set, meaning that caching is disabled
+    """
+    import os
+
+    if cache_dir is None:
+        cache_dir = os.getenv("METAWARDS_NETWORK_CACHE", None)
+
+    if cache_dir is None or len(str(cache_dir).strip()) == 0:
+        return None
+
+    return os.path.abspath(os.path.expanduser(os.path.expandvars(cache_dir)))
+
+
+def _hash_file(hasher, filename: str) -> None:
+    """Add the contents of 'filename' to the passed hasher"""
+    with open(filename, "rb") as FILE:
+        while True:
+            chunk = FILE.read(1048576)
+
+            if not chunk:
+                break
+
+            hasher.update(chunk)
+
+
+def get_network_cache_key(input_files: InputFiles) -> str:
+    """Return the key used to identify the compiled network that is
+       built from the passed input files. This is a hash of the
+       contents of all of the files that define the network
+       topology, so that the cache is invalidated automatically
+       if any of those files change
+    """
+    import hashlib
+    import json
+
+    hasher = hashlib.sha256()
+    hasher.update(_MAGIC)
+    hasher.update(str(_CACHE_VERSION).encode("utf-8"))
+
+    for member in _keyed_files:
+        filename = getattr(input_files, member)
+        hasher.update(member.encode("utf-8"))
+
+        if filename is None:
+            hasher.update(b"None")
+        else:
+            _hash_file(hasher, filename)
+
+    hasher.update(str(input_files.coordinates).encode("utf-8"))
+    hasher.update(json.dumps(input_files.lookup_columns,
+                             sort_keys=True).encode("utf-8"))
+
+    return hasher.hexdigest()
+
+
+def get_network_cache_filename(input_files: InputFiles,
+                               cache_dir: str = None) -> str:
+    """Return the full path to the compiled network cache file for
+       the passed input files, or None if caching is disabled
+    """
+    cache_dir = get_network_cache_dir(cache_dir)
+
+    if cache_dir is None:
+        return None
+
+    import os
+    key = get_network_cache_key(input_files)
+    return os.path.join(cache_dir, f"network_{key}.mwcache")
+
+
+def _get_arrays(network: Network) -> _Dict[str, any]:
+    """Return the dictionary of all arrays to be saved for 'network'"""
+    arrays = {}
+
+    for name in _node_arrays:
+        arrays[f"nodes.{name}"] = getattr(network.nodes, name)
+
+    for key, value in network.nodes._custom_params.items():
+        arrays[f"custom.{key}"] = value
+
+    for name in _link_arrays:
+        arrays[f"links.{name}"] = getattr(network.links, name)
+        arrays[f"play.{name}"] = getattr(network.play, name)
+
+    return arrays
+
+
+def _pad(offset: int) -> int:
+    """Return the number of bytes needed to align 'offset'"""
+    return (_ALIGNMENT - (offset % _ALIGNMENT)) % _ALIGNMENT
+
+
+def save_network_cache(network: Network, input_files: InputFiles = None,
+                       cache_dir: str = None) -> str:
+    """Save the topology of the passed (freshly built) network to the
+       compiled network cache. The file is written atomically, so
+       that multiple processes can safely try to write the same cache.
+
+       Parameters
+       ----------
+       network: Network
+         The network to cache. This should have been built, had its
+         distances calculated and lookup added, but not yet been run
+       input_files: InputFiles
+         The input files used to build the network. This defaults
+         to network.params.input_files
+       cache_dir: str
+         The directory in which to write the cache
+
+       Returns
+       -------
+       filename: str
+         The name of the cache file, or None if caching is disabled
+    """
+    if input_files is None:
+        input_files = network.params.input_files
+
+    filename = get_network_cache_filename(input_files, cache_dir=cache_dir)
+
+    if filename is None:
+        return None
+
+    import json
+    import os
+    import struct
+    import sys
+    import tempfile
+
+    if network.info is None or len(network.info) == 0:
+        info = []
+    else:
+        info = [None if x is None else x.to_data()
+                for x in network.info.wards]
+
+    arrays = _get_arrays(network)
+
+    toc = []
+    offset = 0
+
+    for name, array in arrays.items():
+        nbytes = len(array) * array.itemsize
+        toc.append({"name": name, "typecode": array.typecode,
+                    "itemsize": array.itemsize, "length": len(array),
+                    "offset": offset})
+        offset += nbytes + _pad(nbytes)
+
+    header = {"version": _CACHE_VERSION,
+              "byteorder": sys.byteorder,
+              "nnodes": network.nnodes,
+              "nlinks": network.nlinks,
+              "nplay": network.nplay,
+              "max_nodes": network.max_nodes,
+              "max_links": network.max_links,
+              "coordinates": network.nodes.coordinates,
+              "info": info,
+              "arrays": toc}
+
+    header = json.dumps(header).encode("utf-8")
+
+    # magic, version, header length, then the header
+    preamble = _MAGIC + struct.pack("<IQ", _CACHE_VERSION, len(header))
+    start = len(preamble) + len(header)
+    start += _pad(start)
+
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    (fd, tmpname) = tempfile.mkstemp(dir=os.path.dirname(filename),
+                                     suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as FILE:
+            FILE.write(preamble)
+            FILE.write(header)
+            FILE.write(b"\0" * (start - len(preamble) - len(header)))
+
+            for array in arrays.values():
+                nbytes = len(array) * array.itemsize
+                FILE.write(array.tobytes())
+                FILE.write(b"\0" * _pad(nbytes))
+
+        os.replace(tmpname, filename)
+    except Exception:
+        if os.path.exists(tmpname):
+            os.unlink(tmpname)
+        raise
+
+    from ._console import Console
+    Console.print(f"Saved compiled network to {filename}")
+
+    return filename
+
+
+def _read_header(mm) -> _Tuple[dict, int]:
+    """Read and validate the header of the memory-mapped cache 'mm'.
+       Returns the header and the offset of the start of the arrays
+    """
+    import json
+    import struct
+    import sys
+
+    nmagic = len(_MAGIC)
+
+    if mm[0:nmagic] != _MAGIC:
+        raise IOError("Not a compiled network cache file")
+
+    (version, nheader) = struct.unpack("<IQ", mm[nmagic:nmagic+12])
+
+    if version != _CACHE_VERSION:
+        raise IOError(f"Incompatible cache version {version} "
+                      f"(need {_CACHE_VERSION})")
+
+    start = nmagic + 12
+    header = json.loads(mm[start:start+nheader].decode("utf-8"))
+    start += nheader
+    start += _pad(start)
+
+    if header["byteorder"] != sys.byteorder:
+        raise IOError(f"Incompatible byte order {header['byteorder']}")
+
+    return (header, start)
+
+
+def load_network_cache(input_files: InputFiles, cache_dir: str = None,
+                       profiler=None) -> Network:
+    """Load and return the compiled network for the passed input
+       files from the cache. This returns None if caching is disabled,
+       or if there is no valid cache for these input files. Note that
+       the returned network has not been reset, and does not yet
+       have its parameters set.
+
+       The cache file is memory-mapped and each array copied
+       directly from the mapped pages, so loading takes
+       milliseconds, rather than the seconds to minutes needed to
+       parse the original input files.
+    """
+    filename = get_network_cache_filename(input_files, cache_dir=cache_dir)
+
+    if filename is None:
+        return None
+
+    import os
+
+    if not os.path.exists(filename):
+        return None
+
+    if profiler is None:
+        from ._profiler import NullProfiler
+        profiler = NullProfiler()
+
+    import mmap
+    from array import array
+
+    from .._nodes import Nodes
+    from .._links import Links
+    from .._wardinfo import WardInfo, WardInfos
+    from ._console import Console
+
+    p = profiler.start("load_network_cache")
+
+    try:
+        with open(filename, "rb") as FILE:
+            with mmap.mmap(FILE.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (header, start) = _read_header(mm)
+
+                arrays = {}
+
+                for entry in header["arrays"]:
+                    a = array(entry["typecode"])
+
+                    if a.itemsize != entry["itemsize"]:
+                        raise IOError(f"Incompatible itemsize for "
+                                      f"{entry['name']}")
+
+                    offset = start + entry["offset"]
+                    nbytes = entry["length"] * entry["itemsize"]
+                    a.frombytes(mm[offset:offset+nbytes])
+                    arrays[entry["name"]] = a
+    except Exception as e:
+        Console.warning(f"Ignoring invalid network cache {filename}: "
+                        f"{e.__class__} {e}")
+        p.stop()
+        return None
+
+    nodes = Nodes(1)
+    links = Links(1)
+    play = Links(1)
+
+    for name, a in arrays.items():
+        (group, key) = name.split(".", 1)
+
+        if group == "nodes":
+            setattr(nodes, key, a)
+        elif group == "custom":
+            nodes._custom_params[key] = a
+        elif group == "links":
+            setattr(links, key, a)
+        elif group == "play":
+            setattr(play, key, a)
+
+    nodes.coordinates = header["coordinates"]
+
+    network = Network(nnodes=header["nnodes"], nlinks=header["nlinks"],
+                      nplay=header["nplay"],
+                      max_nodes=header["max_nodes"],
+                      max_links=header["max_links"])
+
+    network.nodes = nodes
+    network.links = links
+    network.play = play
+
+    if len(header["info"]) > 0:
+        network.info = WardInfos(
+            wards=[None if x is None else WardInfo.from_data(x)
+                   for x in header["info"]])
+    else:
+        network.info = WardInfos()
+
+    p.stop()
+
+    Console.print(f"Loaded compiled network from {filename}")
+
+    return network
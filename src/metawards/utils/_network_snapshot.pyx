@@ -0,0 +1,218 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+
+from libc.string cimport memcpy, memcmp
+
+__all__ = ["NetworkSnapshot"]
+
+#: The mutable arrays of Nodes and Links that are changed by a model
+#: run. These are the arrays that are deep-copied by Nodes.copy()
+#: and Links.copy(), and so are captured by the snapshot
+_mutable_node_arrays = ["day_foi", "night_foi",
+                        "play_suscept", "save_play_suscept",
+                        "denominator_n", "denominator_d",
+                        "denominator_p", "denominator_pd",
+                        "day_inf_prob", "night_inf_prob",
+                        "scale_uv", "cutoff", "bg_foi"]
+
+_mutable_link_arrays = ["weight", "suscept"]
+
+#: Granularity (in bytes) of the dirty check. Only blocks of this
+#: size that differ from the snapshot are copied back
+cdef Py_ssize_t _page_size = 4096
+
+
+cdef Py_ssize_t _restore_block(char *dst, const char *src, Py_ssize_t n,
+                               bint check_dirty) nogil:
+    """Restore 'n' bytes from 'src' into 'dst'. If 'check_dirty' then
+       only pages that have changed are written. This returns the
+       number of bytes that were written
+    """
+    cdef Py_ssize_t start = 0
+    cdef Py_ssize_t size = 0
+    cdef Py_ssize_t nwritten = 0
+
+    if not check_dirty:
+        memcpy(dst, src, n)
+        return n
+
+    while start < n:
+        size = n - start
+
+        if size > _page_size:
+            size = _page_size
+
+        if memcmp(dst + start, src + start, size) != 0:
+            memcpy(dst + start, src + start, size)
+            nwritten += size
+
+        start += size
+
+    return nwritten
+
+
+def _get_arrays(network):
+    """Return the dictionary of the mutable arrays of 'network'"""
+    arrays = {}
+
+    nodes = network.nodes
+
+    for name in _mutable_node_arrays:
+        arrays[("nodes", name)] = getattr(nodes, name)
+
+    for key, value in nodes._custom_params.items():
+        arrays[("custom", key)] = value
+
+    for name in _mutable_link_arrays:
+        arrays[("links", name)] = getattr(network.links, name)
+        arrays[("play", name)] = getattr(network.play, name)
+
+    return arrays
+
+
+def _get_bytes(a):
+    """Return a byte-view of the passed array"""
+    return memoryview(a).cast("B")
+
+
+class NetworkSnapshot:
+    """This is a snapshot of the mutable state of a Network (the
+       FOI, susceptibles, denominators, weights etc.). It is captured
+       once into a single contiguous block of memory, and can then be
+       used to reset the Network between model runs by copying that
+       block back into the network's existing arrays. This is much
+       cheaper than holding a pristine copy of the network and
+       calling Network.copy() (which deep-copies and so reallocates
+       every mutable array) before each run.
+
+       Create using Network.snapshot() and use via Network.restore()
+    """
+
+    def __init__(self, network):
+        from copy import deepcopy
+
+        arrays = _get_arrays(network)
+
+        self._toc = []
+        offset = 0
+
+        for key, a in arrays.items():
+            if a is None:
+                self._toc.append((key, None, 0, 0))
+                continue
+
+            nbytes = len(a) * a.itemsize
+            self._toc.append((key, a.typecode, offset, nbytes))
+            offset += nbytes
+
+        self._block = bytearray(offset)
+
+        view = memoryview(self._block)
+
+        for (key, typecode, offset, nbytes), a in zip(self._toc,
+                                                      arrays.values()):
+            if typecode is not None:
+                view[offset:offset+nbytes] = _get_bytes(a)
+
+        view.release()
+
+        self._work_population = network.work_population
+        self._play_population = network.play_population
+        self._to_seed = deepcopy(network.to_seed)
+        self._params = deepcopy(network.params)
+
+    def nbytes(self) -> int:
+        """Return the size of the snapshot in bytes"""
+        return len(self._block)
+
+    def restore(self, network, check_dirty: bool = False) -> int:
+        """Restore the passed network to the state captured in
+           this snapshot. The data is copied back into the network's
+           existing arrays, so no memory is allocated (unless an
+           array has been resized or replaced by a different type).
+
+           Parameters
+           ----------
+           network: Network
+             The network to restore. This must be the network from
+             which the snapshot was taken (or a copy of it)
+           check_dirty: bool
+             Whether or not to only write the pages of each array that
+             have changed since the snapshot. Arrays that were never
+             touched by the last run are then only read, not written,
+             which avoids dirtying (and copy-on-write duplicating)
+             pages that are shared between processes
+
+           Returns
+           -------
+           nbytes: int
+             The number of bytes that were written to the network
+        """
+        from array import array
+        from copy import deepcopy
+
+        cdef unsigned char [::1] src = self._block
+        cdef unsigned char [::1] dst
+        cdef Py_ssize_t offset = 0
+        cdef Py_ssize_t nbytes = 0
+        cdef Py_ssize_t nwritten = 0
+        cdef bint dirty = check_dirty
+
+        nodes = network.nodes
+        groups = {"nodes": nodes, "links": network.links,
+                  "play": network.play}
+
+        custom_keys = []
+
+        for (key, typecode, offset, nbytes) in self._toc:
+            (group, name) = key
+
+            if group == "custom":
+                custom_keys.append(name)
+                a = nodes._custom_params.get(name, None)
+            else:
+                a = getattr(groups[group], name)
+
+            if typecode is None:
+                if a is not None:
+                    setattr(groups[group], name, None)
+                continue
+
+            if a is None or a.typecode != typecode or \
+                    len(a) * a.itemsize != nbytes:
+                # the array was replaced or resized, so recreate it
+                a = array(typecode)
+                a.frombytes(self._block[offset:offset+nbytes])
+
+                if group == "custom":
+                    nodes._custom_params[name] = a
+                else:
+                    setattr(groups[group], name, a)
+
+                nwritten += nbytes
+                continue
+
+            if nbytes == 0:
+                continue
+
+            dst = _get_bytes(a)
+
+            with nogil:
+                nwritten += _restore_block(<char*>&(dst[0]),
+                                           <const char*>&(src[offset]),
+                                           nbytes, dirty)
+
+        # remove any custom parameters added since the snapshot
+        for key in list(nodes._custom_params.keys()):
+            if key not in custom_keys:
+                del nodes._custom_params[key]
+
+        network.work_population = self._work_population
+        network.play_population = self._play_population
+        network.to_seed = deepcopy(self._to_seed)
+        network.params = deepcopy(self._params)
+
+        return nwritten
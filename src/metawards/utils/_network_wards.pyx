@@ -1,4 +1,9 @@
 
+cimport cython
+from cython.parallel import parallel, prange
+
+from libc.stdlib cimport qsort
+
 from .._network import Network
 from .._parameters import Parameters
 from .._disease import Disease
@@ -11,18 +16,14 @@ from ._console import Console
 from ._profiler import Profiler
 from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
 
-__all__ = ["load_from_wards", "save_to_wards"]
+__all__ = ["load_from_wards", "load_from_wards_columns", "save_to_wards",
+           "save_to_wards_columns"]
 
 
-def load_from_wards(wards: Wards, params: Parameters = None,
-                    disease: Disease = None,
-                    profiler: Profiler = None,
-                    nthreads: int = 1) -> Network:
-    """Build and return a Network from the passed set of Wards"""
-    if profiler is None:
-        from ._profiler import NullProfiler
-        profiler = NullProfiler()
-
+def _get_params(params: Parameters, disease: Disease) -> Parameters:
+    """Return a copy of the parameters to use for a Network built
+       from wards, with the disease set if needed
+    """
     if params is None:
         params = Parameters.load()
 
@@ -43,6 +44,93 @@ def load_from_wards(wards: Wards, params: Parameters = None,
     from .._inputfiles import InputFiles
     params.input_files = InputFiles()
 
+    return params
+
+
+def _finalise_network(network: Network, num_workers: int, num_players: int,
+                      profiler: Profiler, nthreads: int) -> Network:
+    """Complete the construction of a Network from wards, by moving
+       the players to work, calculating the distances and
+       resetting the network ready for a run. 'num_workers' and
+       'num_players' are the populations of the wards, which
+       are checked against the network
+    """
+    p = profiler
+
+    if network.nnodes >= network.max_nodes:
+        network.max_nodes = network.nnodes + 1
+
+    if network.nlinks >= network.max_links:
+        network.max_links = network.nlinks + 1
+
+    if network.nplay >= network.max_links:
+        network.max_links = network.nplay + 1
+
+    p = p.start("move_from_play_to_work")
+    network.move_from_play_to_work(nthreads=nthreads, profiler=p)
+    p = p.stop()
+
+    from ._add_wards_network_distance import calc_network_distance
+    calc_network_distance(network=network, nthreads=nthreads)
+
+    (_mindist, maxdist) = network.get_min_max_distances(profiler=p,
+                                                        nthreads=nthreads)
+
+    network.params.dyn_dist_cutoff = maxdist + 1
+
+    # By default, we initialise the network ready for a run,
+    # namely make sure everything is reset and the population
+    # is at work
+    p = p.start("reset_everything")
+    network.reset_everything(nthreads=nthreads, profiler=p)
+    p = p.stop()
+
+    p = p.start("rescale_play_matrix")
+    network.rescale_play_matrix(nthreads=nthreads, profiler=p)
+    p = p.stop()
+
+    Console.print(f"[bold]Network loaded. Population: {network.population}, "
+                  f"Workers: {network.work_population}, Players: "
+                  f"{network.play_population}[/]", markup=True)
+
+    if network.work_population != num_workers or \
+       network.play_population != num_players:
+        Console.error(
+            f"Program bug: Disagreement between the number of "
+            f"workers ({network.work_population} vs {num_workers}) "
+            f"or players ({network.play_population} vs {num_players}) "
+            f"which means that there is a data corruption somewhere...")
+
+        raise AssertionError("Disagreement in population sizes")
+
+    return network
+
+
+def load_from_wards(wards: Wards, params: Parameters = None,
+                    disease: Disease = None,
+                    profiler: Profiler = None,
+                    nthreads: int = 1) -> Network:
+    """Build and return a Network from the passed set of Wards.
+       This can also be a WardsColumns, or the name of a binary
+       wards file (from Wards.to_binary), in which case the network
+       is built directly from the columns
+    """
+    from ._wards_columns import WardsColumns, is_wards_binary
+
+    if isinstance(wards, str) and is_wards_binary(wards):
+        wards = WardsColumns.load(wards)
+
+    if isinstance(wards, WardsColumns):
+        return load_from_wards_columns(wards, params=params,
+                                       disease=disease, profiler=profiler,
+                                       nthreads=nthreads)
+
+    if profiler is None:
+        from ._profiler import NullProfiler
+        profiler = NullProfiler()
+
+    params = _get_params(params, disease)
+
     cdef int i = 0
     cdef int node_id = 0
     cdef int nnodes_plus_one = len(wards)
@@ -252,245 +340,790 @@ def load_from_wards(wards: Wards, params: Parameters = None,
     network.params = params
     network.nodes = nodes
     network.nnodes = nnodes_plus_one - 1
-
-    if network.nnodes >= network.max_nodes:
-        network.max_nodes = network.nnodes + 1
-
     network.links = links
     network.nlinks = nlinks
-
-    if network.nlinks >= network.max_links:
-        network.max_links = network.nlinks + 1
-
     network.play = play
     network.nplay = nplay
 
-    if network.nplay >= network.max_links:
-        network.max_links = network.nplay + 1
-
     from .._wardinfo import WardInfos
     network.info = WardInfos(info)
 
-    p = p.start("move_from_play_to_work")
-    network.move_from_play_to_work(nthreads=nthreads, profiler=p)
+    _finalise_network(network, num_workers=wards.num_workers(),
+                      num_players=wards.num_players(), profiler=p,
+                      nthreads=nthreads)
+
     p = p.stop()
 
-    from ._add_wards_network_distance import calc_network_distance
-    calc_network_distance(network=network, nthreads=nthreads)
+    return network
 
-    (_mindist, maxdist) = network.get_min_max_distances(profiler=p,
-                                                        nthreads=nthreads)
 
-    network.params.dyn_dist_cutoff = maxdist + 1
+def load_from_wards_columns(columns, params: Parameters = None,
+                            disease: Disease = None,
+                            profiler: Profiler = None,
+                            nthreads: int = 1) -> Network:
+    """Build and return a Network directly from the passed
+       WardsColumns. This produces the same Network as
+       load_from_wards(columns.to_wards()), but copies the
+       CSR link arrays straight into the Network, without
+       creating any Ward objects
+    """
+    if profiler is None:
+        from ._profiler import NullProfiler
+        profiler = NullProfiler()
 
-    # By default, we initialise the network ready for a run,
-    # namely make sure everything is reset and the population
-    # is at work
-    p = p.start("reset_everything")
-    network.reset_everything(nthreads=nthreads, profiler=p)
-    p = p.stop()
+    params = _get_params(params, disease)
 
-    p = p.start("rescale_play_matrix")
-    network.rescale_play_matrix(nthreads=nthreads, profiler=p)
-    p = p.stop()
+    cdef int nnodes_plus_one = len(columns)
 
-    Console.print(f"[bold]Network loaded. Population: {network.population}, "
-                  f"Workers: {network.work_population}, Players: "
-                  f"{network.play_population}[/]", markup=True)
+    if nnodes_plus_one == 0:
+        return Network()
 
-    if network.work_population != wards.num_workers() or \
-       network.play_population != wards.num_players():
-        Console.error(
-            f"Program bug: Disagreement between the number of "
-            f"workers ({network.work_population} vs {wards.num_workers()}) "
-            f"or players ({network.play_population} vs {wards.num_players()}) "
-            f"which means that there is a data corruption somewhere...")
+    p = profiler.start("load_from_wards_columns")
 
-        raise AssertionError("Disagreement in population sizes")
+    a = columns.arrays
 
-    p = p.stop()
+    cdef int * present = get_int_array_ptr(a["present"])
+    cdef int * auto_assign = get_int_array_ptr(a["auto_assign"])
+    cdef int * num_players = get_int_array_ptr(a["num_players"])
+    cdef double * player_total = get_double_array_ptr(a["player_total"])
+    cdef int * pos_type = get_int_array_ptr(a["pos_type"])
 
-    return network
+    cdef long long [::1] work_begin = a["work_begin"]
+    cdef int * work_dest = get_int_array_ptr(a["work_dest"])
+    cdef int * work_pop = get_int_array_ptr(a["work_pop"])
 
+    cdef long long [::1] play_begin = a["play_begin"]
+    cdef int * play_dest = get_int_array_ptr(a["play_dest"])
+    cdef double * play_weight = get_double_array_ptr(a["play_weight"])
 
-def save_to_wards(network: Network, profiler: Profiler = None,
-                  nthreads: int = 1) -> Wards:
-    """Build a return a set of Wards constructed from the passed Network"""
-    if profiler is None:
-        from ._profiler import NullProfiler
-        profiler = NullProfiler()
+    cdef int i = 0
+    cdef long long j = 0
+    cdef int nlinks = len(a["work_dest"])
+    cdef int nplay = 0
+    cdef int xy = 0
+    cdef int latlong = 0
+    cdef int has_self = 0
 
-    p = profiler.start("save_to_wards")
+    p = p.start("convert nodes")
 
-    nodes = network.nodes
-    links = network.links
-    play = network.play
-    info = network.info
+    for i in range(1, nnodes_plus_one):
+        if not present[i]:
+            continue
+
+        if pos_type[i] == 1:
+            xy = 1
+        elif pos_type[i] == 2:
+            latlong = 1
+
+        nplay += play_begin[i+1] - play_begin[i]
+
+        if auto_assign[i]:
+            # the auto-assigned players add a self link if needed
+            has_self = 0
+
+            for j in range(play_begin[i], play_begin[i+1]):
+                if play_dest[j] == i:
+                    has_self = 1
+                    break
+
+            if not has_self:
+                nplay += 1
+
+    if xy and latlong:
+        raise ValueError(
+            "Cannot mix wards with X/Y and lat/long coordinates")
+
+    nodes = Nodes(nnodes_plus_one)
 
     cdef int * nodes_label = get_int_array_ptr(nodes.label)
+    cdef int * nodes_begin_to = get_int_array_ptr(nodes.begin_to)
+    cdef int * nodes_end_to = get_int_array_ptr(nodes.end_to)
+    cdef int * nodes_self_w = get_int_array_ptr(nodes.self_w)
+    cdef int * nodes_begin_p = get_int_array_ptr(nodes.begin_p)
+    cdef int * nodes_end_p = get_int_array_ptr(nodes.end_p)
+    cdef int * nodes_self_p = get_int_array_ptr(nodes.self_p)
+
+    cdef double * nodes_play_suscept = get_double_array_ptr(nodes.play_suscept)
     cdef double * nodes_save_play_suscept = get_double_array_ptr(
-                                                    nodes.save_play_suscept)
+                                                nodes.save_play_suscept)
 
     cdef double * nodes_x = get_double_array_ptr(nodes.x)
     cdef double * nodes_y = get_double_array_ptr(nodes.y)
+    cdef double * x = get_double_array_ptr(a["x"])
+    cdef double * y = get_double_array_ptr(a["y"])
 
     cdef double * nodes_scale_uv = get_double_array_ptr(nodes.scale_uv)
     cdef double * nodes_cutoff = get_double_array_ptr(nodes.cutoff)
     cdef double * nodes_bg_foi = get_double_array_ptr(nodes.bg_foi)
+    cdef double * scale_uv = get_double_array_ptr(a["scale_uv"])
+    cdef double * cutoff = get_double_array_ptr(a["cutoff"])
+    cdef double * bg_foi = get_double_array_ptr(a["bg_foi"])
+
     cdef double * nodes_custom
+    cdef int * custom_mask
+    cdef double * custom
+
+    for i in range(1, nnodes_plus_one):
+        if not present[i]:
+            continue
+
+        if pos_type[i] != 0:
+            nodes_x[i] = x[i]
+            nodes_y[i] = y[i]
+
+        nodes_label[i] = i
+        nodes_play_suscept[i] = <double>(num_players[i])
+        nodes_save_play_suscept[i] = nodes_play_suscept[i]
+        nodes_scale_uv[i] = scale_uv[i]
+        nodes_cutoff[i] = cutoff[i]
+        nodes_bg_foi[i] = bg_foi[i]
+
+    for idx, key in enumerate(columns.custom_keys):
+        custom_mask = get_int_array_ptr(a[f"custom_mask_{idx}"])
+        custom = get_double_array_ptr(a[f"custom_{idx}"])
+        nodes_custom = get_double_array_ptr(nodes.get_custom(key))
+
+        for i in range(1, nnodes_plus_one):
+            if present[i] and custom_mask[i]:
+                nodes_custom[i] = custom[i]
+
+    if xy:
+        nodes.coordinates = "x/y"
+    elif latlong:
+        nodes.coordinates = "lat/long"
+    else:
+        nodes.coordinates = None
+
+    p = p.stop()
+
+    p = p.start("convert work links")
+
+    links = Links(nlinks+1)
 
-    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
     cdef int * links_ito = get_int_array_ptr(links.ito)
+    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
+    cdef double * links_suscept = get_double_array_ptr(links.suscept)
     cdef double * links_weight = get_double_array_ptr(links.weight)
 
+    cdef int ilink = 0
+
+    for i in range(1, nnodes_plus_one):
+        if not present[i] or work_begin[i] == work_begin[i+1]:
+            continue
+
+        nodes_begin_to[i] = ilink + 1
+        nodes_end_to[i] = nodes_begin_to[i] + \
+            <int>(work_begin[i+1] - work_begin[i])
+
+        for j in range(work_begin[i], work_begin[i+1]):
+            ilink += 1
+            links_ifrom[ilink] = i
+            links_ito[ilink] = work_dest[j]
+            links_weight[ilink] = <double>(work_pop[j])
+            links_suscept[ilink] = links_weight[ilink]
+
+            if i == work_dest[j]:
+                nodes_self_w[i] = ilink
+
+    assert nlinks == ilink
+
+    p = p.stop()
+
+    p = p.start("convert play links")
+
+    play = Links(nplay+1)
+
     cdef int * play_ifrom = get_int_array_ptr(play.ifrom)
     cdef int * play_ito = get_int_array_ptr(play.ito)
-    cdef double * play_weight = get_double_array_ptr(play.weight)
+    cdef double * play_suscept = get_double_array_ptr(play.suscept)
+    cdef double * links_play_weight = get_double_array_ptr(play.weight)
+
+    cdef int added_self = 0
+
+    ilink = 0
+
+    for i in range(1, nnodes_plus_one):
+        if not present[i]:
+            continue
+
+        if play_begin[i] == play_begin[i+1] and not auto_assign[i]:
+            continue
+
+        nodes_begin_p[i] = ilink + 1
+        added_self = 0 if auto_assign[i] else 1
+
+        # the links are sorted by destination, so insert the
+        # auto-assigned self link in order (as Ward.get_player_lists)
+        for j in range(play_begin[i], play_begin[i+1] + 1):
+            if not added_self and \
+                    (j == play_begin[i+1] or play_dest[j] >= i):
+                added_self = 1
+
+                if j == play_begin[i+1] or play_dest[j] != i:
+                    ilink += 1
+                    play_ifrom[ilink] = i
+                    play_ito[ilink] = i
+                    links_play_weight[ilink] = player_total[i]
+                    play_suscept[ilink] = links_play_weight[ilink]
+                    nodes_self_p[i] = ilink
+
+            if j == play_begin[i+1]:
+                break
+
+            ilink += 1
+            play_ifrom[ilink] = i
+            play_ito[ilink] = play_dest[j]
+            links_play_weight[ilink] = play_weight[j]
+
+            if i == play_dest[j]:
+                nodes_self_p[i] = ilink
+
+                if auto_assign[i]:
+                    links_play_weight[ilink] += player_total[i]
+
+            play_suscept[ilink] = links_play_weight[ilink]
+
+        nodes_end_p[i] = ilink + 1
+
+    assert nplay == ilink
+
+    p = p.stop()
+
+    network = Network()
+    network.params = params
+    network.nodes = nodes
+    network.nnodes = nnodes_plus_one - 1
+    network.links = links
+    network.nlinks = nlinks
+    network.play = play
+    network.nplay = nplay
+
+    from .._wardinfo import WardInfos
+    network.info = WardInfos(columns.get_infos())
+
+    _finalise_network(network, num_workers=columns.num_workers(),
+                      num_players=columns.num_players(), profiler=p,
+                      nthreads=nthreads)
+
+    p = p.stop()
+
+    return network
+
+
+cdef int _compare_keys(const void *a, const void *b) nogil:
+    cdef long long ka = (<long long*>a)[0]
+    cdef long long kb = (<long long*>b)[0]
+
+    if ka < kb:
+        return -1
+    elif ka > kb:
+        return 1
+    else:
+        return 0
+
+
+def _group_links(links, int nnodes, int nthreads):
+    """Group the (valid) links of 'links' by the ward they come from.
+       This returns (begin, order, keys) where begin[i]:begin[i+1]
+       is the range in 'order' of the link indexes from ward i (in
+       link order), and the same range of 'keys' holds those
+       links sorted by destination then link index, packed as
+       (ito << 32 | index). This is linear in the number of links
+       (a counting sort by ward, then a sort of each ward's links)
+    """
+    from array import array
+
+    cdef int nlinks = len(links.ifrom)
+    cdef int * links_ifrom = get_int_array_ptr(links.ifrom)
+    cdef int * links_ito = get_int_array_ptr(links.ito)
+
+    begin = array("q", [0]) * (nnodes + 2)
+    cdef long long [::1] b = begin
+
+    cdef int i = 0
+    cdef int j = 0
+    cdef int ifrom = 0
+    cdef int ito = 0
+    cdef int ninvalid = 0
+
+    for j in range(0, nlinks):
+        ifrom = links_ifrom[j]
+        ito = links_ito[j]
+
+        if ifrom == -1 or ito == -1:
+            # null link
+            continue
+
+        if ito <= 0 or ito > nnodes or ifrom <= 0 or ifrom > nnodes:
+            ninvalid += 1
+            continue
+
+        b[ifrom + 1] += 1
+
+    if ninvalid > 0:
+        raise ValueError(f"There are {ninvalid} invalid links, which "
+                         f"connect to wards that don't exist")
+
+    for i in range(1, nnodes + 2):
+        b[i] += b[i-1]
+
+    cdef int nvalid = b[nnodes + 1]
+
+    order = array("i", [0]) * nvalid
+    keys = array("q", [0]) * nvalid
+
+    cdef int [::1] o = order
+    cdef long long [::1] k = keys
+    cdef long long [::1] fill = array("q", begin)
+
+    for j in range(0, nlinks):
+        ifrom = links_ifrom[j]
+
+        if ifrom == -1 or links_ito[j] == -1:
+            continue
+
+        o[fill[ifrom]] = j
+        k[fill[ifrom]] = ((<long long>links_ito[j]) << 32) | j
+        fill[ifrom] += 1
+
+    cdef int num_threads = nthreads
+    cdef long long start = 0
+
+    if nvalid > 0:
+        with nogil, parallel(num_threads=num_threads):
+            for i in prange(1, nnodes + 1, schedule="dynamic"):
+                start = b[i]
+
+                if b[i+1] - start > 1:
+                    qsort(&(k[start]), b[i+1] - start, sizeof(long long),
+                          &_compare_keys)
+
+    return (begin, order, keys)
+
+
+def save_to_wards_columns(network: Network, profiler: Profiler = None,
+                          nthreads: int = 1):
+    """Build and return the WardsColumns that represent the passed
+       Network. This works directly on the arrays of the network,
+       so is linear in the number of links and parallel over wards.
+       The result is identical to WardsColumns.from_wards applied
+       to the Wards created by save_to_wards
+    """
+    from array import array
+    from ._wards_columns import WardsColumns, _StringTable, \
+        _info_fields, _info_list_fields
+
+    if profiler is None:
+        from ._profiler import NullProfiler
+        profiler = NullProfiler()
+
+    p = profiler.start("save_to_wards_columns")
+
+    nodes = network.nodes
+    info = network.info
 
     cdef int nnodes = network.nnodes
     cdef int nnodes_plus_one = nnodes + 1
-    cdef int nlinks = len(links)
-    cdef int nplay = len(play)
+    cdef int num_threads = nthreads
 
-    cdef int have_info = 1 if (len(info) > 1) else 0
-    cdef int have_coords = 0 if nodes.coordinates is None else 1
-    cdef int xy_coords = 1 if nodes.coordinates == "x/y" else 0
+    cdef int * nodes_label = get_int_array_ptr(nodes.label)
 
-    wards = [None]
+    cdef int i = 0
+    cdef long long j = 0
 
-    self_weight = [None] * nnodes_plus_one
+    for i in range(1, nnodes_plus_one):
+        if nodes_label[i] != i:
+            raise ValueError(f"Invalid ward label {nodes_label[i]} for "
+                             f"ward {i}")
 
-    cdef int i = 0
-    cdef int update_freq = 250
-    cdef int ifrom, ito
-    cdef double weight
-    cdef double diff
+    p = p.start("convert nodes")
 
-    p = p.start("Convert wards")
-    with Console.progress() as progress:
-        task = progress.add_task("Extracting wards", total=nnodes_plus_one)
+    present = array("i", [1]) * nnodes_plus_one
+    present[0] = 0
 
-        for i in range(1, nnodes_plus_one):
-            ward = Ward(id=nodes_label[i], auto_assign_players=False)
+    num_players = array("i", [0]) * nnodes_plus_one
+    pos_type = array("i", [0]) * nnodes_plus_one
 
-            if have_info:
-                ward.set_info(info[i])
+    columns = WardsColumns()
+    a = columns.arrays
 
-            if have_coords:
-                if xy_coords:
-                    ward.set_position(x=nodes_x[i], y=nodes_y[i], units="km")
-                else:
-                    ward.set_position(lat=nodes_x[i], long=nodes_y[i])
+    a["present"] = present
+    a["auto_assign"] = array("i", [0]) * nnodes_plus_one
+    a["num_workers"] = array("i", [0]) * nnodes_plus_one
+    a["num_players"] = num_players
+    a["player_total"] = array("d", [1.0]) * nnodes_plus_one
+    a["player_total"][0] = 0.0
+    a["pos_type"] = pos_type
 
-            ward.set_num_players(nodes_save_play_suscept[i])
+    if nodes.coordinates is None:
+        a["x"] = array("d", [0.0]) * nnodes_plus_one
+        a["y"] = array("d", [0.0]) * nnodes_plus_one
+    else:
+        a["x"] = array("d", nodes.x[0:nnodes_plus_one])
+        a["y"] = array("d", nodes.y[0:nnodes_plus_one])
+        a["x"][0] = 0.0
+        a["y"][0] = 0.0
+
+    a["scale_uv"] = array("d", nodes.scale_uv[0:nnodes_plus_one])
+    a["cutoff"] = array("d", nodes.cutoff[0:nnodes_plus_one])
+    a["bg_foi"] = array("d", nodes.bg_foi[0:nnodes_plus_one])
+    a["scale_uv"][0] = 1.0
+    a["cutoff"][0] = 99999.99
+    a["bg_foi"][0] = 0.0
+
+    cdef int * players = get_int_array_ptr(num_players)
+    cdef int * pos = get_int_array_ptr(pos_type)
+    cdef double * nodes_save_play_suscept = get_double_array_ptr(
+                                                    nodes.save_play_suscept)
+    cdef double * scale_uv = get_double_array_ptr(a["scale_uv"])
+    cdef double * cutoff = get_double_array_ptr(a["cutoff"])
+    cdef double * bg_foi = get_double_array_ptr(a["bg_foi"])
 
-            ward.set_scale_uv(nodes_scale_uv[i])
-            ward.set_cutoff(nodes_cutoff[i])
-            ward.set_bg_foi(nodes_bg_foi[i])
+    cdef int coords = 0
 
-            for key, value in nodes._custom_params.items():
-                nodes_custom = get_double_array_ptr(value)
-                ward.set_custom(key, nodes_custom[i])
+    if nodes.coordinates == "x/y":
+        coords = 1
+    elif nodes.coordinates is not None:
+        coords = 2
 
-            wards.append(ward)
+    cdef int nerrors = 0
 
-            if i % update_freq == 0:
-                progress.update(task, completed=i)
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes_plus_one, schedule="static"):
+            players[i] = <int>(nodes_save_play_suscept[i])
+            pos[i] = coords
+
+            if players[i] < 0 or scale_uv[i] < 0 or cutoff[i] < 0 or \
+                    bg_foi[i] != bg_foi[i]:
+                nerrors += 1
+
+    if nerrors > 0:
+        raise ValueError(f"There are {nerrors} wards with negative "
+                         f"populations, scale_uv or cutoff, or NaN bg_foi")
+
+    for idx, (key, value) in enumerate(nodes._custom_params.items()):
+        mask = array("i", present)
+        values = array("d", value[0:nnodes_plus_one])
+        values[0] = 0.0
+        columns.custom_keys.append(key)
+        a[f"custom_mask_{idx}"] = mask
+        a[f"custom_{idx}"] = values
+
+    # the strings are de-duplicated via a dictionary, so this is the
+    # only part of the conversion that needs python objects
+    strings = _StringTable()
+
+    for field in _info_fields:
+        a[f"info_{field}"] = array("i", [0]) * nnodes_plus_one
+
+    lists = {}
+    for field in _info_list_fields:
+        lists[field] = (array("q", [0]) * (nnodes_plus_one + 1), array("i"))
+
+    if len(info) > 1:
+        for i in range(1, nnodes_plus_one):
+            ward_info = info[i]
+
+            for field in _info_fields:
+                a[f"info_{field}"][i] = strings.add(getattr(ward_info, field))
+
+            for field in _info_list_fields:
+                (begin, values) = lists[field]
+
+                for value in getattr(ward_info, field):
+                    values.append(strings.add(value))
+
+                begin[i+1] = len(values)
 
-        progress.update(task, completed=nnodes_plus_one, force_update=True)
     p = p.stop()
 
-    p = p.start("Convert work links")
-    with Console.progress() as progress:
-        task = progress.add_task("Extracting work links", total=nlinks)
+    p = p.start("convert work links")
+    a["work_begin"], a["work_dest"], a["work_pop"] = \
+        _work_links_to_csr(network, a["num_workers"], nthreads)
+    p = p.stop()
 
-        for i in range(0, nlinks):
-            ifrom = links_ifrom[i]
-            ito = links_ito[i]
-            weight = links_weight[i]
+    p = p.start("convert play links")
+    a["play_begin"], a["play_dest"], a["play_weight"] = \
+        _play_links_to_csr(network, a["player_total"], nthreads)
+    p = p.stop()
 
-            if ifrom == -1 or ito == -1:
-                # null link
-                continue
+    (blob, offsets) = strings.to_arrays()
+    a["strings"] = blob
+    a["string_offsets"] = offsets
+
+    for field in _info_list_fields:
+        (begin, values) = lists[field]
+        a[f"info_{field}_begin"] = begin
+        a[f"info_{field}"] = values
 
-            if ito <= 0 or ito > nnodes or ifrom <=0 or ifrom > nnodes:
-                Console.error(f"Invalid link? {ifrom}=>{ito}")
+    # put the arrays into the same order as WardsColumns.from_wards
+    order = ["present", "auto_assign", "num_workers", "num_players",
+             "player_total", "pos_type", "x", "y", "scale_uv", "cutoff",
+             "bg_foi", "work_begin", "work_dest", "work_pop",
+             "play_begin", "play_dest", "play_weight",
+             "strings", "string_offsets"]
 
-            if ifrom == ito and ifrom == 38:
-                Console.print(f"ward {ifrom} {ito} => {weight}")
+    order += [f"info_{field}" for field in _info_fields]
 
-            wards[ifrom].add_workers(destination=ito, number=weight)
+    for field in _info_list_fields:
+        order += [f"info_{field}_begin", f"info_{field}"]
 
-            if i % update_freq == 0:
-                progress.update(task, completed=i+1)
+    for idx in range(0, len(columns.custom_keys)):
+        order += [f"custom_mask_{idx}", f"custom_{idx}"]
+
+    columns.arrays = {key: a[key] for key in order}
 
-        progress.update(task, completed=nlinks, force_update=True)
     p = p.stop()
 
-    p = p.start("Convert play links")
-    with Console.progress() as progress:
-        task = progress.add_task("Extracting play links", total=nplay)
+    return columns
 
-        for i in range(0, nplay):
-            ifrom = play_ifrom[i]
-            ito = play_ito[i]
-            weight = play_weight[i]
 
-            if ifrom == -1 or ito == -1:
-                # null link
-                continue
+def _work_links_to_csr(network: Network, num_workers, int nthreads):
+    """Return the (begin, dest, pop) CSR arrays of the work links of
+       'network', filling in 'num_workers'. Duplicate links are
+       summed, and the populations are truncated to integers, as
+       for Ward.add_workers
+    """
+    from array import array
+
+    cdef int nnodes = network.nnodes
+    cdef int num_threads = nthreads
 
-            if ito <= 0 or ito > nnodes or ifrom <=0 or ifrom > nnodes:
-                Console.error(f"Invalid play link? {ifrom}=>{ito}")
+    (begin, order, keys) = _group_links(network.links, nnodes, nthreads)
 
-            if ifrom == ito:
-                self_weight[ifrom] = weight
+    cdef long long [::1] b = begin
+    cdef long long [::1] k = keys
+    cdef double * links_weight = get_double_array_ptr(network.links.weight)
+    cdef int * workers = get_int_array_ptr(num_workers)
 
-            wards[ifrom].add_player_weight(destination=ito, weight=weight)
+    nunique = array("q", [0]) * (nnodes + 2)
+    cdef long long [::1] u = nunique
 
-            if i % update_freq == 0:
-                progress.update(task, completed=i+1)
+    cdef int i = 0
+    cdef long long j = 0
+    cdef long long last = 0
 
-        errors = []
+    # count the number of unique destinations of each ward
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes + 1, schedule="static"):
+            last = -1
 
-        for i in range(1, nnodes_plus_one):
-            weight = wards[i].get_players(destination=i)
+            for j in range(b[i], b[i+1]):
+                if (k[j] >> 32) != last:
+                    last = k[j] >> 32
+                    u[i+1] += 1
+
+    for i in range(1, nnodes + 2):
+        u[i] += u[i-1]
+
+    dest = array("i", [0]) * u[nnodes + 1]
+    pop = array("i", [0]) * u[nnodes + 1]
+
+    cdef int * d = get_int_array_ptr(dest)
+    cdef int * n = get_int_array_ptr(pop)
+    cdef long long out = 0
+    cdef int number = 0
+    cdef int nerrors = 0
+
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes + 1, schedule="static"):
+            out = u[i] - 1
+            last = -1
+            workers[i] = 0
+
+            for j in range(b[i], b[i+1]):
+                number = <int>(links_weight[k[j] & 0x7FFFFFFF])
+
+                if number < 0:
+                    nerrors += 1
+                    number = 0
+
+                if (k[j] >> 32) != last:
+                    last = k[j] >> 32
+                    out = out + 1
+                    d[out] = <int>last
+                    n[out] = 0
+
+                n[out] += number
+                workers[i] += number
+
+    if nerrors > 0:
+        raise ValueError(f"There are {nerrors} work links with negative "
+                         f"populations")
+
+    return (nunique, dest, pop)
+
+
+def _play_links_to_csr(network: Network, player_total, int nthreads):
+    """Return the (begin, dest, weight) CSR arrays of the play links of
+       'network', filling in 'player_total'. The weights are added in
+       link order following the rules of Ward.add_player_weight, so
+       that the result is identical to adding each link in turn
+    """
+    from array import array
+
+    cdef int nnodes = network.nnodes
+    cdef int num_threads = nthreads
+
+    (begin, order, keys) = _group_links(network.play, nnodes, nthreads)
+
+    cdef long long [::1] b = begin
+    cdef int [::1] o = order
+    cdef long long [::1] k = keys
+    cdef int * play_ito = get_int_array_ptr(network.play.ito)
+    cdef double * play_weight = get_double_array_ptr(network.play.weight)
+    cdef double * total = get_double_array_ptr(player_total)
 
-            if self_weight[i] is None:
-                # the weight should either be zero or one
+    cdef int nvalid = len(order)
+
+    # the weight actually added for each link (or -1 if skipped)
+    added = array("d", [0.0]) * max(1, len(network.play.weight))
+    cdef double * w = get_double_array_ptr(added)
+
+    nunique = array("q", [0]) * (nnodes + 2)
+    cdef long long [::1] u = nunique
+
+    cdef double tiny = 1e-10
+    cdef double weight = 0.0
+    cdef double remaining = 0.0
+    cdef int i = 0
+    cdef int link = 0
+    cdef long long j = 0
+    cdef long long last = 0
+    cdef int nerrors = 0
+
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes + 1, schedule="static"):
+            remaining = 1.0
+
+            # this loop is in link order, as the remaining weight
+            # depends on the order in which weights were added
+            for j in range(b[i], b[i+1]):
+                link = o[j]
+                weight = play_weight[link]
+
+                w[link] = -1.0
+
+                if weight < 0:
+                    nerrors += 1
+                    continue
+                elif weight < tiny:
+                    continue
+
+                if weight - remaining < tiny and remaining - weight < tiny:
+                    weight = remaining
+
+                if weight > remaining:
+                    nerrors += 1
+                    continue
+
+                w[link] = weight
+                remaining = remaining - weight
+
+                if remaining < tiny:
+                    remaining = 0.0
+
+            total[i] = remaining
+
+            last = -1
+
+            for j in range(b[i], b[i+1]):
+                if w[k[j] & 0x7FFFFFFF] >= 0 and (k[j] >> 32) != last:
+                    last = k[j] >> 32
+                    u[i+1] += 1
+
+    if nerrors > 0:
+        raise ValueError(f"There are {nerrors} play links with negative "
+                         f"weights, or where the sum of weights is "
+                         f"greater than 1.0")
+
+    for i in range(1, nnodes + 2):
+        u[i] += u[i-1]
+
+    dest = array("i", [0]) * u[nnodes + 1]
+    weights = array("d", [0.0]) * u[nnodes + 1]
+
+    cdef int * d = get_int_array_ptr(dest)
+    cdef double * pw = get_double_array_ptr(weights)
+    cdef long long out = 0
+    cdef double self_weight = 0.0
+    cdef int has_self = 0
+    cdef double diff = 0.0
+
+    with nogil, parallel(num_threads=num_threads):
+        for i in prange(1, nnodes + 1, schedule="static"):
+            out = u[i] - 1
+            last = -1
+            has_self = 0
+            self_weight = 0.0
+
+            for j in range(b[i], b[i+1]):
+                link = k[j] & 0x7FFFFFFF
+
+                if play_ito[link] == i:
+                    # the links to each destination are in link order,
+                    # so this ends with the weight of the last self link
+                    self_weight = play_weight[link]
+                    has_self = 1
+
+                if w[link] < 0:
+                    continue
+
+                if (k[j] >> 32) != last:
+                    last = k[j] >> 32
+                    out = out + 1
+                    d[out] = <int>last
+                    pw[out] = 0.0
+
+                pw[out] += w[link]
+
+            # check that the self weight has been represented correctly
+            weight = 0.0
+
+            if u[i+1] > u[i]:
+                for j in range(u[i], u[i+1]):
+                    if d[j] == i:
+                        weight = pw[j]
+
+            if not has_self:
                 if weight > 0.5:
-                    self_weight[i] = 1.0
+                    self_weight = 1.0
                 else:
-                    self_weight[i] = 0.0
+                    self_weight = 0.0
 
-            diff = abs(self_weight[i] - weight)
+            diff = self_weight - weight
 
-            if diff > 1e-6:
-                errors.append(
-                    f"Ward {i} weight disagreement? {self_weight[i]} "
-                    f"versus {weight}")
+            if diff > 1e-6 or diff < -1e-6:
+                nerrors += 1
 
-                if len(errors) > 10:
-                    Console.error("Lots of errors! Exiting early!")
-                    break
+    if nerrors > 0:
+        Console.error(f"There are {nerrors} wards with a disagreement in "
+                      f"the self player weights")
+        raise AssertionError("Disagreement in player weights")
 
-        if len(errors) > 0:
-            Console.error("\n".join(errors))
-            raise AssertionError("Disagreement in player weights")
+    return (nunique, dest, weights)
 
-        progress.update(task, completed=nlinks, force_update=True)
-    p = p.stop()
 
-    p = p.start("Create Wards")
-    w = Wards()
-    w.insert(wards, _need_deep_copy = False)
-    wards = w
+def save_to_wards(network: Network, profiler: Profiler = None,
+                  nthreads: int = 1) -> Wards:
+    """Build a return a set of Wards constructed from the passed Network"""
+    if profiler is None:
+        from ._profiler import NullProfiler
+        profiler = NullProfiler()
+
+    p = profiler.start("save_to_wards")
+
+    columns = save_to_wards_columns(network, profiler=p, nthreads=nthreads)
 
+    p = p.start("Create Wards")
+    wards = columns.to_wards()
     p = p.stop()
 
     p = p.start("Assert sane")
     wards.assert_sane()
 
+    errors = []
+
     if wards.num_workers() != network.work_population:
         errors.append(
             f"Disagreement in the number of workers: "
@@ -512,4 +1145,3 @@ def save_to_wards(network: Network, profiler: Profiler = None,
     p = p.stop()
 
     return wards
-
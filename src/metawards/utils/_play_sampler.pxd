@@ -0,0 +1,79 @@
+
+from ._ran_binomial cimport binomial_rng, _ran_uniform
+
+# Inline helpers used by the iterators to sample how the individuals
+# moving from a ward are distributed across its play links, using
+# the alias tables built by get_play_alias_tables
+
+
+cdef enum:
+    # the maximum number of individuals that are sampled one at a time
+    # from the alias table - this is also the size of the per-thread
+    # scratch space needed by _sample_play_alias
+    PLAY_ALIAS_MAX_N = 64
+
+    # the alias table is only used automatically if the number of
+    # individuals is less than the number of links divided by this
+    PLAY_ALIAS_RATIO = 4
+
+
+cdef inline bint _use_play_alias(int sampler, int n, int m) nogil:
+    """Return whether or not the alias table should be used to
+       distribute 'n' individuals across 'm' play links, using the
+       passed sampler (0 = chain, 1 = auto, 2 = alias)
+    """
+    if sampler == 0 or n <= 0 or m <= 0 or n > PLAY_ALIAS_MAX_N:
+        return False
+    elif sampler == 2:
+        return True
+    else:
+        return n * PLAY_ALIAS_RATIO < m
+
+
+cdef inline int _sample_play_alias(binomial_rng *rng, int n, int m,
+                                   double *prob, int *alias,
+                                   int *slots, int *counts) nogil:
+    """Distribute 'n' individuals across the 'm' + 1 slots of a ward's
+       alias table ('prob' and 'alias'), where slots 0 to m-1 are the
+       ward's play links and slot 'm' is 'not moving to any link'.
+       This draws one uniform random number per individual. The
+       slots that were picked are written in ascending order to
+       'slots', with the number picked in each written to 'counts'
+       (both must have space for 'n' values). This returns the
+       number of unique slots picked
+    """
+    cdef int i = 0
+    cdef int j = 0
+    cdef int s = 0
+    cdef int nslots = 0
+    cdef double u = 0.0
+
+    for i in range(0, n):
+        u = _ran_uniform(rng) * (m + 1)
+        s = <int>u
+
+        if s > m:
+            s = m
+
+        if u - s >= prob[s]:
+            s = alias[s]
+
+        # insertion sort, as n is small
+        j = i
+
+        while j > 0 and slots[j - 1] > s:
+            slots[j] = slots[j - 1]
+            j = j - 1
+
+        slots[j] = s
+
+    # collapse into (slot, count) pairs
+    for i in range(0, n):
+        if nslots > 0 and slots[nslots - 1] == slots[i]:
+            counts[nslots - 1] = counts[nslots - 1] + 1
+        else:
+            slots[nslots] = slots[i]
+            counts[nslots] = 1
+            nslots = nslots + 1
+
+    return nslots
@@ -0,0 +1,261 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+
+from libc.stdlib cimport malloc, free
+from libc.string cimport memcmp
+
+from .._network import Network
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+__all__ = ["get_play_sampler", "set_play_sampler", "get_play_sampler_id",
+           "get_play_alias_tables"]
+
+
+_play_sampler = "chain"
+
+_play_sampler_ids = {"chain": 0, "auto": 1, "alias": 2}
+
+
+def get_play_sampler() -> str:
+    """Return the method used to distribute the individuals moving
+       from a ward across its play links. This is one of "chain",
+       "auto" or "alias" (see set_play_sampler)
+    """
+    return _play_sampler
+
+
+def set_play_sampler(method: str = "chain") -> None:
+    """Set the method used by the iterators (advance_foi and
+       advance_play) to distribute the individuals moving from
+       a ward across its play links.
+
+       Parameters
+       ----------
+       method: str
+         "chain" - draw a chain of conditional binomials, one per
+                   play link, stopping as soon as everyone has been
+                   placed. This is the default, and reproduces the
+                   results of earlier versions.
+         "auto" - sample each individual from a per-ward alias table
+                  when there are far fewer individuals than play
+                  links, and use the chain otherwise. This samples
+                  from the same multinomial distribution, but draws
+                  different random numbers, so gives different
+                  (but statistically equivalent) results.
+         "alias" - use the alias table whenever there are few enough
+                   individuals to sample one at a time
+    """
+    global _play_sampler
+
+    if method is None:
+        method = "chain"
+
+    method = str(method).strip().lower()
+
+    if method not in _play_sampler_ids:
+        raise ValueError(
+            f"Unrecognised play sampler '{method}'. This should "
+            f"be one of 'chain', 'auto' or 'alias'")
+
+    _play_sampler = method
+
+
+def get_play_sampler_id() -> int:
+    """Return the integer ID of the current play sampler, as
+       used by the iterators (0 = chain, 1 = auto, 2 = alias)
+    """
+    return _play_sampler_ids[_play_sampler]
+
+
+def _get_topology(network: Network):
+    """Return the arrays that describe the topology of the play
+       matrix. These are shared by copies of the network, so the
+       tables remain valid for copies
+    """
+    return [network.play.ifrom, network.play.ito,
+            network.nodes.begin_p, network.nodes.end_p]
+
+
+def _is_unchanged(tables, network: Network) -> bool:
+    """Return whether the cached alias 'tables' are still valid
+       for 'network'
+    """
+    if tables is None:
+        return False
+
+    if tables["nnodes"] != network.nnodes or \
+            tables["nplay"] != network.nplay:
+        return False
+
+    for old, new in zip(tables["topology"], _get_topology(network)):
+        if old is not new:
+            return False
+
+    saved = tables["weight"]
+    weight = network.play.weight
+
+    if len(saved) != len(weight):
+        return False
+    elif len(saved) == 0:
+        return True
+
+    cdef double * a = get_double_array_ptr(saved)
+    cdef double * b = get_double_array_ptr(weight)
+    cdef int n = len(saved)
+
+    return memcmp(a, b, n * sizeof(double)) == 0
+
+
+def _build_tables(network: Network):
+    """Build the per-ward alias tables for the play matrix of
+       'network' using Vose's method
+    """
+    from ._array import create_int_array, create_double_array
+
+    wards = network.nodes
+
+    cdef int nnodes = network.nnodes
+    cdef int * begin_p = get_int_array_ptr(wards.begin_p)
+    cdef int * end_p = get_int_array_ptr(wards.end_p)
+    cdef double * weight = get_double_array_ptr(network.play.weight) \
+                                if network.nplay > 0 else <double*>0
+
+    cdef int i = 0
+    cdef int m = 0
+    cdef int max_m = 0
+    cdef int ntotal = 0
+
+    begin = create_int_array(nnodes + 2, 0)
+    cdef int * b = get_int_array_ptr(begin)
+
+    # each ward has one slot per play link, plus one slot for
+    # 'not moving to any link'
+    for i in range(1, nnodes + 1):
+        if begin_p[i] > 0 and end_p[i] > begin_p[i]:
+            m = end_p[i] - begin_p[i]
+        else:
+            m = 0
+
+        b[i] = ntotal
+        ntotal += m + 1
+        max_m = max(max_m, m)
+
+    b[nnodes + 1] = ntotal
+
+    prob = create_double_array(max(1, ntotal), 0.0)
+    alias = create_int_array(max(1, ntotal), 0)
+
+    cdef double * p = get_double_array_ptr(prob)
+    cdef int * a = get_int_array_ptr(alias)
+
+    cdef double * scaled = <double *> malloc((max_m + 1) * sizeof(double))
+    cdef int * small = <int *> malloc((max_m + 1) * sizeof(int))
+    cdef int * large = <int *> malloc((max_m + 1) * sizeof(int))
+
+    cdef int k = 0
+    cdef int s = 0
+    cdef int l = 0
+    cdef int nsmall = 0
+    cdef int nlarge = 0
+    cdef double total = 0.0
+    cdef double w = 0.0
+
+    with nogil:
+        for i in range(1, nnodes + 1):
+            m = b[i + 1] - b[i] - 1
+
+            total = 0.0
+
+            for k in range(0, m):
+                w = weight[begin_p[i] + k]
+                scaled[k] = w if w > 0.0 else 0.0
+                total = total + scaled[k]
+
+            # the probability of not moving to any link
+            scaled[m] = 1.0 - total if total < 1.0 else 0.0
+            total = total + scaled[m]
+
+            nsmall = 0
+            nlarge = 0
+
+            for k in range(0, m + 1):
+                scaled[k] = scaled[k] * (m + 1) / total
+
+                if scaled[k] < 1.0:
+                    small[nsmall] = k
+                    nsmall = nsmall + 1
+                else:
+                    large[nlarge] = k
+                    nlarge = nlarge + 1
+
+            while nsmall > 0 and nlarge > 0:
+                nsmall = nsmall - 1
+                s = small[nsmall]
+                l = large[nlarge - 1]
+
+                p[b[i] + s] = scaled[s]
+                a[b[i] + s] = l
+
+                scaled[l] = (scaled[l] + scaled[s]) - 1.0
+
+                if scaled[l] < 1.0:
+                    nlarge = nlarge - 1
+                    small[nsmall] = l
+                    nsmall = nsmall + 1
+
+            # anything left over has (up to rounding) probability 1
+            while nlarge > 0:
+                nlarge = nlarge - 1
+                p[b[i] + large[nlarge]] = 1.0
+                a[b[i] + large[nlarge]] = large[nlarge]
+
+            while nsmall > 0:
+                nsmall = nsmall - 1
+                p[b[i] + small[nsmall]] = 1.0
+                a[b[i] + small[nsmall]] = small[nsmall]
+
+    free(scaled)
+    free(small)
+    free(large)
+
+    return (begin, prob, alias)
+
+
+def get_play_alias_tables(network: Network):
+    """Return the per-ward alias tables used to sample the play
+       movements of individuals from each ward. This is a dictionary,
+       where "begin"[i] is the first slot of ward i in "prob" and
+       "alias". Ward i has one slot for each of its play links
+       (in order from begin_p[i] to end_p[i]), plus a final slot
+       for 'not moving to any link'. The tables are built on first
+       use and then cached on the network. They are only rebuilt
+       if the play weights change.
+
+       Returns None if the play sampler is "chain", as the tables
+       are not needed
+    """
+    if _play_sampler == "chain":
+        return None
+
+    tables = network._play_alias_tables
+
+    if not _is_unchanged(tables, network=network):
+        from copy import deepcopy
+
+        (begin, prob, alias) = _build_tables(network)
+
+        # the tables are replaced rather than updated in-place, as
+        # shallow copies of this network will share the old tables
+        tables = {"nnodes": network.nnodes,
+                  "nplay": network.nplay,
+                  "topology": _get_topology(network),
+                  "weight": deepcopy(network.play.weight),
+                  "begin": begin, "prob": prob, "alias": alias}
+
+        network._play_alias_tables = tables
+
+    return tables
@@ -22,6 +22,9 @@ class NullProfiler:
     def stop(self):
         return self
 
+    def record_bytes(self, nbytes: int):
+        pass
+
 
 class Profiler:
     """This is a simple profiling class that supports manual
@@ -35,6 +38,7 @@ class Profiler:
         self._children = []
         self._start = None
         self._end = None
+        self._nbytes = None
 
     def is_null(self) -> bool:
         """Return whether this is a null profiler"""
@@ -61,6 +65,10 @@ class Profiler:
             else:
                 lines.append("%s: %.3f ms" % (self._name, t))
 
+            if self._nbytes is not None:
+                mb = self._nbytes / (1024.0 * 1024.0)
+                lines[-1] += " [%.3f MB, %.3f MB/s]" % (mb, 1000.0 * mb / t)
+
         elif self._start is None:
             lines.append(f"{self._name}")
         else:
@@ -111,6 +119,16 @@ class Profiler:
         else:
             return None
 
+    def record_bytes(self, nbytes: int):
+        """Record that 'nbytes' bytes were processed in this section.
+           The throughput (MB/s) is then reported together with the
+           time taken
+        """
+        if self._nbytes is None:
+            self._nbytes = 0
+
+        self._nbytes += int(nbytes)
+
     def start(self, name: str):
         """Start profiling the section called 'name'. This
            returns the updated profiler, e.g.
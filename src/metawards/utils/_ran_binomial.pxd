@@ -11,6 +11,12 @@ cdef extern from "../ran_binomial/distributions.h":
     unsigned int ran_binomial(binomial_rng * rng, double p, unsigned int n) nogil
     double binomial_rng_uniform(binomial_rng * rng) nogil
 
+    void ran_binomial_batch(binomial_rng * rng, double p, const int * n,
+                            int * result, int count) nogil
+
+    void binomial_rng_set_engine(binomial_rng * rng, int engine) nogil
+    int binomial_rng_get_engine(binomial_rng * rng) nogil
+
 
 cdef inline uintptr_t _construct_binomial_rng() nogil:
     """Construct and return a pointer to a new gsl random number
@@ -56,6 +62,15 @@ cdef inline int _ran_binomial(binomial_rng *rng, double p, int n) nogil:
     """
     return ran_binomial(rng, p, n)
 
+cdef inline void _ran_binomial_batch(binomial_rng *rng, double p,
+                                     int *n, int *result, int count) nogil:
+    """Fill 'result' with 'count' random numbers drawn from the
+       binomial distributions described by p and n[i]. This is
+       fastest when using the "fast" engine, as this reuses the
+       setup for p for every draw
+    """
+    ran_binomial_batch(rng, p, n, result, count)
+
 cdef inline double _ran_uniform(binomial_rng *rng) nogil:
     """Generate the next random-distributed uniform [0,1] random number"""
     return binomial_rng_uniform(rng)
@@ -2,11 +2,17 @@
 
 from ._ran_binomial cimport _construct_binomial_rng, _ran_binomial, \
                             _seed_ran_binomial, _delete_binomial_rng, \
-                            _get_binomial_ptr, _ran_uniform
+                            _get_binomial_ptr, _ran_uniform, \
+                            _ran_binomial_batch, \
+                            binomial_rng_set_engine, binomial_rng_get_engine
 
+from ._get_array_ptr cimport get_int_array_ptr
 
-__all__ = ["ran_binomial", "ran_uniform", "ran_int", "ran_bool",
-           "seed_ran_binomial", "delete_ran_binomial"]
+
+__all__ = ["ran_binomial", "ran_binomial_batch", "ran_uniform", "ran_int",
+           "ran_bool", "seed_ran_binomial", "delete_ran_binomial",
+           "get_binomial_engine", "set_binomial_engine",
+           "validate_binomial_engine"]
 
 
 # The plan with this file is to move to an inline cdef that just
@@ -16,10 +22,83 @@ __all__ = ["ran_binomial", "ran_uniform", "ran_int", "ran_bool",
 # of this function in the code will remain though...
 
 
+_binomial_engines = {"default": 0, "fast": 1}
+
+_binomial_engine = "default"
+
+
+def get_binomial_engine(rng=None) -> str:
+    """Return the engine used to draw binomial random numbers by
+       the passed generator, or, if this is None, the engine
+       that will be used by newly seeded generators
+       (see set_binomial_engine)
+    """
+    if rng is None:
+        return _binomial_engine
+
+    cdef binomial_rng *r = _get_binomial_ptr(rng)
+    cdef int engine = binomial_rng_get_engine(r)
+
+    for key, value in _binomial_engines.items():
+        if value == engine:
+            return key
+
+    raise ValueError(f"Unrecognised binomial engine {engine}")
+
+
+def set_binomial_engine(engine: str = "default", validate: bool = False):
+    """Set the engine used to draw binomial random numbers by all
+       generators seeded after this call (so, for example, by all
+       subsequent runs of the model).
+
+       Parameters
+       ----------
+       engine: str
+         "default" - reproduces numpy.random.binomial, and so the
+                     results of earlier versions. This is the default.
+         "fast" - uses the same algorithms, but caches the setup per
+                  p rather than per (n, p), and uses a table of powers
+                  of (1-p) for small n. This is faster when drawing
+                  many numbers with the same p but different n (e.g.
+                  disease progression), but gives different (although
+                  statistically equivalent) random numbers.
+       validate: bool
+         Whether or not to check the distribution of numbers drawn
+         by the engine against the default engine (see
+         validate_binomial_engine). A ValueError is raised if
+         the check fails.
+    """
+    global _binomial_engine
+
+    if engine is None:
+        engine = "default"
+
+    engine = str(engine).strip().lower()
+
+    if engine not in _binomial_engines:
+        raise ValueError(
+            f"Unrecognised binomial engine '{engine}'. This should "
+            f"be one of 'default' or 'fast'")
+
+    if validate:
+        failed = [r for r in validate_binomial_engine(engine)
+                  if not r["passed"]]
+
+        if len(failed) > 0:
+            cases = ", ".join([f"(n={r['n']}, p={r['p']})" for r in failed])
+            raise ValueError(
+                f"The binomial engine '{engine}' failed validation "
+                f"against the default engine for {cases}")
+
+    _binomial_engine = engine
+
+
 def seed_ran_binomial(seed: int = None):
     """Seed and return the random binomial generator. This returns
        the object that you should pass to ran_binomial to generate
-       random numbers drawn from a binomial distribution
+       random numbers drawn from a binomial distribution. The
+       generator uses the current binomial engine
+       (see set_binomial_engine)
     """
     if seed is None:
         import random
@@ -31,6 +110,7 @@ def seed_ran_binomial(seed: int = None):
     _seed_ran_binomial(rng, seed)
 
     cdef binomial_rng* r = _get_binomial_ptr(rng)
+    binomial_rng_set_engine(r, _binomial_engines[_binomial_engine])
 
     return rng
 
@@ -61,6 +141,135 @@ def ran_binomial(rng, p: float, n: int):
     return _ran_binomial(r, p, n)
 
 
+def ran_binomial_batch(rng, p: float, n):
+    """Return an int array of random numbers drawn from the binomial
+       distributions [p,n[i]] for each value in 'n'
+    """
+    from ._array import create_int_array
+
+    if rng is None:
+        rng = get_global_rng()
+
+    cdef int count = len(n)
+
+    if not (hasattr(n, "typecode") and n.typecode == "i"):
+        from array import array
+        n = array("i", n)
+
+    result = create_int_array(count, 0)
+
+    if count == 0:
+        return result
+
+    cdef binomial_rng *r = _get_binomial_ptr(rng)
+    cdef int * n_ptr = get_int_array_ptr(n)
+    cdef int * result_ptr = get_int_array_ptr(result)
+    cdef double pp = p
+
+    with nogil:
+        _ran_binomial_batch(r, pp, n_ptr, result_ptr, count)
+
+    return result
+
+
+def _histogram(rng, double p, int n, int nsamples):
+    """Return the counts of each value drawn from 'nsamples'
+       draws of the binomial distribution [p,n]
+    """
+    from ._array import create_int_array
+
+    counts = create_int_array(n + 1, 0)
+
+    cdef binomial_rng *r = _get_binomial_ptr(rng)
+    cdef int * c = get_int_array_ptr(counts)
+    cdef int i = 0
+
+    with nogil:
+        for i in range(0, nsamples):
+            c[_ran_binomial(r, p, n)] += 1
+
+    return counts
+
+
+_validation_cases = [(1, 0.3), (3, 0.01), (5, 0.5), (10, 0.2), (16, 0.7),
+                     (17, 0.05), (50, 0.3), (100, 0.9), (200, 0.999),
+                     (1000, 0.1)]
+
+
+def validate_binomial_engine(engine: str = "fast", nsamples: int = 20000,
+                             seed: int = 1234567, cases=None):
+    """Validate the binomial engine 'engine' against the default
+       engine. For each (n, p) in 'cases' (which cover the small-n,
+       inversion and BTPE paths, and p either side of 0.5) this
+       draws 'nsamples' numbers from both engines and compares
+       their distributions using a two-sample chi-squared test.
+
+       Returns a list of dictionaries, one per case, giving
+       "n", "p", "chi2", "dof", "z" (the Wilson-Hilferty normal
+       score of chi2) and "passed" (z < 4)
+    """
+    global _binomial_engine
+
+    if cases is None:
+        cases = _validation_cases
+
+    old_engine = _binomial_engine
+
+    try:
+        _binomial_engine = "default"
+        reference = seed_ran_binomial(seed)
+        set_binomial_engine(engine)
+        test = seed_ran_binomial(seed + 1)
+    finally:
+        _binomial_engine = old_engine
+
+    results = []
+
+    try:
+        for (n, p) in cases:
+            a = _histogram(reference, p, n, nsamples)
+            b = _histogram(test, p, n, nsamples)
+
+            # pool neighbouring values so that each bin has enough counts
+            bins = []
+            pool_a = 0
+            pool_b = 0
+
+            for x in range(0, n + 1):
+                pool_a += a[x]
+                pool_b += b[x]
+
+                if pool_a + pool_b >= 20:
+                    bins.append((pool_a, pool_b))
+                    pool_a = 0
+                    pool_b = 0
+
+            if pool_a + pool_b > 0:
+                if len(bins) > 0:
+                    (last_a, last_b) = bins.pop()
+                    bins.append((last_a + pool_a, last_b + pool_b))
+                else:
+                    bins.append((pool_a, pool_b))
+
+            chi2 = sum([(x - y)**2 / (x + y) for (x, y) in bins])
+            dof = len(bins) - 1
+
+            if dof > 0:
+                k = float(dof)
+                z = ((chi2 / k)**(1.0/3.0) - (1.0 - 2.0/(9.0*k))) / \
+                    (2.0/(9.0*k))**0.5
+            else:
+                z = 0.0
+
+            results.append({"n": n, "p": p, "chi2": chi2, "dof": dof,
+                            "z": z, "passed": z < 4.0})
+    finally:
+        delete_ran_binomial(reference)
+        delete_ran_binomial(test)
+
+    return results
+
+
 def ran_uniform(rng):
     """Return a random double drawn from a uniform distribution between
        zero and one
@@ -0,0 +1,411 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+cimport openmp
+
+from libc.stdlib cimport strtod, calloc, free
+from libc.string cimport memchr
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+from ._profiler import Profiler, NullProfiler
+
+__all__ = ["read_matrix_file", "open_matrix_file"]
+
+
+#: Size of the chunks (in bytes) read from the file at a time
+_chunk_size = 64 * 1024 * 1024
+
+
+cdef inline bint _is_sep(char c) nogil:
+    """Return whether 'c' separates the columns of a matrix file.
+       Both space and comma-separated files are supported
+    """
+    return c == c' ' or c == c',' or c == c'\t' or c == c'\r'
+
+
+cdef Py_ssize_t _count_lines(const char *data, Py_ssize_t start,
+                             Py_ssize_t end) nogil:
+    """Return the number of (possibly empty) lines in data[start:end]"""
+    cdef Py_ssize_t nlines = 0
+    cdef const char *p = data + start
+    cdef const char *e = data + end
+
+    while p < e:
+        p = <const char*>memchr(p, c'\n', e - p)
+
+        if p == NULL:
+            # last line has no newline
+            return nlines + 1
+
+        nlines += 1
+        p += 1
+
+    return nlines
+
+
+cdef int _parse_range(const char *data, Py_ssize_t start, Py_ssize_t end,
+                      int ncols, int *col0, int *col1, double *col2,
+                      Py_ssize_t *nrecords) nogil:
+    """Parse all of the lines in data[start:end] into the passed
+       column arrays. 'data' must be NUL-terminated. The number
+       of records parsed is returned in 'nrecords'. This returns
+       -1 if all lines were parsed, else the (0-indexed) line number
+       within this range of the first invalid line
+    """
+    cdef Py_ssize_t pos = start
+    cdef Py_ssize_t line_end = 0
+    cdef Py_ssize_t p = 0
+    cdef Py_ssize_t n = 0
+    cdef int line = 0
+    cdef int icol = 0
+    cdef int sign = 1
+    cdef int value = 0
+    cdef int ivals[2]
+    cdef double dval = 0.0
+    cdef bint ok = True
+    cdef char *endptr
+    cdef const char *nl
+
+    while pos < end:
+        nl = <const char*>memchr(data + pos, c'\n', end - pos)
+
+        if nl == NULL:
+            line_end = end
+        else:
+            line_end = nl - data
+
+        icol = 0
+        ok = True
+        p = pos
+
+        while True:
+            while p < line_end and _is_sep(data[p]):
+                p += 1
+
+            if p >= line_end:
+                break
+
+            if icol >= ncols:
+                ok = False
+                break
+
+            if icol < 2:
+                sign = 1
+
+                if data[p] == c'-':
+                    sign = -1
+                    p += 1
+                elif data[p] == c'+':
+                    p += 1
+
+                if p >= line_end or data[p] < c'0' or data[p] > c'9':
+                    ok = False
+                    break
+
+                value = 0
+
+                while p < line_end and data[p] >= c'0' and data[p] <= c'9':
+                    value = 10 * value + (data[p] - c'0')
+                    p += 1
+
+                ivals[icol] = sign * value
+            else:
+                dval = strtod(data + p, &endptr)
+
+                if endptr == data + p or endptr > data + line_end:
+                    ok = False
+                    break
+
+                p = endptr - data
+
+            if p < line_end and not _is_sep(data[p]):
+                ok = False
+                break
+
+            icol += 1
+
+        if not ok or (icol != 0 and icol != ncols):
+            nrecords[0] = n
+            return line
+
+        if icol == ncols:
+            col0[n] = ivals[0]
+            col1[n] = ivals[1]
+
+            if ncols > 2:
+                col2[n] = dval
+
+            n += 1
+
+        line += 1
+        pos = line_end + 1
+
+    nrecords[0] = n
+    return -1
+
+
+def _parse_block(data: bytes, int ncols, int nthreads, line_offset: int,
+                 filename: str):
+    """Parse the complete lines in 'data' in parallel, returning
+       the tuple of column arrays and the number of lines parsed
+    """
+    from ._array import create_int_array, create_double_array
+
+    cdef const char *buffer = data
+    cdef Py_ssize_t size = len(data)
+    cdef int num_threads = nthreads
+    cdef int t = 0
+
+    if size == 0:
+        return (None, 0)
+
+    if size < 65536 * num_threads:
+        # not worth parallelising small blocks
+        num_threads = 1
+
+    # divide the block into ranges that start at the beginning of lines
+    cdef Py_ssize_t *starts = <Py_ssize_t*>calloc(num_threads + 1,
+                                                  sizeof(Py_ssize_t))
+    cdef Py_ssize_t *nlines = <Py_ssize_t*>calloc(num_threads,
+                                                  sizeof(Py_ssize_t))
+    cdef Py_ssize_t *offsets = <Py_ssize_t*>calloc(num_threads + 1,
+                                                   sizeof(Py_ssize_t))
+    cdef Py_ssize_t *nrecords = <Py_ssize_t*>calloc(num_threads,
+                                                    sizeof(Py_ssize_t))
+    cdef int *errors = <int*>calloc(num_threads, sizeof(int))
+
+    cdef Py_ssize_t s = 0
+    cdef const char *nl
+
+    starts[0] = 0
+    starts[num_threads] = size
+
+    for t in range(1, num_threads):
+        s = (size * t) // num_threads
+
+        if s < starts[t-1]:
+            s = starts[t-1]
+
+        nl = <const char*>memchr(buffer + s, c'\n', size - s)
+
+        if nl == NULL:
+            starts[t] = size
+        else:
+            starts[t] = (nl - buffer) + 1
+
+    with nogil, parallel(num_threads=num_threads):
+        for t in prange(0, num_threads, schedule="static", chunksize=1):
+            nlines[t] = _count_lines(buffer, starts[t], starts[t+1])
+
+    offsets[0] = 0
+
+    for t in range(0, num_threads):
+        offsets[t+1] = offsets[t] + nlines[t]
+
+    cdef Py_ssize_t total_lines = offsets[num_threads]
+
+    col0 = create_int_array(total_lines)
+    col1 = create_int_array(total_lines)
+
+    if ncols > 2:
+        col2 = create_double_array(total_lines)
+    else:
+        col2 = None
+
+    cdef int *col0_ptr = get_int_array_ptr(col0)
+    cdef int *col1_ptr = get_int_array_ptr(col1)
+    cdef double *col2_ptr = get_double_array_ptr(col2)
+
+    with nogil, parallel(num_threads=num_threads):
+        for t in prange(0, num_threads, schedule="static", chunksize=1):
+            if ncols > 2:
+                errors[t] = _parse_range(buffer, starts[t], starts[t+1],
+                                         ncols, col0_ptr + offsets[t],
+                                         col1_ptr + offsets[t],
+                                         col2_ptr + offsets[t],
+                                         &(nrecords[t]))
+            else:
+                errors[t] = _parse_range(buffer, starts[t], starts[t+1],
+                                         ncols, col0_ptr + offsets[t],
+                                         col1_ptr + offsets[t],
+                                         <double*>0, &(nrecords[t]))
+
+    cdef Py_ssize_t error_line = -1
+
+    for t in range(0, num_threads):
+        if errors[t] != -1:
+            error_line = line_offset + offsets[t] + errors[t] + 1
+            s = starts[t]
+            break
+
+    # compact the records to remove gaps left by empty lines
+    cdef Py_ssize_t n = 0
+    cdef Py_ssize_t i = 0
+
+    if error_line == -1:
+        for t in range(0, num_threads):
+            if n != offsets[t]:
+                for i in range(0, nrecords[t]):
+                    col0_ptr[n + i] = col0_ptr[offsets[t] + i]
+                    col1_ptr[n + i] = col1_ptr[offsets[t] + i]
+
+                    if ncols > 2:
+                        col2_ptr[n + i] = col2_ptr[offsets[t] + i]
+
+            n += nrecords[t]
+
+    free(starts)
+    free(nlines)
+    free(offsets)
+    free(nrecords)
+    free(errors)
+
+    if error_line != -1:
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        bad = lines[error_line - line_offset - 1]
+
+        from ._console import Console
+        Console.error(f"Read invalid line from {filename} line "
+                      f"{error_line}\n{bad}")
+        raise IOError(f"Invalid line read from {filename}")
+
+    if ncols > 2:
+        return ((col0[0:n], col1[0:n], col2[0:n]), total_lines)
+    else:
+        return ((col0[0:n], col1[0:n]), total_lines)
+
+
+def open_matrix_file(filename: str):
+    """Open the passed file for binary reading. This transparently
+       decompresses files that are bzip2 or gzip-compressed
+    """
+    with open(filename, "rb") as FILE:
+        magic = FILE.read(3)
+
+    if magic == b"BZh":
+        import bz2
+        return bz2.open(filename, "rb")
+    elif magic[0:2] == b"\x1f\x8b":
+        import gzip
+        return gzip.open(filename, "rb")
+    else:
+        return open(filename, "rb")
+
+
+def read_matrix_file(filename: str, ncols: int = 3, nthreads: int = 1,
+                     profiler: Profiler = None):
+    """Read the matrix file 'filename', returning its columns as arrays.
+       The file should be space or comma-separated, with each line
+       containing 'ncols' columns. The first two columns are integer
+       ward IDs, and the third column (if ncols is 3) is a floating
+       point weight, e.g.
+
+        * 1 2 10.5
+        * 1 3 2.0
+        * ...
+
+       The file is read in chunks and each chunk is tokenised
+       without the GIL in parallel over 'nthreads' threads, with
+       each thread parsing a separate byte range. Files that are
+       compressed using bzip2 or gzip are decompressed transparently.
+
+       Parameters
+       ----------
+       filename: str
+         The name of the file to read
+       ncols: int
+         The number of columns in the file (2 or 3)
+       nthreads: int
+         The number of threads to use to parse the file
+       profiler: Profiler
+         The profiler used to profile the read. The number of bytes
+         read is recorded so that the throughput is reported
+
+       Returns
+       -------
+       columns: tuple
+         Tuple of arrays, one for each column. The first two columns
+         are int arrays, while the third is a double array
+    """
+    if ncols not in [2, 3]:
+        raise ValueError(f"Can only read files with 2 or 3 columns, "
+                         f"not {ncols}")
+
+    if profiler is None:
+        profiler = NullProfiler()
+
+    if nthreads is None or nthreads < 1:
+        nthreads = 1
+
+    import os
+    p = profiler.start(f"read_matrix_file[{os.path.basename(filename)}]")
+
+    from ._console import Console
+    Console.print(f"Reading {filename} into memory...")
+
+    blocks = []
+    nbytes = 0
+    line_offset = 0
+    remainder = b""
+
+    with open_matrix_file(filename) as FILE:
+        while True:
+            chunk = FILE.read(_chunk_size)
+
+            if chunk:
+                nbytes += len(chunk)
+                cut = chunk.rfind(b"\n")
+
+                if cut == -1:
+                    remainder += chunk
+                    continue
+
+                data = remainder + chunk[0:cut+1]
+                remainder = chunk[cut+1:]
+            else:
+                data = remainder
+                remainder = b""
+
+            (block, nlines) = _parse_block(data, ncols=ncols,
+                                           nthreads=nthreads,
+                                           line_offset=line_offset,
+                                           filename=filename)
+
+            if block is not None:
+                blocks.append(block)
+                line_offset += nlines
+
+            if not chunk:
+                break
+
+    if len(blocks) == 0:
+        from ._array import create_int_array, create_double_array
+        columns = [create_int_array(0), create_int_array(0)]
+
+        if ncols > 2:
+            columns.append(create_double_array(0))
+
+        columns = tuple(columns)
+    elif len(blocks) == 1:
+        columns = blocks[0]
+    else:
+        columns = []
+
+        for i in range(0, ncols):
+            column = blocks[0][i]
+
+            for block in blocks[1:]:
+                column.extend(block[i])
+
+            columns.append(column)
+
+        columns = tuple(columns)
+
+    p.record_bytes(nbytes)
+    p = p.stop()
+
+    return columns
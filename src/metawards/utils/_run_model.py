@@ -8,6 +8,7 @@ from .._outputfiles import OutputFiles
 from .._workspace import Workspace
 from .._population import Population, Populations
 from ._profiler import Profiler
+from ._active_infections import keeps_active_infections
 from ._get_functions import get_initialise_functions, \
     get_model_loop_functions, \
     get_finalise_functions, \
@@ -153,6 +154,10 @@ def run_model(network: _Union[Network, Networks],
              infections=infections, output_dir=output_dir,
              workspace=workspace, rngs=rngs, nthreads=nthreads,
              profiler=p)
+
+        if not keeps_active_infections(func):
+            infections.invalidate_active()
+
         p = p.stop()
 
     p = p.stop()
@@ -210,6 +215,11 @@ def run_model(network: _Union[Network, Networks],
                               f"at the end of this iteration")
                 should_finish_early = True
 
+            if not keeps_active_infections(func):
+                # this custom function may have changed the infections
+                # without updating the active sets, so rebuild them
+                infections.invalidate_active()
+
             p2 = p2.stop()
 
         if population.population != start_population:
@@ -270,6 +280,10 @@ def run_model(network: _Union[Network, Networks],
              infections=infections, output_dir=output_dir,
              workspace=workspace, rngs=rngs, nthreads=nthreads,
              trajectory=trajectory, profiler=p)
+
+        if not keeps_active_infections(func):
+            infections.invalidate_active()
+
         p = p.stop()
 
     p = p.stop()
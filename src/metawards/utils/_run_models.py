@@ -220,8 +220,9 @@ def run_models(network: _Union[Network, Networks],
 
     if nprocs == 1:
         # no need to use a pool, as we will repeat this calculation
-        # several times
-        save_network = network.copy()
+        # several times - snapshot the network so that it can be
+        # restored between runs
+        snapshot = network.snapshot()
 
         Console.rule("Running models in serial")
 
@@ -290,7 +291,7 @@ def run_models(network: _Union[Network, Networks],
             if i != len(variables) - 1:
                 # still another run to perform, restore the network
                 # to the original state
-                network = save_network.copy()
+                network.restore(snapshot, check_dirty=True)
         # end of loop over variable sets
     else:
         from ._worker import run_worker
@@ -342,10 +343,16 @@ def run_models(network: _Union[Network, Networks],
             # run jobs using a multiprocessing pool
             Console.rule("Running models in parallel using multiprocessing")
             from multiprocessing import Pool
+            from ._shared_network import share_network
+            from ._worker import initialise_worker
 
             results = []
 
-            with Pool(processes=nprocs) as pool:
+            # build the network once here and publish its topology
+            # via shared memory, rather than rebuilding in every worker
+            with share_network(network) as shared, \
+                    Pool(processes=nprocs, initializer=initialise_worker,
+                         initargs=(shared,)) as pool:
                 for argument in arguments:
                     results.append(pool.apply_async(run_worker, (argument,)))
 
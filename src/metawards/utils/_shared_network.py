@@ -0,0 +1,285 @@
+
+from typing import Dict as _Dict
+from typing import Union as _Union
+
+from .._network import Network
+from .._networks import Networks
+
+__all__ = ["SharedNetwork", "share_network", "attach_shared_network"]
+
+#: The arrays of Nodes and Links that describe the (immutable)
+#: topology of the network. These are the arrays that Nodes.copy()
+#: and Links.copy() shallow-copy, and are attached zero-copy by
+#: the workers. All other arrays are copied into private memory
+_shared_node_arrays = ["label", "begin_to", "end_to", "self_w",
+                       "begin_p", "end_p", "self_p", "x", "y"]
+
+_shared_link_arrays = ["ifrom", "ito", "distance"]
+
+#: The shared memory segments that have been attached by this
+#: process. These must stay open for as long as any network
+#: holds views of their memory
+_attached = {}
+
+
+def _is_shared(name: str) -> bool:
+    """Return whether the array called 'name' (as returned by
+       _get_arrays) is part of the shared topology
+    """
+    (group, key) = name.split(".", 1)
+
+    if group == "nodes":
+        return key in _shared_node_arrays
+    elif group in ["links", "play"]:
+        return key in _shared_link_arrays
+    else:
+        return False
+
+
+def _describe_network(network: Network) -> _Dict[str, any]:
+    """Return the (picklable) non-array data of 'network'"""
+    return {"name": network.name,
+            "nnodes": network.nnodes,
+            "nlinks": network.nlinks,
+            "nplay": network.nplay,
+            "max_nodes": network.max_nodes,
+            "max_links": network.max_links,
+            "info": network.info,
+            "to_seed": network.to_seed,
+            "params": network.params,
+            "work_population": network.work_population,
+            "play_population": network.play_population}
+
+
+class SharedNetwork:
+    """This class publishes the arrays of a Network (or Networks)
+       via multiprocessing.shared_memory, so that worker processes
+       can attach to the network topology without having to
+       rebuild the network from the input files. Use this
+       as a context manager, e.g.
+
+       with SharedNetwork(network) as shared:
+           # pass 'shared' to attach_shared_network in the workers
+
+       For Networks, topology arrays that are shared between the
+       overall network and the demographic sub-networks (see
+       Networks.share_topology) are published only once, and are
+       attached as the same views in every sub-network.
+
+       The shared memory is released when the context exits.
+    """
+
+    def __init__(self, network: _Union[Network, Networks]):
+        from multiprocessing import shared_memory
+        from ._network_cache import _get_arrays, _pad
+
+        if isinstance(network, Networks):
+            networks = [network.overall] + list(network.subnets)
+            demographics = network.demographics
+        else:
+            networks = [network]
+            demographics = None
+
+        tocs = []
+        arrays = []
+        published = {}
+        offset = 0
+
+        for n in networks:
+            toc = []
+
+            for name, array in _get_arrays(n).items():
+                shared = _is_shared(name)
+                entry = published.get(id(array), None) if shared else None
+
+                if entry is not None:
+                    # this topology array has already been published
+                    toc.append(dict(entry, name=name))
+                    continue
+
+                nbytes = len(array) * array.itemsize
+                entry = {"name": name, "typecode": array.typecode,
+                         "length": len(array), "offset": offset,
+                         "shared": shared}
+                toc.append(entry)
+                arrays.append((entry, array))
+
+                if shared:
+                    published[id(array)] = entry
+
+                offset += nbytes + _pad(nbytes)
+
+            tocs.append(toc)
+
+        self._shm = shared_memory.SharedMemory(create=True,
+                                               size=max(1, offset))
+
+        buf = self._shm.buf
+
+        for entry, array in arrays:
+            start = entry["offset"]
+
+            with memoryview(array) as view, view.cast("B") as data:
+                buf[start:start+len(data)] = data
+
+        del buf
+
+        self._descriptor = {"name": self._shm.name,
+                            "networks": [
+                                {"arrays": toc,
+                                 "network": _describe_network(n),
+                                 "coordinates": n.nodes.coordinates}
+                                for n, toc in zip(networks, tocs)],
+                            "demographics": demographics}
+
+    def __enter__(self):
+        return self.descriptor()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def nbytes(self) -> int:
+        """Return the size of the shared memory in bytes"""
+        if self._shm is None:
+            return 0
+        else:
+            return self._shm.size
+
+    def descriptor(self) -> _Dict[str, any]:
+        """Return the (picklable) descriptor that is passed to
+           attach_shared_network to attach to this network
+        """
+        return self._descriptor
+
+    def close(self) -> None:
+        """Close and release the shared memory. This must only
+           be called once all workers have finished with the network
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class _NullSharedNetwork:
+    """Returned by share_network when the network cannot be shared"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+def share_network(network: _Union[Network, Networks]):
+    """Return a context manager that publishes the passed network
+       via shared memory (a SharedNetwork). If the network cannot
+       be shared (e.g. it is not a Network or Networks, or shared
+       memory is not supported on this python) then the context
+       manager yields None, and each worker builds its own network
+       as before
+    """
+    if not isinstance(network, (Network, Networks)):
+        return _NullSharedNetwork()
+
+    try:
+        return SharedNetwork(network)
+    except ImportError:
+        # multiprocessing.shared_memory needs python 3.8+
+        return _NullSharedNetwork()
+    except Exception as e:
+        from ._console import Console
+        Console.warning(f"Unable to share the network between processes. "
+                        f"Each process will build its own copy. "
+                        f"{e.__class__} {e}")
+        return _NullSharedNetwork()
+
+
+def _attach_network(shm, descriptor: _Dict[str, any],
+                    views: _Dict[int, any]) -> Network:
+    """Attach the network described by 'descriptor' from the
+       shared memory 'shm'. Views of shared topology arrays are
+       cached in 'views' so that they are shared between networks
+    """
+    from array import array
+
+    from .._nodes import Nodes
+    from .._links import Links
+
+    nodes = Nodes(1)
+    links = Links(1)
+    play = Links(1)
+
+    groups = {"nodes": nodes, "links": links, "play": play}
+
+    for entry in descriptor["arrays"]:
+        typecode = entry["typecode"]
+        start = entry["offset"]
+        nbytes = entry["length"] * array(typecode).itemsize
+
+        if entry["shared"]:
+            a = views.get(start, None)
+
+            if a is None:
+                a = shm.buf[start:start+nbytes].cast(typecode)
+                views[start] = a
+        else:
+            a = array(typecode)
+
+            with shm.buf[start:start+nbytes] as view:
+                a.frombytes(view)
+
+        (group, key) = entry["name"].split(".", 1)
+
+        if group == "custom":
+            nodes._custom_params[key] = a
+        else:
+            setattr(groups[group], key, a)
+
+    nodes.coordinates = descriptor["coordinates"]
+
+    network = Network(**descriptor["network"])
+    network.nodes = nodes
+    network.links = links
+    network.play = play
+
+    return network
+
+
+def attach_shared_network(descriptor: _Dict[str, any]) \
+        -> _Union[Network, Networks]:
+    """Attach to the network published via the passed descriptor
+       (from SharedNetwork.descriptor). The topology arrays
+       (label, begin_to, end_to, ifrom, ito, distance etc.) are
+       views of the shared memory, so are not copied. All other
+       arrays are copied into private memory of this process, so
+       can be changed freely. The topology arrays must not be
+       changed.
+
+       This returns a Networks if a Networks was published, in
+       which case the sub-networks share the views of the
+       topology of the overall network.
+    """
+    from multiprocessing import shared_memory
+
+    name = descriptor["name"]
+
+    shm = _attached.get(name, None)
+
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+
+    views = {}
+    networks = [_attach_network(shm, d, views)
+                for d in descriptor["networks"]]
+
+    if descriptor["demographics"] is None:
+        return networks[0]
+
+    result = Networks()
+    result.overall = networks[0]
+    result.subnets = networks[1:]
+    result.demographics = descriptor["demographics"]
+
+    return result
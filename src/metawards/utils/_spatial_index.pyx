@@ -0,0 +1,603 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+from cython.parallel import parallel, prange
+
+from libc.math cimport sqrt, sin, cos, asin
+from libc.stdlib cimport qsort, malloc, free
+
+from .._network import Network
+
+from ._get_array_ptr cimport get_int_array_ptr, get_double_array_ptr
+
+__all__ = ["SpatialIndex"]
+
+# maximum depth of the traversal stack - the tree is balanced, so this
+# is enough for far more wards than could ever fit into memory
+DEF MAX_STACK = 128
+
+# Earth's radius in km (the same as used to calculate link distances)
+DEF EARTH_RADIUS = 6378.16
+
+DEF M_PI = 3.14159265358979323846
+
+
+cdef int _compare_ints(const void *a, const void *b) nogil:
+    cdef int ia = (<int*>a)[0]
+    cdef int ib = (<int*>b)[0]
+
+    if ia < ib:
+        return -1
+    elif ia > ib:
+        return 1
+    else:
+        return 0
+
+
+cdef inline void _swap(double *points, int *ids, int dims,
+                       int i, int j) nogil:
+    cdef int d = 0
+    cdef double tmp = 0.0
+    cdef int itmp = ids[i]
+
+    ids[i] = ids[j]
+    ids[j] = itmp
+
+    for d in range(0, dims):
+        tmp = points[i*dims + d]
+        points[i*dims + d] = points[j*dims + d]
+        points[j*dims + d] = tmp
+
+
+cdef void _select(double *points, int *ids, int dims, int axis,
+                  int lo, int hi, int k) nogil:
+    """Partially sort points[lo:hi] along 'axis' so that the kth
+       point is in its sorted position, with all smaller points
+       before it and all larger points after it (quickselect)
+    """
+    cdef int i = 0
+    cdef int store = 0
+    cdef double pivot = 0.0
+
+    hi -= 1   # now inclusive
+
+    while hi > lo:
+        # median of three to avoid worst-case on sorted input
+        i = (lo + hi) // 2
+        if points[i*dims+axis] < points[lo*dims+axis]:
+            _swap(points, ids, dims, i, lo)
+        if points[hi*dims+axis] < points[lo*dims+axis]:
+            _swap(points, ids, dims, hi, lo)
+        if points[hi*dims+axis] < points[i*dims+axis]:
+            _swap(points, ids, dims, hi, i)
+
+        _swap(points, ids, dims, i, hi)
+        pivot = points[hi*dims+axis]
+
+        store = lo
+
+        for i in range(lo, hi):
+            if points[i*dims+axis] < pivot:
+                _swap(points, ids, dims, i, store)
+                store += 1
+
+        _swap(points, ids, dims, store, hi)
+
+        if store == k:
+            return
+        elif k < store:
+            hi = store - 1
+        else:
+            lo = store + 1
+
+
+cdef void _build(double *points, int *ids, int dims,
+                 int lo, int hi, int depth) nogil:
+    """Recursively build the implicit kd-tree over points[lo:hi]"""
+    if hi - lo <= 1:
+        return
+
+    cdef int mid = (lo + hi) // 2
+    _select(points, ids, dims, depth % dims, lo, hi, mid)
+    _build(points, ids, dims, lo, mid, depth+1)
+    _build(points, ids, dims, mid+1, hi, depth+1)
+
+
+cdef inline double _dist2(const double *points, int i, const double *q,
+                          int dims) nogil:
+    cdef double d2 = 0.0
+    cdef double diff = 0.0
+    cdef int d = 0
+
+    for d in range(0, dims):
+        diff = points[i*dims+d] - q[d]
+        d2 += diff * diff
+
+    return d2
+
+
+cdef int _query_radius(const double *points, const int *ids, int n,
+                       int dims, const double *q, double r2,
+                       int *result) nogil:
+    """Find all points within sqrt(r2) of 'q'. The ids of the points
+       are written to 'result' if this is not NULL. Returns the number
+       of points found
+    """
+    cdef int stack_lo[MAX_STACK]
+    cdef int stack_hi[MAX_STACK]
+    cdef int stack_depth[MAX_STACK]
+    cdef int top = 0
+    cdef int lo = 0
+    cdef int hi = 0
+    cdef int depth = 0
+    cdef int mid = 0
+    cdef int axis = 0
+    cdef int count = 0
+    cdef double diff = 0.0
+
+    if n == 0:
+        return 0
+
+    stack_lo[0] = 0
+    stack_hi[0] = n
+    stack_depth[0] = 0
+    top = 1
+
+    while top > 0:
+        top -= 1
+        lo = stack_lo[top]
+        hi = stack_hi[top]
+        depth = stack_depth[top]
+
+        if hi <= lo:
+            continue
+
+        mid = (lo + hi) // 2
+        axis = depth % dims
+
+        if _dist2(points, mid, q, dims) <= r2:
+            if result != NULL:
+                result[count] = ids[mid]
+            count += 1
+
+        diff = q[axis] - points[mid*dims+axis]
+
+        if diff <= 0 or diff * diff <= r2:
+            stack_lo[top] = lo
+            stack_hi[top] = mid
+            stack_depth[top] = depth + 1
+            top += 1
+
+        if diff >= 0 or diff * diff <= r2:
+            stack_lo[top] = mid + 1
+            stack_hi[top] = hi
+            stack_depth[top] = depth + 1
+            top += 1
+
+    return count
+
+
+cdef int _query_nearest(const double *points, const int *ids, int n,
+                        int dims, const double *q, int k,
+                        int *best_ids, double *best_d2) nogil:
+    """Find the 'k' points nearest to 'q', writing their ids and
+       squared distances (sorted nearest first) to best_ids and
+       best_d2. Returns the number of points found (<= k)
+    """
+    cdef int stack_lo[MAX_STACK]
+    cdef int stack_hi[MAX_STACK]
+    cdef int stack_depth[MAX_STACK]
+    cdef double stack_plane[MAX_STACK]
+    cdef int top = 0
+    cdef int lo = 0
+    cdef int hi = 0
+    cdef int depth = 0
+    cdef int mid = 0
+    cdef int axis = 0
+    cdef int count = 0
+    cdef int i = 0
+    cdef double d2 = 0.0
+    cdef double diff = 0.0
+
+    if n == 0 or k <= 0:
+        return 0
+
+    stack_lo[0] = 0
+    stack_hi[0] = n
+    stack_depth[0] = 0
+    stack_plane[0] = 0.0
+    top = 1
+
+    while top > 0:
+        top -= 1
+        lo = stack_lo[top]
+        hi = stack_hi[top]
+        depth = stack_depth[top]
+
+        if hi <= lo:
+            continue
+
+        if count == k and stack_plane[top] > best_d2[k-1]:
+            # this whole subtree is further than the current worst
+            continue
+
+        mid = (lo + hi) // 2
+        axis = depth % dims
+
+        d2 = _dist2(points, mid, q, dims)
+
+        if count < k or d2 < best_d2[k-1]:
+            # insertion sort into the list of best points
+            if count < k:
+                count += 1
+
+            i = count - 1
+
+            while i > 0 and best_d2[i-1] > d2:
+                best_d2[i] = best_d2[i-1]
+                best_ids[i] = best_ids[i-1]
+                i -= 1
+
+            best_d2[i] = d2
+            best_ids[i] = ids[mid]
+
+        diff = q[axis] - points[mid*dims+axis]
+
+        # push the far side first, so that the near side is searched
+        # first (and will hopefully prune the far side)
+        if diff <= 0:
+            stack_lo[top] = mid + 1
+            stack_hi[top] = hi
+        else:
+            stack_lo[top] = lo
+            stack_hi[top] = mid
+
+        stack_depth[top] = depth + 1
+        stack_plane[top] = diff * diff
+        top += 1
+
+        if diff <= 0:
+            stack_lo[top] = lo
+            stack_hi[top] = mid
+        else:
+            stack_lo[top] = mid + 1
+            stack_hi[top] = hi
+
+        stack_depth[top] = depth + 1
+        stack_plane[top] = 0.0
+        top += 1
+
+    return count
+
+
+cdef inline void _to_point(double x, double y, bint lat_long,
+                           double *point) nogil:
+    """Convert the passed coordinates into a point in the tree. x/y
+       coordinates are used directly, while lat/long coordinates
+       (x is longitude, y is latitude, in degrees) are converted to
+       3D cartesian coordinates on the surface of the Earth, so
+       that the straight-line (chord) distance orders points in the
+       same way as the great-circle distance
+    """
+    cdef double lon = 0.0
+    cdef double lat = 0.0
+
+    if lat_long:
+        lon = x * M_PI / 180.0
+        lat = y * M_PI / 180.0
+        point[0] = EARTH_RADIUS * cos(lat) * cos(lon)
+        point[1] = EARTH_RADIUS * cos(lat) * sin(lon)
+        point[2] = EARTH_RADIUS * sin(lat)
+    else:
+        point[0] = x
+        point[1] = y
+
+
+cdef inline double _chord_to_distance(double chord, bint lat_long) nogil:
+    """Convert a straight-line distance in the tree to a distance in km"""
+    if lat_long:
+        chord = chord / (2.0 * EARTH_RADIUS)
+
+        if chord > 1.0:
+            chord = 1.0
+
+        return 2.0 * EARTH_RADIUS * asin(chord)
+    else:
+        return chord
+
+
+cdef inline double _distance_to_chord(double distance, bint lat_long) nogil:
+    """Convert a distance in km to a straight-line distance in the tree"""
+    if lat_long:
+        if distance >= M_PI * EARTH_RADIUS:
+            # everywhere on the Earth is within this distance
+            return 2.0 * EARTH_RADIUS
+
+        return 2.0 * EARTH_RADIUS * sin(distance / (2.0 * EARTH_RADIUS))
+    else:
+        return distance
+
+
+def _as_list(values):
+    """Return the passed scalar or sequence as a list, together with
+       whether or not it was a scalar
+    """
+    try:
+        return (list(values), False)
+    except TypeError:
+        return ([values], True)
+
+
+class SpatialIndex:
+    """A kd-tree spatial index over the positions (nodes.x, nodes.y)
+       of the wards in a Network. This supports fast radius and
+       k-nearest-neighbour queries, e.g. to find all wards within
+       a distance of a point (for a local lockdown zone) without
+       having to scan every ward. Queries can be vectorised over
+       many points, and are then run in parallel.
+
+       Distances are in km, in the same way as the link distances.
+       For "x/y" networks these are straight-line distances, while
+       for "lat/long" networks (x is longitude, y is latitude)
+       these are great-circle distances.
+
+       Wards without a position (at 0,0) are not included in the
+       index. Create the index using Network.get_spatial_index(),
+       which builds it once and caches it on the network.
+    """
+
+    def __init__(self, network: Network):
+        from array import array
+        from ._array import create_double_array, create_int_array
+
+        nodes = network.nodes
+
+        self._lat_long = (nodes.coordinates == "lat/long")
+
+        if self._lat_long:
+            self._dims = 3
+        else:
+            self._dims = 2
+
+        # used to check that this index is still valid for a network
+        self._x = nodes.x
+        self._y = nodes.y
+        self._nnodes = network.nnodes
+
+        cdef double * wards_x = get_double_array_ptr(nodes.x)
+        cdef double * wards_y = get_double_array_ptr(nodes.y)
+
+        cdef int i = 0
+        cdef int n = 0
+        cdef int dims = self._dims
+        cdef bint lat_long = self._lat_long
+
+        ids = []
+
+        for i in range(1, network.nnodes + 1):
+            if wards_x[i] != 0 or wards_y[i] != 0:
+                ids.append(i)
+
+        n = len(ids)
+
+        self._ids = array("i", ids)
+        self._points = create_double_array(max(1, n * dims), 0.0)
+
+        cdef int * ids_ptr = get_int_array_ptr(self._ids) if n > 0 else NULL
+        cdef double * points = get_double_array_ptr(self._points)
+
+        with nogil:
+            for i in range(0, n):
+                _to_point(wards_x[ids_ptr[i]], wards_y[ids_ptr[i]],
+                          lat_long, &(points[i*dims]))
+
+            _build(points, ids_ptr, dims, 0, n, 0)
+
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def is_valid_for(self, network: Network) -> bool:
+        """Return whether this index is valid for the passed network,
+           i.e. the network has the same ward positions. Note that
+           this assumes that ward positions are not changed in place
+        """
+        return self._x is network.nodes.x and \
+            self._y is network.nodes.y and \
+            self._nnodes == network.nnodes and \
+            self._lat_long == (network.nodes.coordinates == "lat/long")
+
+    def query_radius(self, x, y, radius: float, nthreads: int = 1):
+        """Return the indices of all wards that are within 'radius' km
+           of the point (x, y) (which is (longitude, latitude) for a
+           lat/long network). The indices are returned sorted.
+
+           'x' and 'y' can be sequences of points, in which case this
+           returns a list of the results for each point. These are
+           calculated in parallel using 'nthreads' threads.
+        """
+        (xs, scalar) = _as_list(x)
+        (ys, _) = _as_list(y)
+
+        if len(xs) != len(ys):
+            raise ValueError(f"Number of x ({len(xs)}) and y ({len(ys)}) "
+                             f"coordinates must be equal")
+
+        from ._array import create_double_array, create_int_array
+
+        cdef int nq = len(xs)
+        cdef int dims = self._dims
+        cdef int n = self._n
+        cdef bint lat_long = self._lat_long
+        cdef double chord = _distance_to_chord(radius, lat_long)
+        cdef double r2 = chord * chord
+        cdef int num_threads = nthreads
+        cdef int i = 0
+
+        if nq == 0:
+            return []
+
+        qx = create_double_array(nq, 0.0)
+        qy = create_double_array(nq, 0.0)
+
+        for i in range(0, nq):
+            qx[i] = xs[i]
+            qy[i] = ys[i]
+
+        counts = create_int_array(nq + 1, 0)
+
+        cdef double * qx_ptr = get_double_array_ptr(qx)
+        cdef double * qy_ptr = get_double_array_ptr(qy)
+        cdef int * counts_ptr = get_int_array_ptr(counts)
+        cdef double * points = get_double_array_ptr(self._points)
+        cdef int * ids = get_int_array_ptr(self._ids) if n > 0 else NULL
+        cdef double * q
+
+        # first count the number of wards near each point
+        with nogil, parallel(num_threads=num_threads):
+            q = <double*>malloc(3 * sizeof(double))
+
+            for i in prange(0, nq, schedule="dynamic"):
+                _to_point(qx_ptr[i], qy_ptr[i], lat_long, q)
+                counts_ptr[i+1] = _query_radius(points, ids, n, dims,
+                                                q, r2, NULL)
+
+            free(q)
+
+        for i in range(0, nq):
+            counts_ptr[i+1] += counts_ptr[i]
+
+        results = create_int_array(max(1, counts_ptr[nq]), 0)
+        cdef int * results_ptr = get_int_array_ptr(results)
+
+        # now find them again, writing the results into place
+        with nogil, parallel(num_threads=num_threads):
+            q = <double*>malloc(3 * sizeof(double))
+
+            for i in prange(0, nq, schedule="dynamic"):
+                _to_point(qx_ptr[i], qy_ptr[i], lat_long, q)
+                _query_radius(points, ids, n, dims, q, r2,
+                              &(results_ptr[counts_ptr[i]]))
+                qsort(&(results_ptr[counts_ptr[i]]),
+                      counts_ptr[i+1] - counts_ptr[i],
+                      sizeof(int), _compare_ints)
+
+            free(q)
+
+        output = [results[counts[i]:counts[i+1]].tolist()
+                  for i in range(0, nq)]
+
+        if scalar:
+            return output[0]
+        else:
+            return output
+
+    def query_nearest(self, x, y, k: int = 1, return_distances=False,
+                      nthreads: int = 1):
+        """Return the indices of the 'k' wards that are nearest to the
+           point (x, y) (which is (longitude, latitude) for a
+           lat/long network), sorted from nearest to furthest.
+           If 'return_distances' is True, then this returns a tuple
+           of the indices and the distances (in km) to each ward.
+
+           'x' and 'y' can be sequences of points, in which case this
+           returns a list of the results for each point. These are
+           calculated in parallel using 'nthreads' threads.
+        """
+        (xs, scalar) = _as_list(x)
+        (ys, _) = _as_list(y)
+
+        if len(xs) != len(ys):
+            raise ValueError(f"Number of x ({len(xs)}) and y ({len(ys)}) "
+                             f"coordinates must be equal")
+
+        from ._array import create_double_array, create_int_array
+
+        cdef int nq = len(xs)
+        cdef int dims = self._dims
+        cdef int n = self._n
+        cdef bint lat_long = self._lat_long
+        cdef int kk = min(k, n)
+        cdef int num_threads = nthreads
+        cdef int i = 0
+        cdef int j = 0
+
+        if nq == 0:
+            return []
+
+        qx = create_double_array(nq, 0.0)
+        qy = create_double_array(nq, 0.0)
+
+        for i in range(0, nq):
+            qx[i] = xs[i]
+            qy[i] = ys[i]
+
+        kk = max(kk, 0)
+
+        best_ids = create_int_array(max(1, nq * kk), 0)
+        best_d2 = create_double_array(max(1, nq * kk), 0.0)
+        counts = create_int_array(nq, 0)
+
+        cdef double * qx_ptr = get_double_array_ptr(qx)
+        cdef double * qy_ptr = get_double_array_ptr(qy)
+        cdef int * best_ids_ptr = get_int_array_ptr(best_ids)
+        cdef double * best_d2_ptr = get_double_array_ptr(best_d2)
+        cdef int * counts_ptr = get_int_array_ptr(counts)
+        cdef double * points = get_double_array_ptr(self._points)
+        cdef int * ids = get_int_array_ptr(self._ids) if n > 0 else NULL
+        cdef double * q   # thread-local query point
+
+        with nogil, parallel(num_threads=num_threads):
+            q = <double*>malloc(3 * sizeof(double))
+
+            for i in prange(0, nq, schedule="dynamic"):
+                _to_point(qx_ptr[i], qy_ptr[i], lat_long, q)
+                counts_ptr[i] = _query_nearest(points, ids, n, dims, q, kk,
+                                               &(best_ids_ptr[i*kk]),
+                                               &(best_d2_ptr[i*kk]))
+
+                for j in range(0, counts_ptr[i]):
+                    best_d2_ptr[i*kk+j] = _chord_to_distance(
+                                            sqrt(best_d2_ptr[i*kk+j]),
+                                            lat_long)
+
+            free(q)
+
+        output = []
+
+        for i in range(0, nq):
+            start = i * kk
+            end = start + counts[i]
+
+            if return_distances:
+                output.append((best_ids[start:end].tolist(),
+                               best_d2[start:end].tolist()))
+            else:
+                output.append(best_ids[start:end].tolist())
+
+        if scalar:
+            return output[0]
+        else:
+            return output
+
+    def query_ward_radius(self, network: Network, ward: int,
+                          radius: float, nthreads: int = 1):
+        """Return the indices of all wards that are within 'radius' km
+           of the ward at index 'ward' in the passed network (including
+           the ward itself). This can be a list of ward indices, in
+           which case a list of results is returned
+        """
+        (wards, scalar) = _as_list(ward)
+
+        xs = [network.nodes.x[w] for w in wards]
+        ys = [network.nodes.y[w] for w in wards]
+
+        result = self.query_radius(xs, ys, radius=radius, nthreads=nthreads)
+
+        if scalar:
+            return result[0]
+        else:
+            return result
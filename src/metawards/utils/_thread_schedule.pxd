@@ -0,0 +1,51 @@
+
+cimport openmp
+
+
+cdef inline int _static_begin(int n) nogil:
+    """Return the first of the 'n' iterations of a prange with
+       schedule="static" that are given to the calling thread.
+       This must be called from within a parallel block
+    """
+    cdef int nthreads = openmp.omp_get_num_threads()
+    cdef int thread_id = openmp.omp_get_thread_num()
+    cdef int q = n // nthreads
+    cdef int r = n % nthreads
+
+    if thread_id < r:
+        return (q + 1) * thread_id
+    else:
+        return q * thread_id + r
+
+
+cdef inline int _static_end(int n) nogil:
+    """Return one past the last of the 'n' iterations of a prange
+       with schedule="static" that are given to the calling thread.
+       This must be called from within a parallel block
+    """
+    cdef int nthreads = openmp.omp_get_num_threads()
+    cdef int thread_id = openmp.omp_get_thread_num()
+    cdef int q = n // nthreads
+    cdef int r = n % nthreads
+
+    if thread_id < r:
+        return (q + 1) * (thread_id + 1)
+    else:
+        return q * (thread_id + 1) + r
+
+
+cdef inline int _thread_begin(int *bounds, int nchunks) nogil:
+    """Return the first item to be visited by the calling thread,
+       given the 'bounds' of the 'nchunks' chunks of work returned
+       by get_thread_bounds. Each thread visits a contiguous range
+       of chunks (one chunk each if there are 'nchunks' threads).
+       This must be called from within a parallel block
+    """
+    return bounds[_static_begin(nchunks)]
+
+
+cdef inline int _thread_end(int *bounds, int nchunks) nogil:
+    """Return one past the last item to be visited by the calling
+       thread (see _thread_begin)
+    """
+    return bounds[_static_end(nchunks)]
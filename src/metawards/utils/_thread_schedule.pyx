@@ -0,0 +1,188 @@
+#!/bin/env/python3
+#cython: linetrace=False
+# MUST ALWAYS DISABLE AS WAY TOO SLOW FOR ITERATE
+
+cimport cython
+
+from ._get_array_ptr cimport get_int_array_ptr
+
+from ._active_infections cimport _lower_bound
+
+__all__ = ["get_thread_schedule", "set_thread_schedule",
+           "get_thread_costs", "get_thread_bounds"]
+
+
+_thread_schedule = "static"
+
+
+def get_thread_schedule() -> str:
+    """Return how the iterators divide their work between threads.
+       This is either "static" or "balanced" (see set_thread_schedule)
+    """
+    return _thread_schedule
+
+
+def set_thread_schedule(schedule: str = "static") -> None:
+    """Set how the parallel iterators divide their links or wards
+       between threads.
+
+       Parameters
+       ----------
+       schedule: str
+         "static" - each thread is given an equal range of link or
+                    ward indexes, exactly as for
+                    prange(..., schedule="static"). This is the default,
+                    and reproduces the results of earlier versions.
+         "balanced" - each thread is given a range of links or wards
+                      with an equal predicted cost. The cost of each
+                      link or ward is the number of random draws that
+                      it needed on the previous day (or just the number
+                      of infected links or wards, for iterators whose
+                      cost per item is constant). This balances the
+                      work when infections are clustered in a few
+                      wards. The ranges depend only on the state of
+                      the model, so results are still reproducible
+                      for a given seed and number of threads.
+    """
+    global _thread_schedule
+
+    if schedule is None:
+        schedule = "static"
+
+    schedule = str(schedule).strip().lower()
+
+    if schedule not in ["static", "balanced"]:
+        raise ValueError(
+            f"Unrecognised thread schedule '{schedule}'. This should "
+            f"be one of 'static' or 'balanced'")
+
+    _thread_schedule = schedule
+
+
+def get_thread_costs(infections, name: str, size: int):
+    """Return the int array (of length 'size') in which the iterator
+       called 'name' should record the cost (number of random draws)
+       of each link or ward, so that this can be used to balance the
+       work between threads on the next day. This returns None if
+       the costs are not needed (the schedule is "static")
+    """
+    if _thread_schedule != "balanced":
+        return None
+
+    costs = infections._thread_costs
+
+    if costs is None:
+        costs = {}
+        infections._thread_costs = costs
+
+    cost = costs.get(name, None)
+
+    if cost is None or len(cost) != size:
+        from ._array import create_int_array
+        cost = create_int_array(size, 0)
+        costs[name] = cost
+
+    return cost
+
+
+def get_thread_bounds(nthreads: int, start: int, end: int,
+                      active=None, costs=None):
+    """Return the bounds of the work given to each of the 'nthreads'
+       threads in a loop over the indexes from 'start' to 'end'. If
+       'active' is passed then only the (sorted) indexes in 'active'
+       are visited, and the bounds are positions in 'active'.
+       Otherwise the bounds are the indexes themselves. Thread 't'
+       should visit from bounds[t] to bounds[t+1].
+
+       For the "static" schedule these are the same indexes that
+       each thread would visit in prange(start, end, schedule="static").
+       For the "balanced" schedule each thread is given an equal share
+       of the total cost, where the cost of index j is 1 + costs[j]
+       (or 1 if 'costs' is None)
+    """
+    from array import array
+
+    cdef int num_threads = max(1, nthreads)
+    cdef int s = start
+    cdef int e = max(start, end)
+    cdef int n = e - s
+    cdef int nactive = len(active) if active is not None else 0
+    cdef bint is_sparse = (active is not None)
+    cdef int * a = get_int_array_ptr(active) if nactive > 0 else <int*>0
+    cdef int * c = get_int_array_ptr(costs) if costs is not None \
+                                            else <int*>0
+
+    bounds = array("i", [0]) * (num_threads + 1)
+    cdef int * b = get_int_array_ptr(bounds)
+
+    cdef int t = 0
+    cdef int q = 0
+    cdef int r = 0
+    cdef int i = 0
+    cdef int npos = 0
+    cdef int pos = 0
+    cdef long long total = 0
+    cdef long long cumulative = 0
+    cdef long long target = 0
+
+    if _thread_schedule != "balanced":
+        # the same partition as prange(start, end, schedule="static")
+        q = n // num_threads
+        r = n % num_threads
+
+        for t in range(0, num_threads + 1):
+            if t < r:
+                i = s + (q + 1) * t
+            else:
+                i = s + q * t + r
+
+            if is_sparse:
+                b[t] = _lower_bound(a, nactive, i)
+            else:
+                b[t] = i
+
+        return bounds
+
+    # the balanced partition - find the positions at which the
+    # cumulative cost passes each thread's equal share
+    if is_sparse:
+        npos = nactive
+        b[0] = 0
+    else:
+        npos = n
+        b[0] = s
+
+    with nogil:
+        for i in range(0, npos):
+            pos = a[i] if is_sparse else s + i
+            total += 1
+
+            if c != <int*>0:
+                total += c[pos]
+
+        t = 1
+
+        for i in range(0, npos):
+            if t >= num_threads:
+                break
+
+            # the next thread starts at the first item that would
+            # take this thread over its share of the total
+            target = (total * t) // num_threads
+
+            while t < num_threads and cumulative >= target:
+                b[t] = i if is_sparse else s + i
+                t += 1
+                target = (total * t) // num_threads
+
+            pos = a[i] if is_sparse else s + i
+            cumulative += 1
+
+            if c != <int*>0:
+                cumulative += c[pos]
+
+        while t <= num_threads:
+            b[t] = npos if is_sparse else e
+            t += 1
+
+    return bounds
@@ -0,0 +1,514 @@
+
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Tuple as _Tuple
+
+from .._wards import Wards
+
+__all__ = ["WardsColumns", "is_wards_binary"]
+
+#: Magic bytes at the start of every binary wards file
+_MAGIC = b"MWWARDSB"
+
+#: Version of the binary wards format. Increment this whenever the
+#: layout of the file changes
+_FORMAT_VERSION = 1
+
+#: The fields of WardInfo that are single strings
+_info_fields = ["name", "code", "authority", "authority_code",
+                "region", "region_code"]
+
+#: The fields of WardInfo that are lists of strings
+_info_list_fields = ["alternate_names", "alternate_codes"]
+
+#: Values of 'pos_type' for wards without a position, with x/y
+#: coordinates or with lat/long coordinates
+_NO_POSITION = 0
+_XY_POSITION = 1
+_LATLONG_POSITION = 2
+
+
+def is_wards_binary(filename: str) -> bool:
+    """Return whether or not 'filename' is a binary wards file
+       (as written by WardsColumns.save or Wards.to_binary)
+    """
+    import os
+
+    if filename is None or not os.path.isfile(str(filename)):
+        return False
+
+    try:
+        with open(filename, "rb") as FILE:
+            return FILE.read(len(_MAGIC)) == _MAGIC
+    except Exception:
+        return False
+
+
+class _StringTable:
+    """Simple de-duplicated table of strings"""
+
+    def __init__(self):
+        self._strings = [""]
+        self._index = {"": 0}
+
+    def add(self, s: str) -> int:
+        """Add 's' to the table, returning its index"""
+        if s is None:
+            s = ""
+
+        idx = self._index.get(s, None)
+
+        if idx is None:
+            idx = len(self._strings)
+            self._strings.append(s)
+            self._index[s] = idx
+
+        return idx
+
+    def to_arrays(self):
+        """Return the (blob, offsets) arrays that hold the table"""
+        from array import array
+
+        blob = bytearray()
+        offsets = array("q", [0])
+
+        for s in self._strings:
+            blob += s.encode("utf-8")
+            offsets.append(len(blob))
+
+        return (array("B", bytes(blob)), offsets)
+
+
+class WardsColumns:
+    """This is a columnar (struct-of-arrays) representation of
+       a Wards object. The attributes of each ward are held as
+       arrays indexed by ward ID, the work and play links of
+       all wards are held as compressed sparse row (CSR) arrays,
+       and the strings of the WardInfo objects are held once
+       in a string table.
+
+       This can be saved to, and loaded from, a compact binary
+       file much more quickly than Wards.to_json / Wards.from_json,
+       and can be converted directly to a Network (via
+       Network.from_wards) without creating any Ward objects.
+       Conversion to and from Wards is lossless.
+    """
+
+    def __init__(self):
+        #: The arrays, keyed by name
+        self.arrays = {}
+
+        #: The names of the custom parameters, in the order they
+        #: are held in 'arrays'
+        self.custom_keys = []
+
+    def __len__(self):
+        """Return the size of the ward arrays, i.e. one more than
+           the largest ward ID (matching len(Wards))
+        """
+        if "present" in self.arrays:
+            return len(self.arrays["present"])
+        else:
+            return 0
+
+    def __eq__(self, other):
+        return self.__class__ == other.__class__ and \
+            self.__dict__ == other.__dict__
+
+    def nbytes(self) -> int:
+        """Return the total size of the arrays in bytes"""
+        return sum(len(a) * a.itemsize for a in self.arrays.values())
+
+    def num_workers(self) -> int:
+        """Return the total number of workers"""
+        return sum(self.arrays["work_pop"])
+
+    def num_players(self) -> int:
+        """Return the total number of players"""
+        return sum(self.arrays["num_players"])
+
+    def population(self) -> int:
+        """Return the total population"""
+        return self.num_workers() + self.num_players()
+
+    def get_string(self, i: int) -> str:
+        """Return the ith string from the string table"""
+        offsets = self.arrays["string_offsets"]
+        start = offsets[i]
+        end = offsets[i+1]
+        return self.arrays["strings"][start:end].tobytes().decode("utf-8")
+
+    def get_strings(self) -> _List[str]:
+        """Return the whole string table as a list"""
+        blob = self.arrays["strings"].tobytes()
+        offsets = self.arrays["string_offsets"]
+
+        return [blob[offsets[i]:offsets[i+1]].decode("utf-8")
+                for i in range(0, len(offsets) - 1)]
+
+    def get_infos(self, strings: _List[str] = None):
+        """Return the list of WardInfo objects for all wards (None
+           for wards that don't exist)
+        """
+        from .._wardinfo import WardInfo
+
+        if strings is None:
+            strings = self.get_strings()
+
+        a = self.arrays
+        present = a["present"]
+
+        infos = [None] * len(present)
+
+        for i in range(0, len(present)):
+            if not present[i]:
+                continue
+
+            info = WardInfo()
+
+            for field in _info_fields:
+                setattr(info, field, strings[a[f"info_{field}"][i]])
+
+            for field in _info_list_fields:
+                begin = a[f"info_{field}_begin"]
+                values = a[f"info_{field}"]
+                setattr(info, field,
+                        [strings[values[j]]
+                         for j in range(begin[i], begin[i+1])])
+
+            infos[i] = info
+
+        return infos
+
+    @staticmethod
+    def from_wards(wards: Wards):
+        """Return the columnar representation of the passed Wards.
+           All of the links of the wards must be resolved
+        """
+        from array import array
+
+        if not isinstance(wards, Wards):
+            raise TypeError(f"You can only convert a Wards object, "
+                            f"not {wards}")
+
+        if not wards.is_resolved():
+            raise ValueError(
+                f"You cannot convert Wards with unresolved links: "
+                f"{wards.unresolved_wards()}")
+
+        nwards = len(wards._wards)
+
+        present = array("i", [0]) * nwards
+        auto_assign = array("i", [0]) * nwards
+        num_workers = array("i", [0]) * nwards
+        num_players = array("i", [0]) * nwards
+        player_total = array("d", [0.0]) * nwards
+        pos_type = array("i", [0]) * nwards
+        x = array("d", [0.0]) * nwards
+        y = array("d", [0.0]) * nwards
+        scale_uv = array("d", [1.0]) * nwards
+        cutoff = array("d", [99999.99]) * nwards
+        bg_foi = array("d", [0.0]) * nwards
+
+        work_begin = array("q", [0])
+        work_dest = array("i")
+        work_pop = array("i")
+
+        play_begin = array("q", [0])
+        play_dest = array("i")
+        play_weight = array("d")
+
+        strings = _StringTable()
+
+        infos = {}
+        for field in _info_fields:
+            infos[field] = array("i", [0]) * nwards
+
+        info_lists = {}
+        for field in _info_list_fields:
+            info_lists[field] = (array("q", [0]), array("i"))
+
+        custom = {}
+
+        for i, ward in enumerate(wards._wards):
+            if ward is not None and not ward.is_null():
+                present[i] = 1
+                auto_assign[i] = 1 if ward._auto_assign_players else 0
+                num_workers[i] = ward._num_workers
+                num_players[i] = ward._num_players
+                player_total[i] = ward._player_total
+
+                pos = ward._pos
+
+                if "x" in pos:
+                    pos_type[i] = _XY_POSITION
+                    x[i] = pos["x"]
+                    y[i] = pos["y"]
+                elif "lat" in pos:
+                    pos_type[i] = _LATLONG_POSITION
+                    x[i] = pos["lat"]
+                    y[i] = pos["long"]
+
+                scale_uv[i] = ward._scale_uv
+                cutoff[i] = ward._cutoff
+                bg_foi[i] = ward._bg_foi
+
+                for key in sorted(ward._workers.keys()):
+                    work_dest.append(key)
+                    work_pop.append(ward._workers[key])
+
+                for key in sorted(ward._players.keys()):
+                    play_dest.append(key)
+                    play_weight.append(ward._players[key])
+
+                info = ward._info
+
+                for field in _info_fields:
+                    infos[field][i] = strings.add(getattr(info, field))
+
+                for field in _info_list_fields:
+                    for s in getattr(info, field):
+                        info_lists[field][1].append(strings.add(s))
+
+                for key, value in ward._custom_params.items():
+                    if key not in custom:
+                        custom[key] = (array("i", [0]) * nwards,
+                                       array("d", [0.0]) * nwards)
+
+                    custom[key][0][i] = 1
+                    custom[key][1][i] = value
+
+            work_begin.append(len(work_dest))
+            play_begin.append(len(play_dest))
+
+            for field in _info_list_fields:
+                info_lists[field][0].append(len(info_lists[field][1]))
+
+        (blob, offsets) = strings.to_arrays()
+
+        columns = WardsColumns()
+
+        columns.arrays = {"present": present,
+                          "auto_assign": auto_assign,
+                          "num_workers": num_workers,
+                          "num_players": num_players,
+                          "player_total": player_total,
+                          "pos_type": pos_type,
+                          "x": x, "y": y,
+                          "scale_uv": scale_uv,
+                          "cutoff": cutoff,
+                          "bg_foi": bg_foi,
+                          "work_begin": work_begin,
+                          "work_dest": work_dest,
+                          "work_pop": work_pop,
+                          "play_begin": play_begin,
+                          "play_dest": play_dest,
+                          "play_weight": play_weight,
+                          "strings": blob,
+                          "string_offsets": offsets}
+
+        for field in _info_fields:
+            columns.arrays[f"info_{field}"] = infos[field]
+
+        for field in _info_list_fields:
+            (begin, values) = info_lists[field]
+            columns.arrays[f"info_{field}_begin"] = begin
+            columns.arrays[f"info_{field}"] = values
+
+        for i, (key, (mask, values)) in enumerate(custom.items()):
+            columns.custom_keys.append(key)
+            columns.arrays[f"custom_mask_{i}"] = mask
+            columns.arrays[f"custom_{i}"] = values
+
+        return columns
+
+    def to_wards(self) -> Wards:
+        """Return the Wards that this represents"""
+        from .._ward import Ward
+
+        a = self.arrays
+        present = a["present"]
+
+        infos = self.get_infos()
+
+        work_begin = a["work_begin"]
+        work_dest = a["work_dest"]
+        work_pop = a["work_pop"]
+
+        play_begin = a["play_begin"]
+        play_dest = a["play_dest"]
+        play_weight = a["play_weight"]
+
+        custom = [(key, a[f"custom_mask_{i}"], a[f"custom_{i}"])
+                  for i, key in enumerate(self.custom_keys)]
+
+        wards = []
+
+        for i in range(0, len(present)):
+            if not present[i]:
+                continue
+
+            ward = Ward(id=i, info=infos[i],
+                        auto_assign_players=a["auto_assign"][i])
+
+            if a["pos_type"][i] == _XY_POSITION:
+                ward._pos = {"x": a["x"][i], "y": a["y"][i]}
+            elif a["pos_type"][i] == _LATLONG_POSITION:
+                ward._pos = {"lat": a["x"][i], "long": a["y"][i]}
+
+            ward._num_workers = a["num_workers"][i]
+            ward._num_players = a["num_players"][i]
+            ward._player_total = a["player_total"][i]
+
+            ward._scale_uv = a["scale_uv"][i]
+            ward._cutoff = a["cutoff"][i]
+            ward._bg_foi = a["bg_foi"][i]
+
+            for j in range(work_begin[i], work_begin[i+1]):
+                ward._workers[work_dest[j]] = work_pop[j]
+
+            for j in range(play_begin[i], play_begin[i+1]):
+                ward._players[play_dest[j]] = play_weight[j]
+
+            for key, mask, values in custom:
+                if mask[i]:
+                    ward._custom_params[key] = values[i]
+
+            wards.append(ward)
+
+        result = Wards()
+        result.insert(wards, _need_deep_copy=False)
+
+        return result
+
+    def save(self, filename: str) -> str:
+        """Save these columns to the binary file 'filename'. The file
+           is a small JSON header followed by the raw, aligned arrays.
+           Returns the absolute path to the written file
+        """
+        import json
+        import os
+        import struct
+        import sys
+        from pathlib import Path
+
+        from ._network_cache import _pad
+
+        filename = str(Path(filename).expanduser().resolve().absolute())
+
+        toc = []
+        offset = 0
+
+        for name, array in self.arrays.items():
+            nbytes = len(array) * array.itemsize
+            toc.append({"name": name, "typecode": array.typecode,
+                        "itemsize": array.itemsize, "length": len(array),
+                        "offset": offset})
+            offset += nbytes + _pad(nbytes)
+
+        header = {"version": _FORMAT_VERSION,
+                  "byteorder": sys.byteorder,
+                  "custom_keys": self.custom_keys,
+                  "arrays": toc}
+
+        header = json.dumps(header).encode("utf-8")
+
+        preamble = _MAGIC + struct.pack("<IQ", _FORMAT_VERSION, len(header))
+        start = len(preamble) + len(header)
+        start += _pad(start)
+
+        try:
+            with open(filename, "wb") as FILE:
+                FILE.write(preamble)
+                FILE.write(header)
+                FILE.write(b"\0" * (start - len(preamble) - len(header)))
+
+                for array in self.arrays.values():
+                    nbytes = len(array) * array.itemsize
+                    array.tofile(FILE)
+                    FILE.write(b"\0" * _pad(nbytes))
+        except Exception:
+            if os.path.exists(filename):
+                os.unlink(filename)
+            raise
+
+        return filename
+
+    @staticmethod
+    def load(filename: str):
+        """Load and return the WardsColumns from the binary file
+           'filename' (as written by WardsColumns.save)
+        """
+        import json
+        import struct
+        import sys
+        from array import array
+
+        from ._network_cache import _pad
+
+        with open(filename, "rb") as FILE:
+            nmagic = len(_MAGIC)
+
+            if FILE.read(nmagic) != _MAGIC:
+                raise IOError(f"{filename} is not a binary wards file")
+
+            (version, nheader) = struct.unpack("<IQ", FILE.read(12))
+
+            if version != _FORMAT_VERSION:
+                raise IOError(f"Incompatible binary wards version {version} "
+                              f"(need {_FORMAT_VERSION})")
+
+            header = json.loads(FILE.read(nheader).decode("utf-8"))
+
+            if header["byteorder"] != sys.byteorder:
+                raise IOError(
+                    f"Incompatible byte order {header['byteorder']}")
+
+            start = nmagic + 12 + nheader
+            start += _pad(start)
+
+            columns = WardsColumns()
+            columns.custom_keys = header["custom_keys"]
+
+            for entry in header["arrays"]:
+                a = array(entry["typecode"])
+
+                if a.itemsize != entry["itemsize"]:
+                    raise IOError(f"Incompatible itemsize for "
+                                  f"{entry['name']}")
+
+                FILE.seek(start + entry["offset"])
+                a.fromfile(FILE, entry["length"])
+                columns.arrays[entry["name"]] = a
+
+        return columns
+
+    def scale(self, work_ratio: float = 1.0, play_ratio: float = 1.0,
+              nthreads: int = 1) -> 'WardsColumns':
+        """Return a copy of these columns where the number of workers
+           and players have been scaled by 'work_ratio' and 'play_ratio'
+           respectively. This gives the same result as Wards.scale
+        """
+        from ._harmonise_wards import scale_wards_columns
+        return scale_wards_columns(self, work_ratio=work_ratio,
+                                   play_ratio=play_ratio, nthreads=nthreads)
+
+    @staticmethod
+    def harmonise(columns: _List['WardsColumns'], nthreads: int = 1
+                  ) -> _Tuple['WardsColumns', _List['WardsColumns']]:
+        """Harmonise the passed list of columns, returning a tuple that
+           contains the overall sum of all of these wards, plus a new list
+           where all use IDs that are correct and valid across the
+           entire group. This gives the same result as Wards.harmonise,
+           but takes a time that is linear in the number of links
+        """
+        from ._harmonise_wards import harmonise_wards_columns
+        return harmonise_wards_columns(columns, nthreads=nthreads)
+
+    def get_custom(self) -> _Dict[str, any]:
+        """Return the dictionary of custom parameter values, keyed
+           by parameter name. Wards that don't set a parameter
+           have a value of zero
+        """
+        return {key: self.arrays[f"custom_{i}"]
+                for i, key in enumerate(self.custom_keys)}
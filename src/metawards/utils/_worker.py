@@ -8,10 +8,15 @@ from .._demographics import Demographics
 from .._parameters import Parameters
 from .._outputfiles import OutputFiles
 
-__all__ = ["run_worker", "prepare_worker", "must_rebuild_network"]
+__all__ = ["run_worker", "prepare_worker", "initialise_worker",
+           "must_rebuild_network"]
 
 global_network = None
 
+#: Snapshot of the pristine state of global_network, used to reset
+#: the network before each job
+global_snapshot = None
+
 
 def must_rebuild_network(network: _Union[Network, Networks],
                          params: Parameters,
@@ -50,6 +55,31 @@ def must_rebuild_network(network: _Union[Network, Networks],
     return False
 
 
+def initialise_worker(shared_network: _Dict[str, any] = None) -> None:
+    """Initialise a worker process by attaching to the network that
+       has been published by the main process via shared memory
+       (see SharedNetwork). This is used as the initializer of
+       the worker pool, so that the network is built only once,
+       rather than once per worker. This does nothing if
+       'shared_network' is None, in which case the network is
+       built by each worker in prepare_worker
+
+       Parameters
+       ----------
+       shared_network: dict
+         The descriptor of the shared network, from
+         SharedNetwork.descriptor()
+    """
+    global global_network, global_snapshot
+
+    if shared_network is None:
+        return
+
+    from ._shared_network import attach_shared_network
+    global_network = attach_shared_network(shared_network)
+    global_snapshot = None
+
+
 def prepare_worker(params: Parameters, demographics: Demographics,
                    options: _Dict[str, any]) -> _Union[Network, Networks]:
     """Prepare a worker to receive work to run a model using the passed
@@ -66,7 +96,7 @@ def prepare_worker(params: Parameters, demographics: Demographics,
          If not None, then demographics used to specialise the Network
          into Networks
     """
-    global global_network
+    global global_network, global_snapshot
 
     max_nodes = options["max_nodes"]
     max_links = options["max_links"]
@@ -101,9 +131,16 @@ def prepare_worker(params: Parameters, demographics: Demographics,
                                     max_links=max_links)
 
         global_network = network
+        global_snapshot = None
+
+    if global_snapshot is None:
+        # capture the pristine state of the network once, so that it
+        # can be cheaply restored before each subsequent job
+        global_snapshot = global_network.snapshot()
+    else:
+        global_network.restore(global_snapshot, check_dirty=True)
 
-    # always work in a copy
-    network = global_network.copy()
+    network = global_network
 
     if params.adjustments is not None:
         Console.rule("Adjustable parameters to scan")
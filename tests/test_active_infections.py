@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles, Demographic, Demographics
+from metawards.extractors import extract_default
+from metawards.utils import find_active_infections, keeps_active_infections
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_params():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    return params
+
+
+def _run(network, extractor, outdir, nthreads):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.copy().run(population=Population(),
+                                        output_dir=output_dir,
+                                        seed=36583, nsteps=20,
+                                        nthreads=nthreads,
+                                        extractor=extractor)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+def _assert_active(infections):
+    for i in range(0, infections.N_INF_CLASSES):
+        active = infections.get_active_work(i)
+        expect = find_active_infections(infections.work[i])
+        assert set(expect).issubset(set(active))
+        assert list(active) == sorted(set(active))
+
+        active = infections.get_active_play(i)
+        expect = find_active_infections(infections.play[i])
+        assert set(expect).issubset(set(active))
+        assert list(active) == sorted(set(active))
+
+
+def test_find_active_infections():
+    from array import array
+
+    values = array("i", [0, 3, 0, 0, 1, 0, 2, 0, 0, 5])
+
+    for nthreads in [1, 2, 4, 16]:
+        assert list(find_active_infections(values, nthreads)) == [1, 4, 6, 9]
+
+    assert list(find_active_infections(array("i", [0, 0, 0]))) == []
+    assert list(find_active_infections(array("i"))) == []
+
+    assert not keeps_active_infections(_assert_active)
+
+
+@pytest.mark.parametrize("demographics", [False, True])
+@pytest.mark.parametrize("nthreads", [1, 8])
+def test_active_infections(demographics, nthreads, tmpdir):
+    network = Network.build(params=_get_params())
+    network.nodes.bg_foi[1] = 5.0
+
+    if demographics:
+        demo = Demographics()
+        demo.add(Demographic("red", work_ratio=0.3, play_ratio=0.6))
+        demo.add(Demographic("blue", work_ratio=0.7, play_ratio=0.4))
+        network = demo.specialise(network, nthreads=1)
+
+    days = []
+
+    def check_active(infections, **kwargs):
+        # the active sets maintained during the day cover all infections
+        _assert_active(infections)
+
+        for subinf in (infections.subinfs or []):
+            _assert_active(subinf)
+
+        days.append(True)
+
+    def sparse(**kwargs):
+        return extract_default(**kwargs) + [check_active]
+
+    # a custom function that is not known to keep the active sets
+    # means that they are rebuilt by a full scan after every day
+    def dense(**kwargs):
+        return extract_default(**kwargs) + [lambda **kwargs: None]
+
+    t_sparse = _run(network, sparse, os.path.join(tmpdir, "sparse"),
+                    nthreads)
+    t_dense = _run(network, dense, os.path.join(tmpdir, "dense"),
+                   nthreads)
+
+    assert len(days) == 20
+    assert t_sparse[-1].recovereds > 0
+    assert t_sparse == t_dense
+
+
+if __name__ == "__main__":
+    test_find_active_infections()
+    test_active_infections(False, 1, ".")
+    test_active_infections(True, 8, ".")
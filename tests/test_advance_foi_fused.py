@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles, Infections
+from metawards.iterators import advance_foi, advance_foi_fused, \
+    advance_recovery, iterate_default
+from metawards.utils import seed_ran_binomial, create_thread_generators, \
+    NullProfiler
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_params(multistage: bool = False):
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2, too_ill_to_move=0.3)
+
+    if multistage:
+        lurgy.add("I2", beta=0.4, progress=0.3, too_ill_to_move=0.6)
+
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    return params
+
+
+def iterate_fused(stage: str, **kwargs):
+    if stage == "foi":
+        return [advance_foi_fused, advance_recovery]
+    else:
+        return iterate_default(stage=stage, **kwargs)
+
+
+def _run(network, iterator, outdir, nthreads):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.copy().run(population=Population(),
+                                        output_dir=output_dir,
+                                        seed=36583, nsteps=20,
+                                        nthreads=nthreads,
+                                        iterator=iterator)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+@pytest.mark.parametrize("nthreads", [1, 8])
+def test_advance_foi_fused_single_stage(nthreads, tmpdir):
+    network = Network.build(params=_get_params())
+    network.nodes.bg_foi[1] = 5.0
+
+    # with only one infectious stage the fused kernel draws the same
+    # random numbers in the same order, so gives identical results
+    t_default = _run(network, iterate_default,
+                     os.path.join(tmpdir, "default"), nthreads)
+    t_fused = _run(network, iterate_fused,
+                   os.path.join(tmpdir, "fused"), nthreads)
+
+    assert t_default[-1].recovereds > 0
+    assert t_default == t_fused
+
+
+@pytest.mark.parametrize("nthreads", [1, 8])
+def test_advance_foi_fused_multi_stage(nthreads):
+    network = Network.build(params=_get_params(multistage=True))
+    network.nodes.scale_uv[2] = 0.5
+
+    infections = Infections.build(network=network)
+
+    for i in range(1, network.nlinks + 1):
+        infections.work[1][i] = i % 7
+        infections.work[2][i] = i % 3
+
+    for i in range(1, network.nnodes + 1):
+        infections.play[1][i] = 2 * i
+        infections.play[2][i] = i % 4
+
+    # the infections were changed directly, so the active sets are stale
+    infections.invalidate_active()
+
+    result = {}
+
+    for name, func in [("default", advance_foi),
+                       ("fused", advance_foi_fused)]:
+        rngs = create_thread_generators(seed_ran_binomial(31425), nthreads)
+        func(network=network, population=Population(),
+             infections=infections, workspace=None, rngs=rngs,
+             nthreads=nthreads, profiler=NullProfiler())
+
+        result[name] = (list(network.nodes.day_foi),
+                        list(network.nodes.night_foi))
+
+    # the night foi is deterministic, so must be the same
+    assert result["fused"][1] == pytest.approx(result["default"][1])
+
+    # the wards the infected move to are random, but the total
+    # foi in wards with the same scale_uv is conserved
+    def total(day_foi):
+        return sum(day_foi[i] for i in range(1, network.nnodes + 1)
+                   if i != 2)
+
+    assert result["fused"][0] != result["default"][0]
+    assert sum(result["fused"][0]) > 0
+    assert total(result["fused"][0]) == pytest.approx(
+        total(result["default"][0]), rel=0.2)
+
+
+if __name__ == "__main__":
+    test_advance_foi_fused_single_stage(1, ".")
+    test_advance_foi_fused_multi_stage(8)
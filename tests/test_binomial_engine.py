@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from array import array
+
+from metawards import Parameters, Network, Disease, Population, OutputFiles
+from metawards.utils import seed_ran_binomial, ran_binomial, \
+    ran_binomial_batch, delete_ran_binomial, get_binomial_engine, \
+    set_binomial_engine, validate_binomial_engine
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def test_binomial_engine():
+    assert get_binomial_engine() == "default"
+
+    rng = seed_ran_binomial(5432)
+    assert get_binomial_engine(rng) == "default"
+
+    ns = array("i", [0, 1, 5, 16, 17, 100, 5000] * 10)
+
+    # the batch API draws the same numbers as individual draws
+    batch = ran_binomial_batch(rng, 0.3, ns)
+    delete_ran_binomial(rng)
+
+    rng = seed_ran_binomial(5432)
+    single = [ran_binomial(rng, 0.3, n) for n in ns]
+    delete_ran_binomial(rng)
+
+    assert list(batch) == single
+
+    for x, n in zip(batch, ns):
+        assert 0 <= x <= n
+
+    set_binomial_engine("fast")
+
+    try:
+        rng = seed_ran_binomial(5432)
+        assert get_binomial_engine(rng) == "fast"
+
+        fast = ran_binomial_batch(rng, 0.3, ns)
+        delete_ran_binomial(rng)
+
+        for x, n in zip(fast, ns):
+            assert 0 <= x <= n
+
+        # p == 0 and p == 1 must still be exact
+        rng = seed_ran_binomial(5432)
+        assert list(ran_binomial_batch(rng, 0.0, ns)) == [0] * len(ns)
+        assert list(ran_binomial_batch(rng, 1.0, ns)) == list(ns)
+        delete_ran_binomial(rng)
+    finally:
+        set_binomial_engine("default")
+
+    with pytest.raises(ValueError):
+        set_binomial_engine("gsl")
+
+
+def test_validate_binomial_engine():
+    results = validate_binomial_engine("fast", nsamples=5000)
+
+    assert len(results) > 0
+
+    for result in results:
+        assert result["passed"], result
+
+    assert get_binomial_engine() == "default"
+
+
+def test_fast_binomial_run(tmpdir):
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2, too_ill_to_move=0.3)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+    network.nodes.bg_foi[1] = 5.0
+
+    set_binomial_engine("fast", validate=True)
+
+    try:
+        with OutputFiles(tmpdir, force_empty=True, prompt=None) as output_dir:
+            trajectory = network.copy().run(population=Population(),
+                                            output_dir=output_dir,
+                                            seed=36583, nsteps=20,
+                                            nthreads=1)
+    finally:
+        set_binomial_engine("default")
+
+    assert trajectory[-1].recovereds > 0
+
+    for p in trajectory:
+        assert p.population == trajectory[0].population
+
+
+if __name__ == "__main__":
+    test_binomial_engine()
+    test_validate_binomial_engine()
@@ -0,0 +1,107 @@
+
+import os
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles
+from metawards.utils import get_cutoff_masks
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _expected_mask(network, links, nlinks):
+    cutoff = network.params.dyn_dist_cutoff
+    wards_cutoff = network.nodes.cutoff
+
+    mask = [0]
+
+    for j in range(1, nlinks + 1):
+        local_cutoff = min(cutoff, wards_cutoff[links.ifrom[j]],
+                           wards_cutoff[links.ito[j]])
+        mask.append(1 if links.distance[j] < local_cutoff else 0)
+
+    if sum(mask) == nlinks:
+        return None
+    else:
+        return mask
+
+
+def _check_masks(network):
+    (links_mask, play_mask) = get_cutoff_masks(network)
+
+    expect = _expected_mask(network, network.links, network.nlinks)
+
+    if expect is None:
+        assert links_mask is None
+    else:
+        assert list(links_mask) == expect
+
+    expect = _expected_mask(network, network.play, network.nplay)
+
+    if expect is None:
+        assert play_mask is None
+    else:
+        assert list(play_mask) == expect
+
+    return (links_mask, play_mask)
+
+
+def test_cutoff_masks():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+
+    # by default everything is within the cutoff
+    assert _check_masks(network) == (None, None)
+
+    # the masks are cached
+    masks = network._cutoff_masks
+    _check_masks(network)
+    assert network._cutoff_masks is masks
+
+    # copies share the topology, and so share the masks
+    copy = network.copy()
+    _check_masks(copy)
+    assert copy._cutoff_masks is masks
+
+    # changing the global cutoff rebuilds the masks
+    network.params.dyn_dist_cutoff = 5.0
+    (links_mask, play_mask) = _check_masks(network)
+    assert links_mask is not None
+    assert 0 < sum(links_mask) < network.nlinks
+    assert network._cutoff_masks is not masks
+
+    # as does changing the cutoff of a single ward
+    masks = network._cutoff_masks
+    network.nodes.cutoff[1] = 0.0
+    _check_masks(network)
+    assert network._cutoff_masks is not masks
+
+    # the shared copy is not affected
+    assert copy._cutoff_masks is not network._cutoff_masks
+    assert _check_masks(copy) == (None, None)
+
+    # and the model runs with the masks
+    network.nodes.bg_foi[2] = 5.0
+    outdir = os.path.join(script_dir, "test_cutoff_masks")
+
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.run(population=Population(),
+                                 output_dir=output_dir,
+                                 seed=12345, nsteps=20, nthreads=2)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    assert trajectory[-1].recovereds > 0
+
+
+if __name__ == "__main__":
+    test_cutoff_masks()
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, Infections
+from metawards.iterators import advance_foi, advance_foi_fused
+from metawards.utils import seed_ran_binomial, create_thread_generators, \
+    NullProfiler, get_foi_reduction, set_foi_reduction, \
+    use_ward_reduction
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_params():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2, too_ill_to_move=0.3)
+    lurgy.add("I2", beta=0.4, progress=0.3, too_ill_to_move=0.6)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    return params
+
+
+def _get_foi(network, infections, func, method, nthreads):
+    old_method = get_foi_reduction()
+    set_foi_reduction(method)
+
+    try:
+        rngs = create_thread_generators(seed_ran_binomial(31425), nthreads)
+        func(network=network, population=Population(),
+             infections=infections, workspace=None, rngs=rngs,
+             nthreads=nthreads, profiler=NullProfiler())
+    finally:
+        set_foi_reduction(old_method)
+
+    return (list(network.nodes.day_foi), list(network.nodes.night_foi))
+
+
+def test_use_ward_reduction():
+    assert get_foi_reduction() == "auto"
+
+    # never use the ward reduction in serial, or with few contributions
+    assert not use_ward_reduction(1000000, 1000, 100, 1)
+    assert not use_ward_reduction(10, 1000000, 1000, 32)
+    assert use_ward_reduction(1000000, 1000000, 1000, 32)
+
+    with pytest.raises(ValueError):
+        set_foi_reduction("tree")
+
+
+@pytest.mark.parametrize("func", [advance_foi, advance_foi_fused])
+@pytest.mark.parametrize("nthreads", [5, 8])
+def test_foi_reduction(func, nthreads):
+    network = Network.build(params=_get_params())
+    network.nodes.scale_uv[2] = 0.5
+
+    infections = Infections.build(network=network)
+
+    for i in range(1, network.nlinks + 1):
+        infections.work[1][i] = i % 7
+        infections.work[2][i] = i % 3
+
+    for i in range(1, network.nnodes + 1):
+        infections.play[1][i] = 2 * i
+        infections.play[2][i] = i % 4
+
+    # the infections were changed directly, so the active sets are stale
+    infections.invalidate_active()
+
+    buffer = _get_foi(network, infections, func, "buffer", nthreads)
+    ward = _get_foi(network, infections, func, "ward", nthreads)
+
+    assert sum(buffer[0]) > 0
+    assert sum(buffer[1]) > 0
+
+    # the reductions must be bitwise identical
+    assert buffer == ward
+
+    # and the per-link contributions are reset ready for the next use
+    index = network._ward_reduction
+    assert index is not None
+    assert not any(index["day_from"])
+    assert not any(index["day_to"])
+    assert not any(index["night_from"])
+    assert not any(index["play_day"])
+
+    assert ward == _get_foi(network, infections, func, "ward", nthreads)
+
+
+if __name__ == "__main__":
+    test_use_ward_reduction()
+    test_foi_reduction(advance_foi, 8)
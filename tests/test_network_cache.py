@@ -0,0 +1,84 @@
+
+import os
+
+from metawards import Parameters, Network, Disease
+from metawards.utils import get_network_cache_filename
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _assert_same_network(n1, n2):
+    assert n1.nnodes == n2.nnodes
+    assert n1.nlinks == n2.nlinks
+    assert n1.nplay == n2.nplay
+    assert n1.population == n2.population
+    assert n1.work_population == n2.work_population
+    assert n1.play_population == n2.play_population
+
+    for name in ["label", "begin_to", "end_to", "self_w", "begin_p",
+                 "end_p", "self_p", "play_suscept", "save_play_suscept",
+                 "denominator_n", "denominator_d", "denominator_p",
+                 "denominator_pd", "x", "y", "scale_uv", "cutoff"]:
+        assert getattr(n1.nodes, name) == getattr(n2.nodes, name)
+
+    for name in ["ifrom", "ito", "weight", "suscept", "distance"]:
+        assert getattr(n1.links, name) == getattr(n2.links, name)
+        assert getattr(n1.play, name) == getattr(n2.play, name)
+
+    assert n1.info == n2.info
+
+
+def test_network_cache(tmpdir):
+    cache_dir = str(tmpdir)
+
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.5, progress=0.5)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    filename = get_network_cache_filename(params.input_files,
+                                          cache_dir=cache_dir)
+
+    assert not os.path.exists(filename)
+
+    reference = Network.build(params=params)
+
+    # build and populate the cache
+    network = Network.build(params=params, cache_dir=cache_dir)
+
+    assert os.path.exists(filename)
+    _assert_same_network(reference, network)
+
+    # this should now load from the cache
+    cached = Network.build(params=params, cache_dir=cache_dir)
+
+    _assert_same_network(reference, cached)
+    assert cached.params is params
+    assert cached.info.find("Clifton East") == [2]
+
+    # the cache should be private to each network
+    cached.links.weight[1] = 0.0
+    cached = Network.build(params=params, cache_dir=cache_dir)
+    _assert_same_network(reference, cached)
+
+    # a corrupted cache should be ignored and rebuilt
+    with open(filename, "wb") as FILE:
+        FILE.write(b"corrupted")
+
+    rebuilt = Network.build(params=params, cache_dir=cache_dir)
+    _assert_same_network(reference, rebuilt)
+
+    cached = Network.build(params=params, cache_dir=cache_dir)
+    _assert_same_network(reference, cached)
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_network_cache(tmpdir)
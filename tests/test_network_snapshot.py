@@ -0,0 +1,88 @@
+
+import os
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_state(network):
+    state = {}
+
+    for name in ["day_foi", "night_foi", "play_suscept",
+                 "save_play_suscept", "denominator_n", "denominator_d",
+                 "denominator_p", "denominator_pd", "bg_foi"]:
+        state[f"nodes.{name}"] = list(getattr(network.nodes, name))
+
+    for name in ["weight", "suscept"]:
+        state[f"links.{name}"] = list(getattr(network.links, name))
+        state[f"play.{name}"] = list(getattr(network.play, name))
+
+    state["work_population"] = network.work_population
+    state["play_population"] = network.play_population
+
+    return state
+
+
+def _run(network, outdir):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.run(population=Population(),
+                                 output_dir=output_dir,
+                                 seed=48271, nsteps=20, nthreads=1)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+def test_network_snapshot():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+    network.nodes.bg_foi[1] = 5.0
+
+    outdir = os.path.join(script_dir, "test_network_snapshot")
+
+    reference = _run(network.copy(), outdir)
+    assert reference[-1].recovereds > 0
+
+    pristine = _get_state(network)
+    snapshot = network.snapshot()
+
+    assert snapshot.nbytes() > 0
+
+    # nothing has changed, so nothing should be written
+    assert network.restore(snapshot, check_dirty=True) is network
+    assert snapshot.restore(network, check_dirty=True) == 0
+
+    for check_dirty in [False, True, True]:
+        weight = network.links.weight
+
+        trajectory = _run(network, outdir)
+        assert trajectory == reference
+        assert _get_state(network) != pristine
+
+        network.restore(snapshot, check_dirty=check_dirty)
+        assert _get_state(network) == pristine
+
+        # the arrays are restored in place, not reallocated
+        assert network.links.weight is weight
+
+    # custom parameters added during a run are removed
+    network.nodes.get_custom("extra", 1.0)
+    network.restore(snapshot)
+    assert "extra" not in network.nodes._custom_params
+
+
+if __name__ == "__main__":
+    test_network_snapshot()
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, OutputFiles
+from metawards.utils import get_play_sampler, set_play_sampler, \
+    get_play_alias_tables
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_network():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2, too_ill_to_move=0.3)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+    network.nodes.bg_foi[1] = 5.0
+
+    return network
+
+
+def _run(network, outdir, nthreads):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.copy().run(population=Population(),
+                                        output_dir=output_dir,
+                                        seed=36583, nsteps=20,
+                                        nthreads=nthreads)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+def test_play_alias_tables():
+    network = _get_network()
+
+    assert get_play_sampler() == "chain"
+    assert get_play_alias_tables(network) is None
+
+    set_play_sampler("alias")
+
+    try:
+        tables = get_play_alias_tables(network)
+        assert tables is not None
+        assert get_play_alias_tables(network) is tables
+
+        begin = tables["begin"]
+        prob = tables["prob"]
+        alias = tables["alias"]
+
+        wards = network.nodes
+        weight = network.play.weight
+
+        # the alias table for each ward must reproduce the play weights
+        for i in range(1, network.nnodes + 1):
+            b = begin[i]
+            m = begin[i+1] - b - 1
+
+            if m > 0:
+                assert m == wards.end_p[i] - wards.begin_p[i]
+
+            p = [prob[b+k] for k in range(0, m + 1)]
+
+            for k in range(0, m + 1):
+                p[alias[b+k]] += 1.0 - prob[b+k]
+
+            p = [x / (m + 1) for x in p]
+
+            w = [weight[wards.begin_p[i] + k] for k in range(0, m)]
+            w.append(max(0.0, 1.0 - sum(w)))
+
+            assert p == pytest.approx(w, abs=1e-12)
+
+        # changing the weights rebuilds the tables
+        network.play.weight[1] *= 0.5
+        assert get_play_alias_tables(network) is not tables
+    finally:
+        set_play_sampler("chain")
+
+    with pytest.raises(ValueError):
+        set_play_sampler("poisson")
+
+
+@pytest.mark.parametrize("nthreads", [1, 4])
+def test_play_alias_run(nthreads, tmpdir):
+    network = _get_network()
+
+    t_chain = _run(network, os.path.join(tmpdir, "chain"), nthreads)
+
+    set_play_sampler("alias")
+
+    try:
+        t_alias = _run(network, os.path.join(tmpdir, "alias1"), nthreads)
+        t_repeat = _run(network, os.path.join(tmpdir, "alias2"), nthreads)
+    finally:
+        set_play_sampler("chain")
+
+    assert t_alias[-1].recovereds > 0
+    assert t_alias == t_repeat
+
+    for p in t_alias:
+        assert p.population == t_chain[0].population
+
+
+if __name__ == "__main__":
+    test_play_alias_tables()
@@ -0,0 +1,154 @@
+
+import bz2
+import gzip
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease
+from metawards.utils import read_matrix_file, Profiler
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _write_matrix(filename, lines, compress=None):
+    data = "\n".join(lines).encode("utf-8")
+
+    if compress == "bz2":
+        data = bz2.compress(data)
+    elif compress == "gz":
+        data = gzip.compress(data)
+
+    with open(filename, "wb") as FILE:
+        FILE.write(data)
+
+
+@pytest.mark.parametrize("compress", [None, "bz2", "gz"])
+def test_read_matrix(tmpdir, compress):
+    lines = []
+    expect = []
+
+    for i in range(1, 5001):
+        j = 1 + (i * 7) % 311
+        w = 0.5 * i
+        expect.append((i, j, w))
+
+        if i % 3 == 0:
+            lines.append(f"{i},{j},{w}")
+        elif i % 101 == 0:
+            lines.append("")
+            lines.append(f"  {i}\t{j}   {w}  \r")
+        else:
+            lines.append(f"{i} {j} {w}")
+
+    filename = os.path.join(str(tmpdir), "matrix.dat")
+    _write_matrix(filename, lines, compress=compress)
+
+    profiler = Profiler()
+
+    for nthreads in [1, 4]:
+        (ifrom, ito, weight) = read_matrix_file(filename, ncols=3,
+                                                nthreads=nthreads,
+                                                profiler=profiler)
+
+        assert len(ifrom) == len(expect)
+        assert list(zip(ifrom, ito, weight)) == expect
+
+    assert "MB/s" in str(profiler)
+
+    (ids, sizes) = read_matrix_file(filename=_write_size(tmpdir),
+                                    ncols=2)
+
+    assert list(ids) == [1, 2, 3]
+    assert list(sizes) == [10, 20, 30]
+
+
+def _write_size(tmpdir):
+    filename = os.path.join(str(tmpdir), "size.dat")
+    _write_matrix(filename, ["1 10", "2 20", "", "3 30", ""])
+    return filename
+
+
+def test_read_matrix_parallel(tmpdir, monkeypatch):
+    from metawards.utils import _read_matrix
+
+    lines = [f"{i} {i+1} {1.0/i}" for i in range(1, 100001)]
+
+    filename = os.path.join(str(tmpdir), "matrix.dat")
+    _write_matrix(filename, lines)
+
+    serial = read_matrix_file(filename, nthreads=1)
+
+    # use a tiny chunk so that lines are split across chunks
+    monkeypatch.setattr(_read_matrix, "_chunk_size", 65536 + 13)
+    parallel = read_matrix_file(filename, nthreads=4)
+
+    for s, p in zip(serial, parallel):
+        assert s == p
+
+    assert len(serial[0]) == 100000
+
+
+def test_read_matrix_invalid(tmpdir):
+    filename = os.path.join(str(tmpdir), "matrix.dat")
+
+    for bad in ["1 2", "1 2 3.0 4", "1 x 3.0", "1 2 abc"]:
+        _write_matrix(filename, ["1 2 0.5", "3 4 0.5", bad, "5 6 0.5"])
+
+        with pytest.raises(IOError):
+            read_matrix_file(filename, ncols=3)
+
+    with pytest.raises(ValueError):
+        read_matrix_file(filename, ncols=4)
+
+
+def test_read_matrix_network(tmpdir):
+    """Check that a network built from compressed input files is
+       identical to one built from the uncompressed files
+    """
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.5, progress=0.5)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    reference = Network.build(params=params)
+
+    for member in ["work", "play", "play_size"]:
+        filename = getattr(params.input_files, member)
+        compressed = os.path.join(str(tmpdir),
+                                  os.path.basename(filename) + ".bz2")
+
+        with open(filename, "rb") as FILE:
+            _write_matrix(compressed, [FILE.read().decode("utf-8")],
+                          compress="bz2")
+
+        setattr(params.input_files, member, compressed)
+
+    network = Network.build(params=params, nthreads=2)
+
+    assert network.nnodes == reference.nnodes
+    assert network.nlinks == reference.nlinks
+    assert network.nplay == reference.nplay
+    assert network.population == reference.population
+
+    for name in ["ifrom", "ito", "weight", "distance"]:
+        assert getattr(network.links, name) == getattr(reference.links, name)
+        assert getattr(network.play, name) == getattr(reference.play, name)
+
+    for name in ["begin_to", "end_to", "self_w", "begin_p", "end_p",
+                 "self_p", "play_suscept", "denominator_p"]:
+        assert getattr(network.nodes, name) == getattr(reference.nodes, name)
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmpdir:
+        test_read_matrix(tmpdir, None)
+        test_read_matrix_invalid(tmpdir)
+        test_read_matrix_network(tmpdir)
@@ -0,0 +1,152 @@
+
+import os
+import sys
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles, VariableSets, VariableSet
+from metawards.utils import SharedNetwork, share_network, \
+    attach_shared_network, run_models
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _build_network():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+
+    # seed the outbreak using a background force of infection
+    network.nodes.bg_foi[1] = 5.0
+
+    return network
+
+
+def test_shared_network():
+    pytest.importorskip("multiprocessing.shared_memory")
+
+    network = _build_network()
+
+    with SharedNetwork(network) as shared:
+        attached = attach_shared_network(shared)
+
+        assert attached.nnodes == network.nnodes
+        assert attached.nlinks == network.nlinks
+        assert attached.nplay == network.nplay
+        assert attached.population == network.population
+        assert attached.params is not None
+        assert attached.info.find("Clifton East") == [2]
+
+        # the topology is a zero-copy view of the shared memory
+        for name in ["label", "begin_to", "end_to", "begin_p", "end_p",
+                     "x", "y"]:
+            assert isinstance(getattr(attached.nodes, name), memoryview)
+            assert getattr(attached.nodes, name) == \
+                getattr(network.nodes, name)
+
+        for name in ["ifrom", "ito", "distance"]:
+            assert isinstance(getattr(attached.links, name), memoryview)
+            assert getattr(attached.links, name) == \
+                getattr(network.links, name)
+
+        # while everything that changes during a run is private
+        for name in ["weight", "suscept"]:
+            assert not isinstance(getattr(attached.links, name), memoryview)
+            assert getattr(attached.links, name) == \
+                getattr(network.links, name)
+            assert getattr(attached.play, name) == \
+                getattr(network.play, name)
+
+        for name in ["play_suscept", "denominator_n", "denominator_p",
+                     "bg_foi"]:
+            assert not isinstance(getattr(attached.nodes, name), memoryview)
+            assert getattr(attached.nodes, name) == \
+                getattr(network.nodes, name)
+
+        attached.links.weight[1] = -1.0
+        assert network.links.weight[1] != -1.0
+
+        # a run on the attached network should match the original
+        outdir = os.path.join(script_dir, "test_shared_network")
+
+        results = []
+
+        for n in [network, attached]:
+            with OutputFiles(outdir, force_empty=True,
+                             prompt=None) as output_dir:
+                results.append(n.copy().run(population=Population(),
+                                            output_dir=output_dir,
+                                            seed=84321, nsteps=20,
+                                            nthreads=1))
+
+            OutputFiles.remove(outdir, prompt=None)
+
+        attached.links.weight[1] = network.links.weight[1]
+
+        assert results[0] == results[1]
+        assert results[0][-1].recovereds > 0
+
+        attached = None
+
+
+def test_share_network_fallback():
+    # only single Networks can be shared - everything else falls back
+    # to building the network in each worker
+    with share_network(None) as shared:
+        assert shared is None
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not sys.platform.startswith("linux"),
+                    reason="multiprocessing is only tested on linux")
+def test_shared_network_run_models():
+    pytest.importorskip("multiprocessing.shared_memory")
+
+    network = _build_network()
+
+    variables = VariableSets()
+    variables.append(VariableSet(variables={"beta[2]": 0.8}))
+    variables = variables.repeat(3)
+
+    outdir = os.path.join(script_dir, "test_shared_network")
+
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        serial = run_models(network=network.copy(), variables=variables,
+                            population=Population(), nprocs=1,
+                            nthreads=1, seed=84321, nsteps=20,
+                            output_dir=output_dir, debug_seeds=True)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        parallel = run_models(network=network.copy(), variables=variables,
+                              population=Population(), nprocs=2,
+                              nthreads=1, seed=84321, nsteps=20,
+                              output_dir=output_dir, debug_seeds=True)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    assert len(parallel) == 3
+
+    for s, p in zip(serial, parallel):
+        assert s[1] == p[1]
+
+    # the workers ran the network from the main process, including
+    # the in-memory changes (background FOI) not in the input files
+    assert parallel[0][1][-1].recovereds > 0
+
+
+if __name__ == "__main__":
+    test_shared_network()
+    test_share_network_fallback()
+    test_shared_network_run_models()
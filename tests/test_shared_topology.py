@@ -0,0 +1,120 @@
+
+import os
+
+import pytest
+
+from metawards import Parameters, Network, Disease, Population, \
+    OutputFiles, Demographic, Demographics, InputFiles
+from metawards.utils import SharedNetwork, attach_shared_network
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _get_params():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    return params
+
+
+def _run(networks, outdir):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = networks.copy().run(population=Population(),
+                                         output_dir=output_dir,
+                                         seed=36583, nsteps=20, nthreads=1)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+def test_shared_topology():
+    network = Network.build(params=_get_params())
+    network.nodes.bg_foi[1] = 5.0
+
+    demographics = Demographics()
+    demographics.add(Demographic("red", work_ratio=0.3, play_ratio=0.6))
+    demographics.add(Demographic("blue", work_ratio=0.7, play_ratio=0.4))
+
+    networks = demographics.specialise(network, nthreads=1)
+
+    assert networks.has_shared_topology()
+    assert networks.share_topology() == 0
+
+    for subnet in networks.subnets:
+        assert subnet.links.ifrom is network.links.ifrom
+        assert subnet.play.distance is network.play.distance
+        assert subnet.nodes.x is network.nodes.x
+
+        # while the populations are private to each demographic
+        assert subnet.links.suscept is not network.links.suscept
+        assert subnet.nodes.play_suscept is not network.nodes.play_suscept
+
+    # copies continue to share the topology
+    assert networks.copy().has_shared_topology()
+
+    # the topology is published to workers only once
+    pytest.importorskip("multiprocessing.shared_memory")
+
+    single = SharedNetwork(network)
+    whole = SharedNetwork(networks)
+
+    try:
+        topology = sum(len(getattr(network.nodes, name)) *
+                       getattr(network.nodes, name).itemsize
+                       for name in ["label", "x", "y"])
+
+        assert whole.nbytes() < 3 * single.nbytes() - 2 * topology
+
+        attached = attach_shared_network(whole.descriptor())
+
+        assert attached.has_shared_topology()
+        assert len(attached.subnets) == 2
+        assert attached.demographics == networks.demographics
+        assert attached.overall.population == network.population
+
+        for subnet, original in zip(attached.subnets, networks.subnets):
+            assert subnet.name == original.name
+            assert subnet.population == original.population
+            assert isinstance(subnet.links.ifrom, memoryview)
+            assert subnet.links.suscept == original.links.suscept
+
+        outdir = os.path.join(script_dir, "test_shared_topology")
+
+        reference = _run(networks, outdir)
+        assert reference[-1].recovereds > 0
+        assert _run(attached, outdir) == reference
+
+        attached = None
+    finally:
+        single.close()
+        whole.close()
+
+
+def test_share_topology_named_networks():
+    network = InputFiles.load(tiny_model)
+
+    demographics = Demographics()
+    demographics.add(Demographic("red", work_ratio=0.5, play_ratio=0.5,
+                                 network=network))
+    demographics.add(Demographic("blue", work_ratio=0.5, play_ratio=0.5,
+                                 network=network))
+
+    networks = demographics.build(params=_get_params())
+
+    # the subnets were built separately from the same wards, so
+    # have had their (identical) topology de-duplicated
+    assert networks.has_shared_topology()
+
+
+if __name__ == "__main__":
+    test_shared_topology()
+    test_share_topology_named_networks()
@@ -0,0 +1,123 @@
+
+import math
+import os
+import random
+
+import pytest
+
+from metawards import Network, Nodes, Parameters
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _distance(x1, y1, x2, y2, coordinates):
+    if coordinates == "lat/long":
+        radius = 6378.16
+        dlon = math.radians(x2 - x1)
+        dlat = math.radians(y2 - y1)
+        a = math.sin(dlat / 2.0)**2 + \
+            math.cos(math.radians(y1)) * math.cos(math.radians(y2)) * \
+            math.sin(dlon / 2.0)**2
+        return 2.0 * radius * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    else:
+        return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+
+
+def _random_network(nnodes, coordinates, rng):
+    network = Network(nnodes=nnodes)
+    network.nodes = Nodes(nnodes + 1)
+    network.nodes.coordinates = coordinates
+
+    for i in range(1, nnodes + 1):
+        if coordinates == "lat/long":
+            network.nodes.x[i] = rng.uniform(-6.0, 2.0)
+            network.nodes.y[i] = rng.uniform(50.0, 56.0)
+        else:
+            network.nodes.x[i] = rng.uniform(0.0, 500.0)
+            network.nodes.y[i] = rng.uniform(0.0, 800.0)
+
+    # a ward without a position is not indexed
+    network.nodes.x[7] = 0.0
+    network.nodes.y[7] = 0.0
+
+    return network
+
+
+@pytest.mark.parametrize("coordinates", ["x/y", "lat/long"])
+def test_spatial_index(coordinates):
+    rng = random.Random(8391)
+    network = _random_network(2000, coordinates, rng)
+
+    index = network.get_spatial_index()
+    assert len(index) == 1999
+    assert network.get_spatial_index() is index
+
+    nodes = network.nodes
+    wards = [i for i in range(1, network.nnodes + 1) if i != 7]
+
+    if coordinates == "lat/long":
+        points = [(rng.uniform(-6.0, 2.0), rng.uniform(50.0, 56.0))
+                  for _ in range(50)]
+    else:
+        points = [(rng.uniform(0.0, 500.0), rng.uniform(0.0, 800.0))
+                  for _ in range(50)]
+
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+
+    for radius in [0.0, 10.0, 45.0, 150.0]:
+        results = index.query_radius(xs, ys, radius=radius, nthreads=4)
+
+        for (x, y), result in zip(points, results):
+            expect = [i for i in wards
+                      if _distance(x, y, nodes.x[i], nodes.y[i],
+                                   coordinates) <= radius]
+
+            assert result == expect
+
+        assert index.query_radius(xs[0], ys[0], radius) == results[0]
+
+    for k in [1, 5, 20]:
+        results = index.query_nearest(xs, ys, k=k, return_distances=True,
+                                      nthreads=4)
+
+        for (x, y), (result, distances) in zip(points, results):
+            expect = sorted(wards, key=lambda i: _distance(
+                x, y, nodes.x[i], nodes.y[i], coordinates))[0:k]
+
+            assert result == expect
+
+            for i, d in zip(result, distances):
+                assert d == pytest.approx(_distance(
+                    x, y, nodes.x[i], nodes.y[i], coordinates))
+
+    # the nearest ward to a ward is itself
+    assert index.query_nearest(nodes.x[10], nodes.y[10]) == [10]
+    assert 10 in index.query_ward_radius(network, 10, radius=1.0)
+
+    # asking for more wards than exist returns all of them
+    assert sorted(index.query_nearest(0.0, 0.0, k=5000)) == wards
+
+
+def test_spatial_index_network():
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    network = Network.build(params=params)
+
+    index = network.get_spatial_index()
+
+    # Clifton (1), Clifton East (2) and Cotham (3) are close together
+    assert index.query_ward_radius(network, 1, radius=3.5) == [1, 2, 3]
+    assert index.query_nearest(network.nodes.x[5], network.nodes.y[5],
+                               k=2) == [5, 3]
+
+    # copies share the ward positions, and so share the index
+    assert network.copy().get_spatial_index() is index
+
+
+if __name__ == "__main__":
+    test_spatial_index("x/y")
+    test_spatial_index("lat/long")
+    test_spatial_index_network()
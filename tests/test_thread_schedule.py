@@ -0,0 +1,146 @@
+import os
+
+import pytest
+
+from array import array
+
+from metawards import Parameters, Network, Disease, Population, OutputFiles
+from metawards.utils import get_thread_schedule, set_thread_schedule, \
+    get_thread_bounds
+
+script_dir = os.path.dirname(__file__)
+tiny_model = os.path.join(script_dir, "data", "tiny_model",
+                          "description.json")
+
+
+def _static_bounds(nthreads, start, end):
+    """The indexes visited by each thread for prange(schedule="static")"""
+    n = end - start
+    q = n // nthreads
+    r = n % nthreads
+
+    bounds = []
+
+    for t in range(0, nthreads + 1):
+        if t < r:
+            bounds.append(start + (q + 1) * t)
+        else:
+            bounds.append(start + q * t + r)
+
+    return bounds
+
+
+def _run(network, outdir, nthreads):
+    with OutputFiles(outdir, force_empty=True, prompt=None) as output_dir:
+        trajectory = network.copy().run(population=Population(),
+                                        output_dir=output_dir,
+                                        seed=36583, nsteps=20,
+                                        nthreads=nthreads)
+
+    OutputFiles.remove(outdir, prompt=None)
+
+    return trajectory
+
+
+@pytest.mark.parametrize("nthreads", [1, 3, 8])
+def test_static_bounds(nthreads):
+    assert get_thread_schedule() == "static"
+
+    for (start, end) in [(1, 2), (1, 7), (1, 101), (5, 5)]:
+        bounds = list(get_thread_bounds(nthreads, start, end))
+        assert bounds == _static_bounds(nthreads, start, end)
+
+    # with an active set the bounds are positions in that set
+    active = array("i", [2, 3, 5, 40, 41, 99])
+    bounds = list(get_thread_bounds(nthreads, 1, 101, active=active))
+
+    for t, (begin, end) in enumerate(zip(_static_bounds(nthreads, 1, 101)[:-1],
+                                         _static_bounds(nthreads, 1, 101)[1:])):
+        assert [active[i] for i in range(bounds[t], bounds[t+1])] == \
+            [a for a in active if begin <= a < end]
+
+
+def test_balanced_bounds():
+    old_schedule = get_thread_schedule()
+    set_thread_schedule("balanced")
+
+    try:
+        # all of the cost is clustered at the end of the range
+        costs = array("i", [0]) * 101
+
+        for i in range(91, 101):
+            costs[i] = 99
+
+        bounds = list(get_thread_bounds(4, 1, 101, costs=costs))
+
+        # the bounds cover the range and are monotonic
+        assert bounds[0] == 1
+        assert bounds[-1] == 101
+        assert bounds == sorted(bounds)
+
+        # and the clustered links are shared between the threads
+        work = [sum(1 + costs[j] for j in range(bounds[t], bounds[t+1]))
+                for t in range(0, 4)]
+
+        assert max(work) - min(work) <= 2 * 100
+
+        active = array("i", [2, 50, 91, 92, 93, 94, 95, 96])
+        bounds = list(get_thread_bounds(4, 1, 101, active=active,
+                                        costs=costs))
+
+        assert bounds[0] == 0
+        assert bounds[-1] == len(active)
+        assert bounds == sorted(bounds)
+    finally:
+        set_thread_schedule(old_schedule)
+
+    with pytest.raises(ValueError):
+        set_thread_schedule("dynamic")
+
+    assert get_thread_schedule() == old_schedule
+
+
+@pytest.mark.parametrize("nthreads", [1, 4])
+def test_balanced_run(nthreads, tmpdir):
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2, too_ill_to_move=0.3)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_input_files(tiny_model)
+    params.set_disease(lurgy)
+
+    network = Network.build(params=params)
+    network.nodes.bg_foi[1] = 5.0
+
+    t_static = _run(network, os.path.join(tmpdir, "static"), nthreads)
+
+    old_schedule = get_thread_schedule()
+    set_thread_schedule("balanced")
+
+    try:
+        t_balanced = _run(network, os.path.join(tmpdir, "balanced1"),
+                          nthreads)
+        t_repeat = _run(network, os.path.join(tmpdir, "balanced2"),
+                        nthreads)
+    finally:
+        set_thread_schedule(old_schedule)
+
+    assert t_balanced[-1].recovereds > 0
+
+    # the balanced schedule is reproducible for a given seed and
+    # number of threads
+    assert t_balanced == t_repeat
+
+    # and is identical to the static schedule in serial
+    if nthreads == 1:
+        assert t_balanced == t_static
+
+    for p in t_balanced:
+        assert p.population == t_static[0].population
+
+
+if __name__ == "__main__":
+    test_static_bounds(3)
+    test_balanced_bounds()
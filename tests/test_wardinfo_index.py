@@ -0,0 +1,99 @@
+
+import re
+
+import pytest
+
+from metawards import WardInfo, WardInfos
+
+
+def _make_infos():
+    infos = WardInfos()
+
+    names = ["Clifton", "Clifton Down", "clifton-upon-Dunsmore",
+             "St. Clifton", "Cotham", "Redland", "Ynys Môn", "Straße",
+             "Weston-super-Mare", ""]
+    authorities = [("Bristol, City of", "E06000023"),
+                   ("North Somerset", "E06000024"),
+                   ("Rugby", "E07000220")]
+    regions = [("South West", "E12000009"), ("West Midlands", "E12000005")]
+
+    for i, name in enumerate(names):
+        authority, authority_code = authorities[i % len(authorities)]
+        region, region_code = regions[i % len(regions)]
+
+        infos[i + 1] = WardInfo(name=name, code=f"E0500{i:04d}",
+                                alternate_names=[name.upper(),
+                                                 f"Old {name}"],
+                                alternate_codes=[f"E3600{i:04d}"],
+                                authority=authority,
+                                authority_code=authority_code,
+                                region=region, region_code=region_code)
+
+    return infos
+
+
+_searches = ["Clifton", "clifton", "CLIFTON DOWN", "Down", "cot", "môn",
+             "MÔN", "strasse", "Straße", "old", "E0500", "0003",
+             "-super-", "St", "", "nothing"]
+
+
+@pytest.mark.parametrize("match", [False, True])
+def test_wardinfo_index(match):
+    infos = _make_infos()
+
+    for name in _searches:
+        # compiled patterns always use a scan of every ward, so
+        # give the reference results
+        pattern = re.compile(name, re.IGNORECASE)
+
+        for include_alternates in [True, False]:
+            assert infos._find_ward(
+                name, match=match, include_alternates=include_alternates) \
+                == infos._find_ward(pattern, match=match,
+                                    include_alternates=include_alternates)
+
+        assert infos._find_authority(name, match=match) == \
+            infos._find_authority(pattern, match=match)
+        assert infos._find_region(name, match=match) == \
+            infos._find_region(pattern, match=match)
+
+    assert infos.find("Clifton", match=True) == [1, 2, 3]
+    assert infos.find("clifton") == [1, 2, 3, 4]
+    assert infos.find("Clifton/Bristol") == [1, 4]
+    assert infos.find("Clifton", region="midlands") == [2, 4]
+    assert infos.find(authority="e06000024", region="E12000009") == [5]
+
+    # regular expressions are still supported
+    assert infos.find(r"^clifton$") == [1]
+    assert infos.find(r"^.*down$", authority="North") == [2]
+
+
+def test_wardinfo_index_updates():
+    infos = _make_infos()
+
+    assert infos.find("Bedminster") == []
+
+    # the indexes are updated when the wards change
+    infos[5] = WardInfo(name="Bedminster", authority="Bristol, City of")
+    assert infos.find("Bedminster") == [5]
+    assert infos.find("Cotham") == []
+
+    infos[20] = WardInfo(name="Bedminster Down")
+    assert infos.find("Bedminster") == [5, 20]
+
+    # and after the list has been edited directly and reindexed
+    infos.wards[20] = WardInfo(name="Southville")
+    infos.reindex()
+    assert infos.find("Bedminster") == [5]
+    assert infos.find("southville") == [20]
+
+    # the indexes don't change equality or copies
+    other = _make_infos()
+    other.find("Clifton")
+    assert other == _make_infos()
+
+
+if __name__ == "__main__":
+    test_wardinfo_index(False)
+    test_wardinfo_index(True)
+    test_wardinfo_index_updates()
@@ -0,0 +1,135 @@
+
+import os
+
+import pytest
+
+from metawards import Ward, Wards, WardInfo, Network, Disease, Parameters
+from metawards.utils import WardsColumns, is_wards_binary
+
+script_dir = os.path.dirname(__file__)
+
+simple_network = os.path.join(script_dir, "data", "simple_network.json.bz2")
+
+
+def _get_params():
+    lurgy = Disease("lurgy")
+    lurgy.add("E", beta=0.0, progress=1.0)
+    lurgy.add("I", beta=0.8, progress=0.2)
+    lurgy.add("R")
+
+    params = Parameters()
+    params.set_disease(lurgy)
+
+    return params
+
+
+def _make_wards():
+    bristol = Ward(name="Bristol", code="BRS", authority="Bristol",
+                   region="South West")
+    bristol.set_info(WardInfo(name="Bristol", code="BRS",
+                              alternate_names=["Brizzle", "Bristow"],
+                              alternate_codes=["E1"],
+                              authority="Bristol", region="South West"))
+    london = Ward(name="London", region="London")
+    oxford = Ward(name="Oxford", auto_assign_players=False)
+
+    bristol.add_workers(500, destination=bristol)
+    bristol.add_workers(500, destination=london)
+    bristol.add_player_weight(0.25, destination=london)
+    bristol.set_num_players(750)
+    bristol.set_position(lat=51.45, long=-2.58)
+    bristol.set_custom("vaccinated", 0.5)
+    bristol.set_bg_foi(2.0)
+
+    london.add_workers(8500, destination=london)
+    london.add_workers(100, destination=bristol)
+    london.set_num_players(10000)
+    london.set_position(lat=51.5, long=-0.12)
+    london.set_scale_uv(0.5)
+    london.set_cutoff(10.0)
+
+    oxford.add_workers(200, destination=london)
+    oxford.add_player_weight(0.6, destination=oxford)
+    oxford.add_player_weight(0.4, destination=bristol)
+    oxford.set_num_players(300)
+    oxford.set_position(lat=51.75, long=-1.26)
+
+    wards = Wards()
+    wards.add(bristol)
+    wards.add(london)
+    wards.add(oxford)
+
+    return wards
+
+
+def _assert_same_network(n1, n2):
+    assert n1.nnodes == n2.nnodes
+    assert n1.nlinks == n2.nlinks
+    assert n1.nplay == n2.nplay
+    assert n1.population == n2.population
+    assert n1.info == n2.info
+    assert n1.nodes.coordinates == n2.nodes.coordinates
+    assert n1.params.dyn_dist_cutoff == n2.params.dyn_dist_cutoff
+
+    for name in ["label", "begin_to", "end_to", "self_w", "begin_p",
+                 "end_p", "self_p", "play_suscept", "save_play_suscept",
+                 "denominator_n", "denominator_p", "x", "y", "scale_uv",
+                 "cutoff", "bg_foi"]:
+        assert getattr(n1.nodes, name) == getattr(n2.nodes, name), name
+
+    assert n1.nodes._custom_params == n2.nodes._custom_params
+
+    for name in ["ifrom", "ito", "weight", "suscept", "distance"]:
+        assert getattr(n1.links, name) == getattr(n2.links, name), name
+        assert getattr(n1.play, name) == getattr(n2.play, name), name
+
+
+@pytest.mark.parametrize("source", ["custom", "simple"])
+def test_wards_binary(source, tmpdir):
+    if source == "custom":
+        wards = _make_wards()
+    else:
+        wards = Wards.from_json(simple_network)
+
+    columns = WardsColumns.from_wards(wards)
+
+    assert len(columns) == len(wards)
+    assert columns.num_workers() == wards.num_workers()
+    assert columns.num_players() == wards.num_players()
+
+    # the conversion is lossless
+    assert columns.to_wards() == wards
+
+    filename = wards.to_binary(os.path.join(tmpdir, "wards.bin"))
+
+    assert is_wards_binary(filename)
+    assert not is_wards_binary(simple_network)
+
+    assert WardsColumns.load(filename) == columns
+    assert Wards.from_binary(filename) == wards
+    assert Wards.load(filename) == wards
+
+    # the network built directly from the columns is identical to
+    # that built via the Ward objects
+    params = _get_params()
+    expect = Network.from_wards(wards, params=params)
+
+    _assert_same_network(expect, Network.from_wards(columns, params=params))
+    _assert_same_network(expect, Network.from_wards(filename, params=params))
+
+
+def test_wards_binary_invalid(tmpdir):
+    filename = os.path.join(tmpdir, "wards.bin")
+
+    with open(filename, "wb") as FILE:
+        FILE.write(b"not a wards file")
+
+    assert not is_wards_binary(filename)
+
+    with pytest.raises(IOError):
+        WardsColumns.load(filename)
+
+
+if __name__ == "__main__":
+    test_wards_binary("custom", ".")
+    test_wards_binary("simple", ".")
@@ -0,0 +1,131 @@
+
+import os
+
+import pytest
+
+from metawards import Ward, Wards, WardInfo, Network
+from metawards.utils import WardsColumns
+
+from test_wards_binary import _make_wards, _get_params, _assert_same_network
+
+script_dir = os.path.dirname(__file__)
+
+simple_network = os.path.join(script_dir, "data", "simple_network.json.bz2")
+
+
+def _make_other_wards():
+    bristol = Ward(name="Bristol", code="BRS", authority="Bristol",
+                   region="South West")
+    bristol.set_info(WardInfo(name="Bristol", code="BRS",
+                              alternate_names=["Brizzle", "Bristow"],
+                              alternate_codes=["E1"],
+                              authority="Bristol", region="South West"))
+    oxford = Ward(name="Oxford", auto_assign_players=False)
+    cambridge = Ward(name="Cambridge")
+
+    oxford.add_workers(20, destination=cambridge)
+    oxford.add_workers(5, destination=bristol)
+    oxford.add_player_weight(0.1, destination=oxford)
+    oxford.add_player_weight(0.3, destination=cambridge)
+    oxford.add_player_weight(0.25, destination=bristol)
+    oxford.set_num_players(30)
+    oxford.set_position(lat=51.75, long=-1.26)
+
+    cambridge.add_workers(30, destination=oxford)
+    cambridge.add_workers(70, destination=cambridge)
+    cambridge.add_player_weight(0.3, destination=oxford)
+    cambridge.set_num_players(50)
+    cambridge.set_custom("vaccinated", 0.1)
+    cambridge.set_custom("isolated", 3.0)
+
+    bristol.add_workers(11, destination=oxford)
+    bristol.set_position(lat=51.45, long=-2.58)
+
+    wards = Wards()
+    wards.add(oxford)
+    wards.add(cambridge)
+    wards.add(bristol)
+
+    return wards
+
+
+def _get_cases():
+    simple = Wards.from_json(simple_network)
+
+    return [[_make_wards(), _make_other_wards()],
+            [_make_other_wards(), _make_wards(), _make_other_wards()],
+            [simple, simple.scale(work_ratio=0.3, play_ratio=0.6)]]
+
+
+@pytest.mark.parametrize("case", range(0, 3))
+def test_wards_harmonise(case):
+    wardss = _get_cases()[case]
+
+    (expect, expect_wardss) = Wards._harmonise_objects(wardss)
+
+    (overall, harmonised) = WardsColumns.harmonise(
+        [WardsColumns.from_wards(wards) for wards in wardss], nthreads=4)
+
+    # identical to harmonising the Ward objects
+    assert overall.to_wards() == expect
+    assert overall == WardsColumns.from_wards(expect)
+    assert len(harmonised) == len(expect_wardss)
+
+    for h, e in zip(harmonised, expect_wardss):
+        assert h.to_wards() == e
+        assert h == WardsColumns.from_wards(e)
+
+    assert Wards.harmonise(wardss) == (expect, expect_wardss)
+
+    # the populations are conserved
+    assert overall.population() == sum(w.population() for w in wardss)
+    assert overall.num_workers() == sum(h.num_workers() for h in harmonised)
+
+    params = _get_params()
+    _assert_same_network(Network.from_wards(expect, params=params),
+                         Network.from_wards(overall, params=params))
+
+
+def test_wards_harmonise_invalid():
+    wards = _make_wards()
+    other = _make_other_wards()
+    other._wards[3].set_position(lat=50.0, long=-2.58)
+
+    with pytest.raises(ValueError):
+        WardsColumns.harmonise([WardsColumns.from_wards(wards),
+                                WardsColumns.from_wards(other)])
+
+    with pytest.raises(ValueError):
+        Wards._harmonise_objects([wards, other])
+
+
+def test_wards_columns_scale():
+    wards = Wards.from_json(simple_network)
+    columns = WardsColumns.from_wards(wards)
+
+    for (work_ratio, play_ratio) in [(0.3, 0.6), (0.7, 1.0), (1.0, 0.2)]:
+        expect = wards.scale(work_ratio=work_ratio, play_ratio=play_ratio)
+        scaled = columns.scale(work_ratio=work_ratio, play_ratio=play_ratio,
+                               nthreads=4)
+
+        assert scaled == WardsColumns.from_wards(expect)
+
+    # scaling returns a copy
+    assert columns == WardsColumns.from_wards(wards)
+
+
+def test_network_to_wards_columns():
+    params = _get_params()
+    network = Network.from_wards(_make_wards(), params=params)
+
+    columns = network.to_wards_columns(nthreads=4)
+
+    assert columns == WardsColumns.from_wards(network.to_wards())
+    _assert_same_network(network, Network.from_wards(columns, params=params))
+
+
+if __name__ == "__main__":
+    test_wards_harmonise(0)
+    test_wards_harmonise_invalid()
+    test_wards_columns_scale()
+    test_network_to_wards_columns()